@@ -1,7 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils.translation import gettext_lazy as _
 
 from accounts.models import CustomUser
 
 
-admin.site.register(CustomUser, UserAdmin)
+class CustomUserAdmin(UserAdmin):
+    fieldsets = UserAdmin.fieldsets + ((_('Sharing'), {'fields': ('shares_free_time', )}), )
+    list_filter = UserAdmin.list_filter + ('shares_free_time', )
+
+
+admin.site.register(CustomUser, CustomUserAdmin)
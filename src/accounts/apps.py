@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AccountsConfig(AppConfig):
     name = 'accounts'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        import accounts.signals
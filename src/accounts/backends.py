@@ -0,0 +1,65 @@
+"""
+Authentication backend which loads the user of a session from the cache, see the AUTH_USER_CACHE_* settings.
+
+Cached users are keyed by their id and a version counter, which signals.py bumps whenever the user is saved, e.g. on a
+password change or a login, deleted or logged out. A bumped version makes the next request load the user from the
+database again, so a changed password still ends the other sessions of the user. Updates which bypass the model, such
+as QuerySet.update(), leave the cached user stale until AUTH_USER_CACHE_TIMEOUT runs out.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+
+
+def get_cache():
+    return caches[getattr(settings, 'AUTH_USER_CACHE_ALIAS', 'default')]
+
+
+def _version_key(user_id):
+    return f'accounts:user-version:{user_id}'
+
+
+def get_version(user_id):
+    cache = get_cache()
+    key = _version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(user_id):
+    cache = get_cache()
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+class CachedModelBackend(ModelBackend):
+    """ ModelBackend whose get_user(), called by every request of a logged in user, reads the cache first """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user = super().authenticate(request, username=username, password=password, **kwargs)
+        if user is None and password is not None:
+            # ModelBackend, listed after this backend for older sessions, would hash the rejected password again
+            raise PermissionDenied
+        return user
+
+    def get_user(self, user_id):
+        if not getattr(settings, 'AUTH_USER_CACHE_ENABLED', True):
+            return super().get_user(user_id)
+
+        cache = get_cache()
+        key = f'accounts:user:{user_id}:{get_version(user_id)}'
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 60 * 60))
+        return user
@@ -0,0 +1,77 @@
+"""
+Password hashers, see the PASSWORD_HASHING_PROFILE setting.
+
+Django 3.1 ships no scrypt hasher, and Argon2 needs the argon2-cffi library, while hashlib.scrypt comes with Python
+linked against OpenSSL. Hashes keep their parameters, so changing the work factor rehashes a password at the next
+successful login, like a change of the preferred hasher does.
+"""
+import base64
+import hashlib
+
+from django.contrib.auth.hashers import BasePasswordHasher, mask_hash
+from django.utils.crypto import constant_time_compare
+from django.utils.translation import gettext_noop as _
+
+
+class ScryptPasswordHasher(BasePasswordHasher):
+    """
+    Memory-hard password hashing with scrypt.
+
+    A hash takes 128 × work_factor × block_size bytes of memory, 16 MiB by default, which makes guessing passwords on
+    GPUs costly while a login stays cheaper than with PBKDF2 on the server's CPU.
+    """
+    algorithm = 'scrypt'
+    work_factor = 2 ** 14
+    block_size = 8
+    parallelism = 1
+    # OpenSSL refuses to take more than 32 MiB unless allowed to
+    maxmem = 64 * 1024 * 1024
+
+    def encode(self, password, salt, work_factor=None):
+        assert password is not None
+        assert salt and '$' not in salt
+        work_factor = work_factor or self.work_factor
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=work_factor, r=self.block_size, p=self.parallelism,
+            maxmem=self.maxmem, dklen=64
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return f'{self.algorithm}${work_factor}${salt}${self.block_size}${self.parallelism}${hash_}'
+
+    @staticmethod
+    def _decode(encoded):
+        algorithm, work_factor, salt, block_size, parallelism, hash_ = encoded.split('$', 5)
+        return {
+            'algorithm': algorithm, 'work_factor': int(work_factor), 'salt': salt, 'block_size': int(block_size),
+            'parallelism': int(parallelism), 'hash': hash_,
+        }
+
+    def verify(self, password, encoded):
+        decoded = self._decode(encoded)
+        assert decoded['algorithm'] == self.algorithm
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=decoded['salt'].encode(), n=decoded['work_factor'], r=decoded['block_size'],
+            p=decoded['parallelism'], maxmem=self.maxmem, dklen=64
+        )
+        return constant_time_compare(base64.b64encode(hash_).decode('ascii').strip(), decoded['hash'])
+
+    def safe_summary(self, encoded):
+        decoded = self._decode(encoded)
+        return {
+            _('algorithm'): decoded['algorithm'],
+            _('work factor'): decoded['work_factor'],
+            _('block size'): decoded['block_size'],
+            _('parallelism'): decoded['parallelism'],
+            _('salt'): mask_hash(decoded['salt']),
+            _('hash'): mask_hash(decoded['hash']),
+        }
+
+    def must_update(self, encoded):
+        decoded = self._decode(encoded)
+        return (decoded['work_factor'], decoded['block_size'], decoded['parallelism']) != (
+            self.work_factor, self.block_size, self.parallelism
+        )
+
+    def harden_runtime(self, password, encoded):
+        # the memory cost of scrypt does not split into a remainder like the iterations of PBKDF2 do
+        pass
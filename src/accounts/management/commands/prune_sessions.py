@@ -0,0 +1,33 @@
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes expired sessions from the database in batches, which unlike clearsessions keeps every transaction '
+        'and lock short on large session tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='sessions deleted per query')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            self.stdout.write(f'{settings.SESSION_ENGINE} keeps no sessions in the database, they expire by themselves.')
+            return
+
+        model = store.get_model_class()
+        # a session extended since its batch was selected is no longer expired, so the delete checks again
+        expired = model.objects.filter(expire_date__lt=timezone.now())
+        batch_size = options['batch_size']
+        deleted = 0
+        while True:
+            batch = list(expired.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += expired.filter(pk__in=batch).delete()[0]
+        self.stdout.write(f'Deleted {deleted} expired sessions.')
@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='shares_free_time',
+            field=models.BooleanField(default=False, help_text='Lets other users search for free time together with this user.', verbose_name='shares free time'),
+        ),
+    ]
@@ -1,8 +1,15 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.utils.translation import gettext_lazy as _
 
 
 class CustomUser(AbstractUser):
     """ Easily extensible custom user model """
+    shares_free_time = models.BooleanField(
+        _('shares free time'),
+        default=False,
+        help_text=_('Lets other users search for free time together with this user.')
+    )
 
     def __str__(self):
         return str(self.username)
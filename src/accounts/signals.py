@@ -0,0 +1,18 @@
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.backends import bump_version
+from accounts.models import CustomUser
+
+
+@receiver([post_save, post_delete], sender=CustomUser)
+def invalidate_user(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    bump_version(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_logged_out_user(sender, request, user, **kwargs):  # pylint: disable=unused-argument
+    # an anonymous user can log out as well
+    if user is not None:
+        bump_version(user.pk)
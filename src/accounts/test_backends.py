@@ -0,0 +1,187 @@
+import os
+import runpy
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.backends import get_version
+from schedules.models import Schedule
+
+DATABASE_SESSIONS = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+# the settings leave the session and user caches off on the per-process LocMemCache, which the single test process shares
+CACHED_SESSIONS = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'AUTH_USER_CACHE_ENABLED': True,
+}
+
+
+class TestCacheSettings(TestCase):
+    @staticmethod
+    def load_settings(**environ):
+        names = ('SESSIONS_CACHE_BACKEND', 'SESSION_BACKEND', 'AUTH_USER_CACHE')
+        with mock.patch.dict(os.environ, {name: value for name, value in os.environ.items() if name not in names},
+                             clear=True):
+            os.environ.update(environ)
+            return runpy.run_path(settings.BASE_DIR / 'mmd_project' / 'settings.py')
+
+    def test_per_process_cache_turns_session_and_user_caches_off(self):
+        loaded = self.load_settings()
+
+        self.assertEqual(loaded['SESSION_ENGINE'], 'django.contrib.sessions.backends.db')
+        self.assertFalse(loaded['AUTH_USER_CACHE_ENABLED'])
+
+    def test_shared_cache_turns_session_and_user_caches_on(self):
+        loaded = self.load_settings(SESSIONS_CACHE_BACKEND='django.core.cache.backends.memcached.PyMemcacheCache')
+
+        self.assertEqual(loaded['SESSION_ENGINE'], 'django.contrib.sessions.backends.cached_db')
+        self.assertTrue(loaded['AUTH_USER_CACHE_ENABLED'])
+
+
+@override_settings(AUTH_USER_CACHE_ENABLED=True)
+class TestCachedModelBackend(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.client.login(username='user1', password='user1_password')
+        # the first request loads the user saved by the login
+        self.client.get('/')
+
+    def user_queries(self, path='/', client=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = (client or self.client).get(path)
+        return response, [query['sql'] for query in queries if 'accounts_customuser' in query['sql']]
+
+    def test_loads_user_from_cache(self):
+        response, queries = self.user_queries()
+
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(queries, [])
+
+    def test_reloads_saved_user(self):
+        self.user.first_name = 'new_name'
+        self.user.save()
+
+        response, queries = self.user_queries()
+
+        self.assertEqual(response.context['user'].first_name, 'new_name')
+        self.assertEqual(len(queries), 1)
+
+    def test_invalidates_user_on_logout(self):
+        version = get_version(self.user.pk)
+
+        self.client.post(reverse('logout'))
+
+        self.assertNotEqual(get_version(self.user.pk), version)
+
+    def test_password_change_ends_other_sessions(self):
+        other_client = Client()
+        other_client.login(username='user1', password='user1_password')
+
+        self.client.post(reverse('password_change'), {
+            'old_password': 'user1_password',
+            'new_password1': 'Longenoughpassword1!',
+            'new_password2': 'Longenoughpassword1!',
+        })
+
+        self.assertTrue(self.client.get('/').wsgi_request.user.is_authenticated)
+        self.assertFalse(other_client.get('/').wsgi_request.user.is_authenticated)
+
+    def test_keeps_sessions_logged_in_through_model_backend(self):
+        client = Client()
+        with override_settings(AUTHENTICATION_BACKENDS=['django.contrib.auth.backends.ModelBackend']):
+            client.login(username='user1', password='user1_password')
+
+        self.assertTrue(client.get('/').wsgi_request.user.is_authenticated)
+
+    def test_checks_rejected_password_once(self):
+        with mock.patch.object(ModelBackend, 'authenticate', autospec=True, return_value=None) as model_authenticate:
+            self.assertFalse(Client().login(username='user1', password='wrong_password'))
+
+        self.assertEqual(model_authenticate.call_count, 1)
+
+    @override_settings(AUTH_USER_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        _, queries = self.user_queries()
+
+        self.assertEqual(len(queries), 1)
+
+
+@override_settings(**CACHED_SESSIONS)
+class TestAuthenticatedRequestQueries(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='user1', password='user1_password')
+        self.schedule = Schedule.objects.create(name='schedule', author=self.user)
+
+    def count_queries(self, path):
+        client = Client()
+        client.force_login(self.user)
+        client.get(path)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(path)
+        return [query['sql'] for query in queries]
+
+    def test_skips_session_and_user_queries(self):
+        for path in [reverse('schedules:schedule_list'), reverse('schedules:schedule_detail', args=[self.schedule.pk])]:
+            with override_settings(**DATABASE_SESSIONS):
+                uncached = self.count_queries(path)
+            cached = self.count_queries(path)
+
+            self.assertEqual(len(cached), len(uncached) - 2)
+            self.assertFalse([sql for sql in cached if 'django_session' in sql or 'accounts_customuser' in sql])
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.db')
+class TestPruneSessions(TestCase):
+    def create_sessions(self, count, expire_date):
+        for number in range(count):
+            Session.objects.create(
+                session_key=f'{expire_date:%Y%m%d%H%M%S}{number}', session_data='', expire_date=expire_date
+            )
+
+    def test_deletes_expired_sessions_in_batches(self):
+        self.create_sessions(5, timezone.now() - timedelta(days=1))
+        self.create_sessions(2, timezone.now() + timedelta(days=1))
+        output = StringIO()
+
+        with self.assertNumQueries(3 * 2 + 1):
+            call_command('prune_sessions', batch_size=2, stdout=output)
+
+        self.assertEqual(Session.objects.count(), 2)
+        self.assertIn('Deleted 5 expired sessions.', output.getvalue())
+
+    def test_keeps_sessions_extended_since_their_batch_was_selected(self):
+        self.create_sessions(1, timezone.now() - timedelta(days=1))
+
+        with CaptureQueriesContext(connection) as queries:
+            call_command('prune_sessions', stdout=StringIO())
+
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn('expire_date', deletes[0])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_skips_sessions_kept_outside_of_database(self):
+        output = StringIO()
+
+        with self.assertNumQueries(0):
+            call_command('prune_sessions', stdout=output)
+
+        self.assertIn('expire by themselves', output.getvalue())
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from accounts.hashers import ScryptPasswordHasher
+
+
+class CheapScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = 2 ** 4
+
+
+class TestScryptPasswordHasher(SimpleTestCase):
+    def setUp(self):
+        self.hasher = CheapScryptPasswordHasher()
+
+    def test_verifies_own_hash(self):
+        encoded = self.hasher.encode('secret', self.hasher.salt())
+
+        self.assertTrue(self.hasher.verify('secret', encoded))
+        self.assertFalse(self.hasher.verify('other secret', encoded))
+
+    def test_stores_parameters_in_hash(self):
+        encoded = self.hasher.encode('secret', 'salt')
+
+        self.assertTrue(encoded.startswith('scrypt$16$salt$8$1$'))
+
+    def test_salts_hashes(self):
+        self.assertNotEqual(self.hasher.encode('secret', 'salt'), self.hasher.encode('secret', 'other_salt'))
+
+    def test_needs_update_when_work_factor_changed(self):
+        encoded = self.hasher.encode('secret', 'salt', work_factor=2 ** 3)
+
+        self.assertTrue(self.hasher.must_update(encoded))
+        self.assertFalse(self.hasher.must_update(self.hasher.encode('secret', 'salt')))
+
+    def test_verifies_hash_of_other_work_factor(self):
+        encoded = self.hasher.encode('secret', 'salt', work_factor=2 ** 3)
+
+        self.assertTrue(self.hasher.verify('secret', encoded))
+
+    def test_masks_summary(self):
+        summary = self.hasher.safe_summary(self.hasher.encode('secret', 'long_enough_salt'))
+
+        self.assertEqual(summary['work factor'], 2 ** 4)
+        self.assertNotIn('long_enough_salt', summary['salt'])
+
+
+class TestHashingProfiles(SimpleTestCase):
+    def test_tests_use_fast_profile(self):
+        self.assertEqual(settings.PASSWORD_HASHERS, settings.PASSWORD_HASHING_PROFILES['test'])
+
+    def test_production_profile_hashes_with_scrypt(self):
+        with override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHING_PROFILES['production']):
+            encoded = make_password('secret')
+
+            self.assertEqual(identify_hasher(encoded).algorithm, 'scrypt')
+            self.assertTrue(check_password('secret', encoded))
+
+    def test_production_profile_verifies_pbkdf2_hash(self):
+        encoded = make_password('secret', hasher='pbkdf2_sha256')
+
+        with override_settings(PASSWORD_HASHERS=settings.PASSWORD_HASHING_PROFILES['production']):
+            self.assertTrue(check_password('secret', encoded))
+
+
+@override_settings(PASSWORD_HASHERS=[
+    'accounts.test_hashers.CheapScryptPasswordHasher', 'django.contrib.auth.hashers.MD5PasswordHasher'
+])
+class TestRehashOnLogin(TestCase):
+    def login(self, password):
+        user = get_user_model().objects.create_user(username='user1')
+        user.password = password
+        user.save()
+
+        response = self.client.post(reverse('login'), {'username': 'user1', 'password': 'user1_password'})
+
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        return user.password
+
+    def test_upgrades_hash_of_other_hasher(self):
+        stored = self.login(make_password('user1_password', hasher='md5'))
+
+        self.assertEqual(identify_hasher(stored).algorithm, 'scrypt')
+
+    def test_upgrades_hash_of_other_work_factor(self):
+        stored = self.login(CheapScryptPasswordHasher().encode('user1_password', 'salt', work_factor=2 ** 3))
+
+        self.assertTrue(stored.startswith('scrypt$16$'))
+
+    def test_keeps_current_hash(self):
+        current = CheapScryptPasswordHasher().encode('user1_password', 'salt')
+
+        self.assertEqual(self.login(current), current)
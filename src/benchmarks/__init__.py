@@ -0,0 +1,16 @@
+"""
+Performance benchmarks for MakeMyDay.
+
+Benchmarks are plain scripts run from the ``src`` directory, e.g.::
+
+    python -m benchmarks.bench_collisions
+
+Importing this package configures Django, so the benchmark modules can import models at the top level.
+Every benchmark works on a throwaway test database and never touches ``db.sqlite3``.
+"""
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mmd_project.settings')
+django.setup()
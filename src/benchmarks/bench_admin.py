@@ -0,0 +1,94 @@
+"""
+Queries and time of the admin pages with the scalable admin options against the plain ModelAdmin defaults.
+
+The defaults load the author of every listed schedule one by one, count every changelist twice in full, render all
+entries of a schedule inline and list every user in the select of the author of a schedule.
+
+    python -m benchmarks.bench_admin --users 200 --entries 200
+"""
+import argparse
+from contextlib import ExitStack
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.forms.models import BaseInlineFormSet
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import QueryCounter, benchmark_database, measure, print_table
+from benchmarks.data import generate
+from schedules import admin
+from schedules.models import Schedule, ScheduleEntry
+
+# the registered admins read the options from their classes
+DEFAULTS = {
+    admin.ScheduleAdmin: {'list_select_related': False, 'raw_id_fields': (), 'paginator': Paginator, 'show_full_result_count': True},
+    admin.ScheduleEntryAdmin: {
+        'list_select_related': False, 'raw_id_fields': (), 'paginator': Paginator, 'show_full_result_count': True,
+        'list_filter': ('day', 'schedule__author'),
+    },
+}
+
+
+def _defaults():
+    """ Patches the registered admins back to the ModelAdmin defaults """
+    stack = ExitStack()
+    for model_admin, options in DEFAULTS.items():
+        stack.enter_context(mock.patch.multiple(model_admin, **options))
+    stack.enter_context(mock.patch.object(admin.ScheduleEntryInline, 'formset', BaseInlineFormSet))
+    return stack
+
+
+def _pages(schedule, entry):
+    return [
+        ('schedule list', reverse('admin:schedules_schedule_changelist')),
+        ('schedule page', reverse('admin:schedules_schedule_change', args=[schedule.pk])),
+        ('entry list', reverse('admin:schedules_scheduleentry_changelist')),
+        ('entry list, by day', reverse('admin:schedules_scheduleentry_changelist') + '?day__exact=2'),
+        ('entry page', reverse('admin:schedules_scheduleentry_change', args=[entry.pk])),
+    ]
+
+
+def _run(client, path, repeat):
+    def run():
+        response = client.get(path)
+        assert response.status_code == 200, response.status_code
+        return response
+
+    queries = QueryCounter()
+    with queries:
+        size = len(run().content)
+    return queries.count, size, measure(run, repeat=repeat)['median']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--entries', type=int, default=200, help='entries per schedule')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        generate(args.users, 1, args.entries)
+        client = Client()
+        client.force_login(get_user_model().objects.create_superuser(username='admin', password='admin_password'))
+        schedule = Schedule.objects.order_by('pk').first()
+        entry = schedule.scheduleentry_set.first()
+        for name, path in _pages(schedule, entry):
+            with _defaults():
+                before = _run(client, path, args.repeat)
+            after = _run(client, path, args.repeat)
+            rows.append((
+                name, before[0], after[0], before[1], after[1], f'{before[2]:.1f}', f'{after[2]:.1f}',
+            ))
+
+    print(f'{args.users} schedules of {args.entries} entries\n')
+    print_table(
+        ('page', 'queries before', 'queries after', 'bytes before', 'bytes after', 'ms before', 'ms after'), rows
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+Concurrent connection capacity of the ASGI application with the async views against a threaded WSGI deployment.
+
+Both applications run in-process without a server. Every connection sends its requests one after another, and the
+slow clients take --client-delay ms to read each response. A WSGI worker thread waits for that in its write, so
+--workers threads serve at most as many connections at a time, while the ASGI application awaits the write on the
+event loop. The synchronous views served by the ASGI application show what the handler alone changes. Runs against a
+database file, see benchmarks.loadtest.
+
+    python -m benchmarks.bench_asgi --connections 10 100 --client-delay 50 --workers 8
+"""
+import argparse
+import asyncio
+import io
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import connections as database_connections
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, print_table, summarize
+from benchmarks.data import generate
+
+
+def _wsgi_phase(path, cookie, args, connection_count):
+    """ Latencies of connection_count client threads served by a WSGI server with args.workers threads """
+    application = get_wsgi_application()
+    workers = threading.BoundedSemaphore(args.workers)
+    samples = []
+
+    def handle():
+        status = []
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1', 'HTTP_HOST': 'testserver', 'HTTP_COOKIE': cookie,
+            'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+        response = application(environ, lambda response_status, headers: status.append(response_status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        # the worker blocks in the write until the slow client has read the response
+        time.sleep(args.client_delay / 1000)
+        return status[0].startswith('200')
+
+    def connection():
+        try:
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                with workers:
+                    succeeded = handle()
+                samples.append(((time.perf_counter() - start) * 1000, succeeded))
+        finally:
+            database_connections.close_all()
+
+    threads = [threading.Thread(target=connection) for _ in range(connection_count)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - start
+
+
+def _asgi_phase(path, cookie, args, connection_count):
+    """ Latencies of connection_count connections served by the ASGI application on one event loop """
+    application = get_asgi_application()
+    samples = []
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'query_string': b'', 'server': ('testserver', 80), 'client': ('127.0.0.1', 0),
+        'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+    }
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def handle():
+        status = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+            elif not message.get('more_body'):
+                await asyncio.sleep(args.client_delay / 1000)
+
+        await application(dict(scope), receive, send)
+        return status[0] == 200
+
+    async def connection():
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            succeeded = await handle()
+            samples.append(((time.perf_counter() - start) * 1000, succeeded))
+
+    async def run_all():
+        await asyncio.gather(*(connection() for _ in range(connection_count)))
+
+    start = time.perf_counter()
+    asyncio.run(run_all())
+    return samples, time.perf_counter() - start
+
+
+def _row(name, connection_count, samples, seconds):
+    latency = summarize([milliseconds for milliseconds, _succeeded in samples])
+    return (
+        name,
+        connection_count,
+        f"{latency['median']:.1f}",
+        f"{latency['p95']:.1f}",
+        f'{len(samples) / seconds:.0f}',
+        sum(not succeeded for _milliseconds, succeeded in samples),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--requests', type=int, default=10, help='requests per connection')
+    parser.add_argument('--workers', type=int, default=8, help='threads of the WSGI server')
+    parser.add_argument('--client-delay', type=float, default=50, help='ms a client takes to read a response')
+    parser.add_argument('--entries', type=int, default=100, help='entries of the requested schedule')
+    args = parser.parse_args()
+
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        with benchmark_database(str(Path(directory) / 'asgi.sqlite3')):
+            user = generate(1, 1, args.entries)[0]
+            client = Client()
+            client.force_login(user)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            pk = user.schedule_set.get().pk
+            sync_path = reverse('schedules:schedule_detail', args=[pk])
+            async_path = reverse('schedules:schedule_detail_async', args=[pk])
+            for connection_count in args.connections:
+                for name, phase, path in (
+                        (f'WSGI, {args.workers} threads, sync view', _wsgi_phase, sync_path),
+                        ('ASGI, sync view', _asgi_phase, sync_path),
+                        ('ASGI, async view', _asgi_phase, async_path),
+                ):
+                    rows.append(_row(name, connection_count, *phase(path, cookie, args, connection_count)))
+
+    print(f'Schedule page, clients reading a response for {args.client_delay:g} ms\n')
+    print_table(('deployment', 'connections', 'p50 ms', 'p95 ms', 'requests/s', 'errors'), rows)
+
+
+if __name__ == '__main__':
+    main()
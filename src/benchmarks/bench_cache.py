@@ -0,0 +1,69 @@
+"""
+Compares cold and warm request latency of the cached schedule pages.
+
+Cold requests start from an empty cache, warm ones are served from the cached week and fragments.
+
+    python -m benchmarks.bench_cache --entries 10 100 1000
+"""
+import argparse
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, measure, print_table
+from schedules.cache import get_cache, stats
+from schedules.models import Schedule, ScheduleEntry
+
+
+def _create_schedule(author, size):
+    schedule = Schedule.objects.create(name=f'{size} entries', author=author)
+    ScheduleEntry.objects.bulk_create(
+        ScheduleEntry(
+            schedule=schedule,
+            title=f'entry {i}',
+            day=str(i % 7),
+            start_time=time(*divmod(i // 7 * 5, 60)),
+            end_time=time(*divmod(i // 7 * 5 + 4, 60))
+        )
+        for i in range(size)
+    )
+    return schedule
+
+
+def _cold(client, path):
+    def run():
+        get_cache().clear()
+        client.get(path)
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        client = Client()
+        client.force_login(author)
+
+        pages = [('list', reverse('schedules:schedule_list'))]
+        for size in args.entries:
+            schedule = _create_schedule(author, size)
+            pages.append((f'detail, {size} entries', reverse('schedules:schedule_detail', args=[schedule.pk])))
+
+        rows = []
+        for name, path in pages:
+            cold = measure(_cold(client, path), repeat=args.repeat)
+            warm = measure(lambda path=path: client.get(path), repeat=args.repeat)
+            rows.append((name, f"{cold['median']:.2f}", f"{warm['median']:.2f}", f"{cold['median'] / warm['median']:.1f}x"))
+
+    print_table(('page', 'cold ms', 'warm ms', 'speedup'), rows)
+    print(f'\nCache counters: {stats.as_dict()}')
+
+
+if __name__ == '__main__':
+    main()
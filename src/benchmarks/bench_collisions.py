@@ -0,0 +1,102 @@
+"""
+Measures ScheduleEntry.full_clean() latency while the entries table grows.
+
+The validated schedule always holds the same number of entries, only the rest of the table grows, so with the
+(schedule, day, start_time, end_time) index the latency should stay flat.
+
+    python -m benchmarks.bench_collisions --sizes 1000 10000 100000 1000000
+"""
+import argparse
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+
+from benchmarks.common import benchmark_database, measure, print_table
+from schedules.models import Schedule, ScheduleEntry
+
+DAYS = [day for day, _ in ScheduleEntry.DayInWeek.choices]
+HOURS = range(8, 16)
+ENTRIES_PER_SCHEDULE = len(DAYS) * len(HOURS)
+BATCH_SIZE = 10000
+
+
+def _entries_for(schedule_ids):
+    for schedule_id in schedule_ids:
+        for day in DAYS:
+            for hour in HOURS:
+                yield ScheduleEntry(
+                    schedule_id=schedule_id,
+                    title='entry',
+                    day=day,
+                    start_time=time(hour),
+                    end_time=time(hour, 45)
+                )
+
+
+def _grow_table(author, rows):
+    schedules_needed = max(0, rows // ENTRIES_PER_SCHEDULE - Schedule.objects.count())
+    schedules = Schedule.objects.bulk_create(
+        [Schedule(name='filler', author=author) for _ in range(schedules_needed)],
+        batch_size=BATCH_SIZE
+    )
+    if not schedules:
+        return
+
+    first_id = Schedule.objects.order_by('-pk').values_list('pk', flat=True)[schedules_needed - 1]
+    batch = []
+    for entry in _entries_for(range(first_id, first_id + schedules_needed)):
+        batch.append(entry)
+        if len(batch) == BATCH_SIZE:
+            ScheduleEntry.objects.bulk_create(batch)
+            batch = []
+    ScheduleEntry.objects.bulk_create(batch)
+
+
+def _validation_cases(schedule):
+    free = ScheduleEntry(schedule=schedule, title='free', day=DAYS[0], start_time='16:00', end_time='17:00')
+    taken = ScheduleEntry(schedule=schedule, title='taken', day=DAYS[0], start_time='7:30', end_time='18:00')
+    return free, taken
+
+
+def _validate(entry, collides):
+    def run():
+        try:
+            entry.full_clean()
+        except ValidationError:
+            if not collides:
+                raise
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        schedule = Schedule.objects.create(name='validated', author=author)
+        ScheduleEntry.objects.bulk_create(_entries_for([schedule.pk]))
+        free, taken = _validation_cases(schedule)
+
+        rows = []
+        for size in sorted(args.sizes):
+            _grow_table(author, size)
+            total = ScheduleEntry.objects.count()
+            free_stats = measure(_validate(free, collides=False), repeat=args.repeat)
+            taken_stats = measure(_validate(taken, collides=True), repeat=args.repeat)
+            rows.append((
+                f'{total:,}',
+                f"{free_stats['median']:.3f}", f"{free_stats['p95']:.3f}",
+                f"{taken_stats['median']:.3f}", f"{taken_stats['p95']:.3f}",
+            ))
+
+        print_table(('rows', 'free median ms', 'free p95 ms', 'taken median ms', 'taken p95 ms'), rows)
+
+        print('\nQuery plan:', ScheduleEntry.objects.overlapping(schedule.pk, DAYS[0], time(16), time(17)).explain())
+
+
+if __name__ == '__main__':
+    main()
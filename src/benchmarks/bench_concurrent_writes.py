@@ -0,0 +1,132 @@
+"""
+Fires concurrent, mostly overlapping entry creations at one schedule through the views and counts overlapping
+entries which got stored, rejected requests, of them the ones failing with "database is locked", and the throughput,
+for the SQLite settings of the project and for the SQLite defaults. Runs against a database file, as the in-memory
+test database of SQLite does not show the locking behaviour of a real deployment.
+
+    python -m benchmarks.bench_concurrent_writes --threads 16 --requests 25
+"""
+import argparse
+import logging
+import random
+import tempfile
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, print_table
+from schedules.models import Schedule, ScheduleEntry
+
+OVERLAPS_QUERY = '''
+    SELECT COUNT(*) FROM schedules_scheduleentry AS a JOIN schedules_scheduleentry AS b
+    ON a.schedule_id = b.schedule_id AND a.day = b.day AND a.id < b.id
+    AND a.start_time < b.end_time AND b.start_time < a.end_time
+'''
+
+
+def _worker(client, path, request_count, seed, results):
+    generator = random.Random(seed)
+    counts = {'created': 0, 'rejected': 0, 'locked': 0}
+    try:
+        for _ in range(request_count):
+            # half hour entries starting at any quarter overlap often
+            start = generator.randrange(8 * 4, 20 * 4)
+            try:
+                response = client.post(path, {
+                    'title': 'entry',
+                    'day': generator.randrange(7),
+                    'start_time': f'{start // 4:02}:{start % 4 * 15:02}',
+                    'end_time': f'{(start + 2) // 4:02}:{(start + 2) % 4 * 15:02}',
+                })
+            except OperationalError as error:
+                if 'locked' not in str(error):
+                    raise
+                # the server would answer with an error, so the entry is rejected all the same
+                counts['rejected'] += 1
+                counts['locked'] += 1
+                continue
+            counts['created' if response.status_code == 302 else 'rejected'] += 1
+    finally:
+        connections.close_all()
+    results.append(counts)
+
+
+def _logged_in_clients(user, count):
+    clients = [Client() for _ in range(count)]
+    for client in clients:
+        client.force_login(user)
+    return clients
+
+
+def _count_overlaps():
+    with connection.cursor() as cursor:
+        cursor.execute(OVERLAPS_QUERY)
+        return cursor.fetchone()[0]
+
+
+def _run(user, threads, request_count, options, transactional):
+    """ Returns a table row with the outcome of the requests, the stored overlaps and the requests per second """
+    ScheduleEntry.objects.all().delete()
+    path = reverse(
+        'schedules:scheduleentry_create', args=[Schedule.objects.create(name='contended', author=user).pk]
+    )
+    clients = _logged_in_clients(user, threads)
+    connection.close()
+    connection.settings_dict['OPTIONS'] = options
+
+    results = []
+    workers = [
+        threading.Thread(target=_worker, args=(client, path, request_count, seed, results))
+        for seed, client in enumerate(clients)
+    ]
+    with nullcontext() if transactional else mock.patch('schedules.views.entry_transaction', nullcontext):
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        seconds = time.perf_counter() - start
+
+    totals = [sum(counts[key] for counts in results) for key in ('created', 'rejected', 'locked')]
+    return (*totals, _count_overlaps(), f'{threads * request_count / seconds:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=25, help='requests per thread')
+    args = parser.parse_args()
+
+    project_options = dict(connection.settings_dict['OPTIONS'])
+    # WAL sticks to the database file, so the defaults have to switch back to the rollback journal explicitly. They
+    # wait for locks as long as the project settings do, which keeps the count of the overlaps from failing on one.
+    default_options = {'timeout': project_options.get('timeout', 20), 'init_command': 'PRAGMA journal_mode=DELETE'}
+    setups = [
+        ('defaults, check outside a transaction', default_options, False),
+        ('defaults, check in a transaction', default_options, True),
+        ('project settings', project_options, True),
+    ]
+    # the lock errors of the defaults are counted, not logged
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        with benchmark_database(str(Path(directory) / 'bench.sqlite3')):
+            user = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+            for name, options, transactional in setups:
+                rows.append((name, *_run(user, args.threads, args.requests, options, transactional)))
+            connection.settings_dict['OPTIONS'] = project_options
+
+    print_table(('setup', 'created', 'rejected', 'of them locked', 'overlaps', 'requests/s'), rows)
+    if any(rows[-1][3:5]):
+        raise SystemExit('The project settings let overlapping entries or lock errors through.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares duplicating a schedule in bulk against re-creating its entries one form submission at a time.
+
+    python -m benchmarks.bench_copy --entries 1000
+"""
+import argparse
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+
+from benchmarks.bench_import import _rows
+from benchmarks.common import QueryCounter, benchmark_database, print_table
+from schedules.models import Schedule, ScheduleEntry
+
+
+def _duplicate(schedule):
+    return schedule.duplicate('copy')
+
+
+def _one_by_one(schedule):
+    copy = Schedule.objects.create(name='copy', author_id=schedule.author_id)
+    for entry in schedule.scheduleentry_set.all():
+        entry.pk = None
+        entry.schedule = copy
+        entry.full_clean()
+        entry.save()
+    return copy
+
+
+def _run(schedule, strategy, repeat):
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            copy = strategy(schedule)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = counter.count
+        assert copy.scheduleentry_set.count() == schedule.scheduleentry_set.count()
+    return statistics.median(timings), queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        schedule = Schedule.objects.create(name='original', author=author)
+        ScheduleEntry.objects.bulk_create(ScheduleEntry(schedule=schedule, **row) for row in _rows(args.entries))
+        results = [
+            ('duplicate', *_run(schedule, _duplicate, args.repeat)),
+            ('one by one', *_run(schedule, _one_by_one, args.repeat)),
+        ]
+
+    print_table(
+        ('strategy', 'median ms', 'queries'),
+        [(name, f'{median:.1f}', queries) for name, median, queries in results]
+    )
+
+
+if __name__ == '__main__':
+    main()
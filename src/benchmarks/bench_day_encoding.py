@@ -0,0 +1,111 @@
+"""
+Measures the interval index and the day queries of ScheduleEntry before and after migrating day from the strings
+"0".."6" to small integers, along with the time the migration takes.
+
+    python -m benchmarks.bench_day_encoding --entries 200000
+"""
+import argparse
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from benchmarks.common import benchmark_database, measure, print_table
+
+BEFORE = [('schedules', '0006_auto_20261018_1628')]
+AFTER = [('schedules', '0009_scheduleentry_day_integer')]
+INDEX = 'scheduleentry_interval_idx'
+ENTRIES_PER_SCHEDULE = 1000
+
+COLLISION_QUERY = (
+    'SELECT 1 FROM schedules_scheduleentry '
+    'WHERE schedule_id = %s AND day = %s AND start_time < %s AND end_time > %s LIMIT 1'
+)
+WEEK_QUERY = (
+    'SELECT day, start_time, end_time FROM schedules_scheduleentry '
+    'WHERE schedule_id = %s ORDER BY day, start_time'
+)
+
+
+def _migrate(targets):
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(targets)
+
+
+def _index_size():
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT pg_relation_size(%s)', [INDEX])
+        else:
+            cursor.execute('SELECT SUM(pgsize) FROM dbstat WHERE name = %s', [INDEX])
+        return cursor.fetchone()[0]
+
+
+def _fill(entry_count):
+    author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+    with connection.cursor() as cursor:
+        schedule_count = max(1, entry_count // ENTRIES_PER_SCHEDULE)
+        cursor.executemany(
+            'INSERT INTO schedules_schedule (name, author_id) VALUES (%s, %s)',
+            [(f'schedule {i}', author.pk) for i in range(schedule_count)]
+        )
+        cursor.execute('SELECT MIN(id) FROM schedules_schedule')
+        first_schedule = cursor.fetchone()[0]
+        cursor.executemany(
+            'INSERT INTO schedules_scheduleentry (schedule_id, title, description, day, start_time, end_time) '
+            'VALUES (%s, %s, %s, %s, %s, %s)',
+            [
+                (
+                    first_schedule + i % schedule_count, 'entry', '', str(i // schedule_count % 7),
+                    f'{i // schedule_count // 7 % 143 // 6:02}:{i // schedule_count // 7 % 143 % 6 * 10:02}:00',
+                    f'{i // schedule_count // 7 % 143 // 6:02}:{i // schedule_count // 7 % 143 % 6 * 10 + 5:02}:00',
+                )
+                for i in range(entry_count)
+            ]
+        )
+        return first_schedule
+
+
+def _query_timings(first_schedule, day, repeat):
+    def run(sql, params):
+        def query():
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                cursor.fetchall()
+        return measure(query, repeat=repeat)['median']
+
+    collision = run(COLLISION_QUERY, [first_schedule, day, '12:00:00', '11:00:00'])
+    week = run(WEEK_QUERY, [first_schedule])
+    return collision, week
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        _migrate(BEFORE)
+        first_schedule = _fill(args.entries)
+        before = (_index_size(), *_query_timings(first_schedule, '3', args.repeat))
+
+        start = time.perf_counter()
+        _migrate(AFTER)
+        migration_seconds = time.perf_counter() - start
+        after = (_index_size(), *_query_timings(first_schedule, 3, args.repeat))
+
+    print_table(
+        ('day', 'index KiB', 'collision check ms', 'week ms'),
+        [
+            (label, f'{size / 1024:.0f}', f'{collision:.3f}', f'{week:.3f}')
+            for label, (size, collision, week) in (('text', before), ('integer', after))
+        ]
+    )
+    print(f'migrating {args.entries} entries took {migration_seconds:.1f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures ScheduleDetailView rendering time for schedules of growing size.
+
+The legacy column shows the previous template which scanned every entry once per day of the week.
+
+    python -m benchmarks.bench_detail_render --sizes 10 100 1000
+"""
+import argparse
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.template import Context, Template
+from django.test import RequestFactory
+
+from benchmarks.common import benchmark_database, measure, print_table
+from schedules.models import Schedule, ScheduleEntry
+from schedules.views import ScheduleDetailView
+
+LEGACY_TEMPLATE = Template('''
+    {% with 'Monday Tuesday Wednesday Thursday Friday Saturday Sunday' as list %}
+        {% for day in list.split %}
+            <h3>{{ day }}</h3>
+            {% for entry in object.scheduleentry_set.all %}
+                {% if entry.get_day_display == day %}
+                    <h4>{{ entry.title }}</h4>
+                    <p>{{ entry.description }}</p>
+                    <p>{{ entry.start_time }}-{{ entry.end_time }}</p>
+                    <a href="{% url 'schedules:scheduleentry_delete' object.pk entry.pk %}">Delete</a>
+                    <a href="{% url 'schedules:scheduleentry_update' object.pk entry.pk %}">Edit</a>
+                {% endif %}
+            {% endfor %}
+        {% endfor %}
+    {% endwith %}
+''')
+
+
+def _create_schedule(author, size):
+    schedule = Schedule.objects.create(name=f'{size} entries', author=author)
+    ScheduleEntry.objects.bulk_create(
+        ScheduleEntry(
+            schedule=schedule,
+            title=f'entry {i}',
+            description='description',
+            day=str(i % 7),
+            start_time=time(*divmod(i // 7 * 5, 60)),
+            end_time=time(*divmod(i // 7 * 5 + 4, 60))
+        )
+        for i in range(size)
+    )
+    return schedule
+
+
+def _render_view(author, schedule):
+    request = RequestFactory().get(f'/schedules/{schedule.pk}/')
+    request.user = author
+    view = ScheduleDetailView.as_view()
+    return lambda: view(request, pk=schedule.pk).render()
+
+
+def _render_legacy(schedule):
+    return lambda: LEGACY_TEMPLATE.render(Context({'object': schedule}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+
+        rows = []
+        for size in args.sizes:
+            schedule = _create_schedule(author, size)
+            view_stats = measure(_render_view(author, schedule), repeat=args.repeat)
+            legacy_stats = measure(_render_legacy(schedule), repeat=args.repeat)
+            rows.append((
+                size,
+                f"{view_stats['median']:.2f}", f"{view_stats['median'] * 1000 / size:.1f}",
+                f"{legacy_stats['median']:.2f}", f"{legacy_stats['median'] * 1000 / size:.1f}",
+            ))
+
+        print_table(('entries', 'view ms', 'view us/entry', 'legacy ms', 'legacy us/entry'), rows)
+
+
+if __name__ == '__main__':
+    main()
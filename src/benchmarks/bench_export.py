@@ -0,0 +1,99 @@
+"""
+Measures time-to-first-byte, total time and peak memory of the streaming exports.
+
+The buffered column renders the same document in memory first, which is what a non-streaming response would do.
+
+    python -m benchmarks.bench_export --entries 100000
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+from datetime import time as clock
+
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, print_table
+from schedules.exports import export_rows, iter_csv, iter_ical
+from schedules.models import Schedule, ScheduleEntry
+
+ENTRIES_PER_SCHEDULE = 1000
+
+
+def _create_entries(author, count):
+    for first in range(0, count, ENTRIES_PER_SCHEDULE):
+        schedule = Schedule.objects.create(name=f'schedule {first // ENTRIES_PER_SCHEDULE}', author=author)
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(
+                schedule=schedule,
+                title=f'entry {i}',
+                description='exported entry',
+                day=str(i % 7),
+                start_time=clock(*divmod(i // 7 * 5, 60)),
+                end_time=clock(*divmod(i // 7 * 5 + 4, 60))
+            )
+            for i in range(min(ENTRIES_PER_SCHEDULE, count - first))
+        )
+
+
+def _streamed(client, export_format):
+    response = client.get(reverse('schedules:schedule_list_export', args=[export_format]))
+    chunks = iter(response.streaming_content)
+    start = time.perf_counter()
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    return first_byte, time.perf_counter() - start, size
+
+
+def _buffered(author, export_format):
+    entries = ScheduleEntry.objects.filter(schedule__author=author)
+    start = time.perf_counter()
+    rows = list(export_rows(entries))
+    chunks = iter_csv(rows) if export_format == 'csv' else iter_ical(rows, 'schedules')
+    content = ''.join(chunks).encode()
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, len(content)
+
+
+def _profile(func, *args):
+    first_byte, total, size = func(*args)
+    # tracemalloc slows allocations down a lot, so memory is measured in a separate run
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_byte * 1000, total * 1000, size, peak / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100000)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        _create_entries(author, args.entries)
+        client = Client()
+        client.force_login(author)
+
+        rows = []
+        for export_format in ('csv', 'ics'):
+            for mode, result in (
+                    ('streamed', _profile(_streamed, client, export_format)),
+                    ('buffered', _profile(_buffered, author, export_format)),
+            ):
+                first_byte, total, size, peak = result
+                rows.append((
+                    export_format, mode, f'{first_byte:.1f}', f'{total:.0f}', f'{size / 2 ** 20:.1f}', f'{peak:.1f}'
+                ))
+
+    print_table(('format', 'mode', 'TTFB ms', 'total ms', 'size MiB', 'peak heap MiB'), rows)
+    print(f'\nProcess peak RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Times the free time search over users with many entries each, for one user and for all of them together.
+
+    python -m benchmarks.bench_freetime --entries 10000 --users 3
+"""
+import argparse
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from benchmarks.common import benchmark_database, measure, print_table
+from schedules.freetime import find_free_time
+from schedules.models import Schedule, ScheduleEntry
+
+SCHEDULES_PER_USER = 4
+
+
+def _create_user(number, entry_count):
+    """ Spreads entry_count short entries, one a minute, over the week and over a few schedules of a new user """
+    user = get_user_model().objects.create_user(username=f'benchmark{number}', password='benchmark')
+    schedules = [Schedule.objects.create(name=f'schedule {i}', author=user) for i in range(SCHEDULES_PER_USER)]
+    ScheduleEntry.objects.bulk_create(
+        ScheduleEntry(
+            schedule=schedules[i % SCHEDULES_PER_USER],
+            title=f'entry {i}',
+            day=str(i % 7),
+            # shifted by the user number so that the busy time of users differs
+            start_time=f'{(i // 7 + number) % 1440 // 60:02}:{(i // 7 + number) % 60:02}:00',
+            end_time=f'{(i // 7 + number) % 1440 // 60:02}:{(i // 7 + number) % 60:02}:40'
+        )
+        for i in range(entry_count)
+    )
+    return user, schedules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=10000, help='entries per user, up to 10080')
+    parser.add_argument('--users', type=int, default=3)
+    parser.add_argument('--min-duration', type=int, default=30, help='minutes')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    min_duration = timedelta(minutes=args.min_duration)
+    with benchmark_database():
+        users = [_create_user(number, args.entries) for number in range(args.users)]
+        _user, schedules = users[0]
+        participants = [participant for participant, _schedules in users[1:]]
+        cases = [
+            ('one day, one user', lambda: find_free_time(schedules, [2], min_duration)),
+            ('week, one user', lambda: find_free_time(schedules, range(7), min_duration)),
+            (f'week, {args.users} users', lambda: find_free_time(schedules, range(7), min_duration, participants)),
+        ]
+        rows = []
+        for cache_enabled in (False, True):
+            with override_settings(SCHEDULES_CACHE_ENABLED=cache_enabled):
+                for name, search in cases:
+                    timings = measure(search, repeat=args.repeat)
+                    rows.append((
+                        name,
+                        'warm' if cache_enabled else 'off',
+                        len(search()),
+                        *(f'{timings[key]:.2f}' for key in ('min', 'median', 'p95'))
+                    ))
+
+    print_table(('search', 'cache', 'free slots', 'min ms', 'median ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
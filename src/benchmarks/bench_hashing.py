@@ -0,0 +1,61 @@
+"""
+Compares the password hashing profiles of the PASSWORD_HASHING_PROFILES setting and Django's default PBKDF2.
+
+Every case runs in one thread, so its throughput is the number of logins or password checks per second a single core
+serves. The check column verifies a stored hash alone, the login column posts the login form, i.e. adds the queries,
+the session and the redirect.
+
+    python -m benchmarks.bench_hashing --repeat 20
+"""
+import argparse
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, measure, print_table
+from benchmarks.data import PASSWORD
+
+DJANGO_DEFAULT_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+
+
+def _login(username):
+    def run():
+        # a logged in client would be redirected without checking the password
+        response = Client().post(reverse('login'), {'username': username, 'password': PASSWORD})
+        assert response.status_code == 302
+    return run
+
+
+def _per_second(timings):
+    return f"{1000 / timings['median']:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    profiles = {'django default': DJANGO_DEFAULT_HASHERS, **settings.PASSWORD_HASHING_PROFILES}
+    rows = []
+    with benchmark_database():
+        for number, (name, hashers) in enumerate(profiles.items()):
+            with override_settings(PASSWORD_HASHERS=hashers):
+                encoded = make_password(PASSWORD)
+                user = get_user_model().objects.create(username=f'user{number}', password=encoded)
+                check = measure(lambda encoded=encoded: check_password(PASSWORD, encoded), args.repeat, warmup=1)
+                login = measure(_login(user.username), args.repeat, warmup=1)
+            rows.append((
+                name, encoded.split('$', 1)[0], f"{check['median']:.2f}", _per_second(check), _per_second(login)
+            ))
+
+    print_table(('profile', 'hasher', 'check ms', 'checks/s/core', 'logins/s/core'), rows)
+
+
+if __name__ == '__main__':
+    main()
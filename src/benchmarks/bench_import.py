@@ -0,0 +1,72 @@
+"""
+Compares the bulk import against adding the same entries one form submission at a time.
+
+    python -m benchmarks.bench_import --rows 1000
+"""
+import argparse
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+
+from benchmarks.common import QueryCounter, benchmark_database, print_table
+from schedules.imports import import_entries
+from schedules.models import Schedule, ScheduleEntry
+
+
+def _rows(count):
+    # five minute slots keep up to 2016 entries free of collisions
+    return [
+        {
+            'title': f'entry {i}',
+            'day': str(i % 7),
+            'start_time': f'{i // 7 * 5 // 60}:{i // 7 * 5 % 60:02}',
+            'end_time': f'{(i // 7 * 5 + 4) // 60}:{(i // 7 * 5 + 4) % 60:02}',
+        }
+        for i in range(count)
+    ]
+
+
+def _one_by_one(schedule, rows):
+    for row in rows:
+        entry = ScheduleEntry(schedule=schedule, **row)
+        entry.full_clean()
+        entry.save()
+
+
+def _run(author, strategy, rows, repeat):
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        schedule = Schedule.objects.create(name='imported', author=author)
+        with QueryCounter() as counter:
+            start = time.perf_counter()
+            strategy(schedule, rows)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = counter.count
+        assert schedule.scheduleentry_set.count() == len(rows)
+    return statistics.median(timings), queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    rows = _rows(args.rows)
+    with benchmark_database():
+        author = get_user_model().objects.create_user(username='benchmark', password='benchmark')
+        results = [
+            ('bulk import', *_run(author, import_entries, rows, args.repeat)),
+            ('one by one', *_run(author, _one_by_one, rows, args.repeat)),
+        ]
+
+    print_table(
+        ('strategy', 'median ms', 'queries'),
+        [(name, f'{median:.1f}', queries) for name, median, queries in results]
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Compares the statistics query of the schedule list computed from the day summaries against aggregating the entries.
+
+    python -m benchmarks.bench_list_summaries --entries 10 100 1000
+"""
+import argparse
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Sum
+
+from benchmarks.common import benchmark_database, measure, print_table
+from benchmarks.data import generate
+from schedules.models import Schedule
+
+PAGE_SIZE = 20
+
+
+def _from_entries(author):
+    return Schedule.objects.filter(author=author).annotate(
+        entry_count=Count('scheduleentry'),
+        scheduled_time=Sum(
+            ExpressionWrapper(F('scheduleentry__end_time') - F('scheduleentry__start_time'), output_field=DurationField())
+        ),
+        earliest_start=Min('scheduleentry__start_time'),
+        latest_end=Max('scheduleentry__end_time')
+    ).order_by('name', 'pk')
+
+
+def _from_summaries(author):
+    return Schedule.objects.filter(author=author).annotate(
+        entry_count=Sum('day_summaries__entry_count'),
+        busy_seconds=Sum('day_summaries__busy_seconds'),
+        earliest_start=Min('day_summaries__first_start'),
+        latest_end=Max('day_summaries__last_end')
+    ).order_by('name', 'pk')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[10, 100, 1000], help='entries per schedule')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        for size in args.entries:
+            author = generate(1, PAGE_SIZE, size, prefix=f'{size}-entries-')[0]
+            entries = measure(lambda author=author: list(_from_entries(author)[:PAGE_SIZE]), repeat=args.repeat)
+            summaries = measure(lambda author=author: list(_from_summaries(author)[:PAGE_SIZE]), repeat=args.repeat)
+            rows.append((
+                size, f"{entries['median']:.2f}", f"{summaries['median']:.2f}",
+                f"{entries['median'] / summaries['median']:.1f}x"
+            ))
+
+    print_table(('entries per schedule', 'entries ms', 'summaries ms', 'speedup'), rows)
+
+
+if __name__ == '__main__':
+    main()
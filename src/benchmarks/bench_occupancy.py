@@ -0,0 +1,108 @@
+"""
+Compares the collision checks of the occupancy index against the SQL checks on a schedule with thousands of entries.
+
+The cold rows rebuild the index first, which is what the first check after every change of the schedule pays.
+
+    python -m benchmarks.bench_occupancy --entries 1000 5000 --rows 500
+"""
+import argparse
+import time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.test import override_settings
+
+from benchmarks.common import benchmark_database, print_table, summarize
+from benchmarks.data import generate
+from schedules.cache import get_cache
+from schedules.imports import import_entries
+from schedules.models import ScheduleEntry
+from schedules.occupancy import numpy
+
+# the generated entries fill the days from midnight on, five minutes a day per seven entries, up to 17:50 for 1500
+EVENING_HOURS = range(21, 24)
+
+
+def _validate(entry, collides):
+    def run():
+        try:
+            entry.full_clean(exclude=['schedule'])
+        except ValidationError:
+            if not collides:
+                raise
+    return run
+
+
+def _import(schedule, rows):
+    def run():
+        with transaction.atomic():
+            assert import_entries(schedule, rows).created == len(rows)
+            transaction.set_rollback(True)
+    return run
+
+
+def _time(func, repeat, warm_up=None):
+    """ Median milliseconds of func called with an empty cache, filled by warm_up first if given """
+    timings = []
+    for _ in range(repeat):
+        get_cache().clear()
+        if warm_up is not None:
+            warm_up()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)['median']
+
+
+def _rows(count):
+    minutes = len(EVENING_HOURS) * 60 // 5
+    return [
+        {
+            'title': f'imported {i}',
+            'day': i // minutes,
+            'start_time': f'{EVENING_HOURS[0] + i % minutes * 5 // 60}:{i % minutes * 5 % 60:02}',
+            'end_time': f'{EVENING_HOURS[0] + i % minutes * 5 // 60}:{i % minutes * 5 % 60 + 4:02}',
+        }
+        for i in range(count)
+    ]
+
+
+def _cases(schedule, rows):
+    free = ScheduleEntry(schedule=schedule, title='free', day=3, start_time='22:00', end_time='22:30')
+    taken = ScheduleEntry(schedule=schedule, title='taken', day=3, start_time='0:00', end_time='23:00')
+    return [
+        ('validate free slot', _validate(free, collides=False)),
+        ('validate collision', _validate(taken, collides=True)),
+        (f'import {len(rows)} rows', _import(schedule, rows)),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[1000, 1500], help='entries per schedule, up to 1500')
+    parser.add_argument('--rows', type=int, default=250, help='imported rows, up to 252')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        for size in args.entries:
+            user = generate(1, 1, size, prefix=f'{size}-entries-')[0]
+            schedule = user.schedule_set.get()
+            warm_up = _validate(
+                ScheduleEntry(schedule=schedule, title='warm up', day=0, start_time='23:58', end_time='23:59'),
+                collides=False
+            )
+            for name, func in _cases(schedule, _rows(args.rows)):
+                sql = _time(func, args.repeat)
+                with override_settings(SCHEDULES_OCCUPANCY_INDEX=True):
+                    cold = _time(func, args.repeat)
+                    warm = _time(func, args.repeat, warm_up)
+                rows.append((size, name, f'{sql:.3f}', f'{cold:.3f}', f'{warm:.3f}', f'{sql / warm:.1f}x'))
+
+    print_table(('entries', 'case', 'SQL ms', 'index cold ms', 'index warm ms', 'speedup'), rows)
+    print(f"\nBatch checks {'with' if numpy is not None else 'without'} NumPy")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Compares the overlay of several schedules with opening their schedule pages one after another, with the cache off.
+
+The entries of the schedules take turns in the five minute slots of the week, so they interleave without conflicts
+and the rows compare the loading and rendering of the same entries.
+
+    python -m benchmarks.bench_overlay --schedules 2 5 10 --entries 100
+"""
+import argparse
+
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.common import QueryCounter, benchmark_database, measure, print_table
+from benchmarks.data import entry_at, generate
+from schedules.models import ScheduleEntry
+
+
+def _create_user(count, entries):
+    """ A user with count schedules of the given number of entries each """
+    user = generate(1, count, 0, prefix=f'{count}-schedules-')[0]
+    schedule_ids = list(user.schedule_set.values_list('pk', flat=True))
+    ScheduleEntry.objects.bulk_create(
+        entry_at(schedule_id, number * count + index)
+        for index, schedule_id in enumerate(schedule_ids) for number in range(entries)
+    )
+    return user, schedule_ids
+
+
+def _get(client, paths):
+    def run():
+        for path, data in paths:
+            assert client.get(path, data).status_code == 200
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--schedules', type=int, nargs='+', default=[2, 5, 10])
+    parser.add_argument('--entries', type=int, default=100, help='entries per schedule, up to 2016 in total')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database(), override_settings(SCHEDULES_CACHE_ENABLED=False):
+        for count in args.schedules:
+            user, schedule_ids = _create_user(count, args.entries)
+            client = Client()
+            client.force_login(user)
+            cases = [
+                (f'{count} schedule pages', [
+                    (reverse('schedules:schedule_detail', args=[pk]), {}) for pk in schedule_ids
+                ]),
+                ('overlay', [(reverse('schedules:schedule_overlay'), {'schedules': schedule_ids})]),
+            ]
+            for name, paths in cases:
+                run = _get(client, paths)
+                with QueryCounter() as queries:
+                    run()
+                timings = measure(run, repeat=args.repeat)
+                rows.append((
+                    count * args.entries, name, queries.count, *(f'{timings[key]:.2f}' for key in ('median', 'p95'))
+                ))
+
+    print_table(('entries', 'case', 'queries', 'median ms', 'p95 ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares editing an entry through the edit page with changing it in place, per edit.
+
+The edit page takes three requests: the form, the posted form and the schedule page it redirects to, which renders
+the whole week again. The in-place edit posts the changed fields only and gets the card of the entry back. Bytes
+count the request bodies and the response bodies.
+
+    python -m benchmarks.bench_partial_update --entries 100 500
+"""
+import argparse
+from itertools import count
+from urllib.parse import urlencode
+
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import QueryCounter, benchmark_database, measure, print_table
+from benchmarks.data import generate
+from schedules.models import ScheduleEntry
+
+# the generated entries fill the days from midnight on, so the late evening stays free for the moves
+MOVE_TARGETS = [('22:00', '22:30'), ('23:00', '23:30')]
+
+
+def _edits():
+    """ Yields the changed fields of the edits in turn, each one changing the entry for real """
+    for number in count():
+        start_time, end_time = MOVE_TARGETS[number % 2]
+        yield {
+            'retitle': {'title': f'title {number}'},
+            'move': {'day': number % 2, 'start_time': start_time, 'end_time': end_time},
+        }
+
+
+def _edit_page(client, entry, changes):
+    """ Edits through the form page, returns the bytes transferred """
+    path = reverse('schedules:scheduleentry_update', args=[entry.schedule_id, entry.pk])
+    form = client.get(path)
+    data = {
+        'title': entry.title, 'description': entry.description, 'day': entry.day,
+        'start_time': entry.start_time.isoformat(), 'end_time': entry.end_time.isoformat(), **changes
+    }
+    posted = client.post(path, data)
+    assert posted.status_code == 302, posted.status_code
+    page = client.get(posted.url)
+    return len(form.content) + len(urlencode(data)) + len(posted.content) + len(page.content)
+
+
+def _edit_in_place(client, entry, changes):
+    """ Edits through the partial update endpoint, returns the bytes transferred """
+    response = client.post(reverse('schedules:scheduleentry_patch', args=[entry.schedule_id, entry.pk]), changes)
+    assert response.status_code == 200, response.status_code
+    return len(urlencode(changes)) + len(response.content)
+
+
+def _case(client, entry, edit, kind):
+    """ A function making the next edit of the kind, and the bytes and queries of one edit """
+    edits = _edits()
+
+    def run(queries=None):
+        with queries or QueryCounter():
+            transferred = edit(client, entry, next(edits)[kind])
+        # the edit page posts all fields, so it has to know their current values
+        entry.refresh_from_db()
+        return transferred
+
+    queries = QueryCounter()
+    transferred = run(queries)
+    return run, transferred, queries.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, nargs='+', default=[100, 500], help='entries of the edited schedule')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = []
+    with benchmark_database():
+        for size in args.entries:
+            user = generate(1, 1, size, prefix=f'{size}-entries-')[0]
+            client = Client()
+            client.force_login(user)
+            entry = ScheduleEntry.objects.filter(schedule__author=user).order_by('pk').first()
+            for kind in ('retitle', 'move'):
+                for name, edit in (('edit page', _edit_page), ('in place', _edit_in_place)):
+                    run, transferred, queries = _case(client, entry, edit, kind)
+                    timings = measure(run, repeat=args.repeat)
+                    rows.append((size, kind, name, queries, transferred, f"{timings['median']:.2f}"))
+
+    print_table(('entries', 'edit', 'how', 'queries', 'bytes', 'median ms'), rows)
+
+
+if __name__ == '__main__':
+    main()
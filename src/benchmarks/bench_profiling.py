@@ -0,0 +1,65 @@
+"""
+Measures the overhead of the request profiling middleware on the schedule page.
+
+Disabled, the middleware drops out of the middleware chain, so its row should match the one without the middleware.
+The sampling row runs every request under cProfile with its SQL recorded and writes the slowest ones to disk.
+
+    python -m benchmarks.bench_profiling --entries 100
+"""
+import argparse
+import logging
+import tempfile
+
+from django.conf import settings
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, measure, print_table
+from benchmarks.data import generate
+
+PROFILING_MIDDLEWARE = 'mmd_project.middleware.RequestProfilingMiddleware'
+
+
+def _setups(profiles_directory):
+    without_middleware = [middleware for middleware in settings.MIDDLEWARE if middleware != PROFILING_MIDDLEWARE]
+    return [
+        ('without the middleware', {'MIDDLEWARE': without_middleware}),
+        ('disabled', {'REQUEST_PROFILING': False}),
+        ('enabled', {'REQUEST_PROFILING': True, 'REQUEST_PROFILING_SLOWEST': 0}),
+        ('enabled, sampling', {
+            'REQUEST_PROFILING': True, 'REQUEST_PROFILING_SLOWEST': 0.05, 'REQUEST_PROFILING_DIR': profiles_directory
+        }),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    # the log lines of the enabled middleware would swamp the table
+    logging.getLogger('mmd_project.profiling').setLevel(logging.WARNING)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory, benchmark_database():
+        user = generate(1, 1, args.entries)[0]
+        path = reverse('schedules:schedule_detail', args=[user.schedule_set.get().pk])
+        baseline = None
+        for name, overrides in _setups(directory):
+            with override_settings(**overrides):
+                # the client builds its middleware chain on the first request, i.e. from the overridden settings
+                client = Client()
+                client.force_login(user)
+                timings = measure(lambda client=client: client.get(path), repeat=args.repeat, warmup=20)
+            baseline = baseline or timings['median']
+            rows.append((
+                name,
+                *(f'{timings[key]:.3f}' for key in ('median', 'p95')),
+                f"{(timings['median'] - baseline) * 1000:+.0f}"
+            ))
+
+    print_table(('setup', 'median ms', 'p95 ms', 'overhead us'), rows)
+
+
+if __name__ == '__main__':
+    main()
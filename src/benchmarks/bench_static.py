@@ -0,0 +1,121 @@
+"""
+Counts the requests and bytes a browser spends on the static files of a page on its first and on repeated visits.
+
+The development setup serves the files as runserver does, without cache headers, so a browser revalidates every
+file on every visit. The production setup serves the files collected by the storage of STATIC_PROFILE=production
+through mmd_project.staticfiles.StaticFilesApplication: hashed names, compressed variants and immutable caching.
+The browser is modelled as one honouring max-age and revalidating with If-None-Match or If-Modified-Since.
+
+    python -m benchmarks.bench_static --visits 10
+    python -m benchmarks.bench_static --path /admin/login/
+"""
+import argparse
+import re
+import tempfile
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.staticfiles.handlers import StaticFilesHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from benchmarks.common import benchmark_database, print_table
+from mmd_project.staticfiles import StaticFilesApplication
+
+ACCEPT_ENCODING = 'gzip, deflate, br'
+
+
+class Browser:
+    """ Fetches the assets of pages through a WSGI application and keeps them in its HTTP cache """
+
+    def __init__(self, application):
+        self.application = application
+        # url -> (fresh until, validators)
+        self.cache = {}
+
+    def fetch(self, url):
+        """ Returns the requests made and the body bytes received for the asset """
+        cached = self.cache.get(url)
+        if cached and cached[0] > time.time():
+            return 0, 0
+        environ = {'PATH_INFO': url, 'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': ACCEPT_ENCODING}
+        if cached:
+            environ.update(cached[1])
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        result = self.application(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        headers = response['headers']
+        max_age = re.search(r'max-age=(\d+)', headers.get('Cache-Control', ''))
+        validators = cached[1] if cached else {}
+        if response['status'].startswith('200'):
+            validators = {}
+            if 'ETag' in headers:
+                validators['HTTP_IF_NONE_MATCH'] = headers['ETag']
+            if 'Last-Modified' in headers:
+                validators['HTTP_IF_MODIFIED_SINCE'] = headers['Last-Modified']
+        self.cache[url] = (time.time() + int(max_age.group(1)) if max_age else 0, validators)
+        return 1, len(body)
+
+    def visit(self, urls):
+        requests = transferred = 0
+        for url in urls:
+            made, received = self.fetch(url)
+            requests += made
+            transferred += received
+        return requests, transferred
+
+
+def _asset_urls(html):
+    return re.findall(r'(?:href|src)="(/static/[^"]+)"', html)
+
+
+def _measure(name, application, urls, visits):
+    browser = Browser(application)
+    first = browser.visit(urls)
+    repeated = [browser.visit(urls) for _ in range(visits - 1)]
+    requests = sum(made for made, _ in repeated) / len(repeated) if repeated else 0
+    transferred = sum(received for _, received in repeated) / len(repeated) if repeated else 0
+    return (name, len(urls), first[0], first[1], f'{requests:.1f}', f'{transferred:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--visits', type=int, default=10)
+    parser.add_argument('--path', help='page whose assets are fetched, the login page by default')
+    args = parser.parse_args()
+    path = args.path or reverse('login')
+
+    rows = []
+    with benchmark_database(), tempfile.TemporaryDirectory() as static_root:
+        with override_settings(STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage'):
+            urls = _asset_urls(Client().get(path).content.decode())
+            rows.append(_measure('development', StaticFilesHandler(WSGIHandler()), urls, args.visits))
+
+        with override_settings(
+            STATIC_ROOT=static_root, STATICFILES_STORAGE='mmd_project.staticfiles.CompressedManifestStaticFilesStorage'
+        ):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            urls = _asset_urls(Client().get(path).content.decode())
+            application = StaticFilesApplication(WSGIHandler(), static_root, '/static/')
+            rows.append(_measure('production', application, urls, args.visits))
+
+    print_table(
+        ('setup', 'assets', 'first requests', 'first bytes', 'repeat requests', 'repeat bytes'),
+        rows
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmarks of the hot paths: entry validation, rendering of the schedule pages and the authentication flows.
+
+Pages are rendered with the cache disabled, so every run measures the queries and the templates. Results can be
+stored as JSON and compared against a stored baseline, which fails the run when a case got slower than the tolerance.
+
+    python -m benchmarks.bench_suite --output suite.json
+    python -m benchmarks.bench_suite --baseline suite.json --tolerance 0.25
+"""
+import argparse
+from datetime import time
+
+from django.core.exceptions import ValidationError
+from django.test import Client, RequestFactory, override_settings
+from django.urls import reverse
+
+from benchmarks.common import QueryCounter, add_result_arguments, benchmark_database, measure, print_table, report
+from benchmarks.data import PASSWORD, generate
+from schedules.models import ScheduleEntry
+from schedules.views import ScheduleDetailView, ScheduleListView
+
+COMPARED_METRICS = ('median', 'queries')
+
+
+def _validate(entry, collides):
+    def run():
+        try:
+            entry.full_clean()
+        except ValidationError:
+            if not collides:
+                raise
+    return run
+
+
+def _render(view_class, user, path, **kwargs):
+    request = RequestFactory().get(path)
+    request.user = user
+    view = view_class.as_view()
+    return lambda: view(request, **kwargs).render()
+
+
+def _login(user):
+    def run():
+        client = Client()
+        assert client.post(reverse('login'), {'username': user.username, 'password': PASSWORD}).status_code == 302
+        client.post(reverse('logout'))
+    return run
+
+
+def _signup():
+    numbers = iter(range(10 ** 9))
+
+    def run():
+        username = f'signup{next(numbers)}'
+        response = Client().post(reverse('user_create'), {
+            'username': username,
+            'email': f'{username}@example.com',
+            'password1': 'a long enough pass phrase',
+            'password2': 'a long enough pass phrase',
+        })
+        assert response.status_code == 302
+    return run
+
+
+def _cases(user, args):
+    schedule = user.schedule_set.order_by('pk').first()
+    # the generated entries fill the slots from midnight on, the evening stays free
+    free = ScheduleEntry(schedule=schedule, title='free', day=0, start_time=time(22), end_time=time(23))
+    taken = ScheduleEntry(schedule=schedule, title='taken', day=0, start_time=time(0), end_time=time(23))
+    return [
+        ('clean, free slot', _validate(free, collides=False), args.repeat),
+        ('clean, collision', _validate(taken, collides=True), args.repeat),
+        ('render list', _render(ScheduleListView, user, reverse('schedules:schedule_list')), args.repeat),
+        (
+            f'render detail, {args.entries} entries',
+            _render(ScheduleDetailView, user, reverse('schedules:schedule_detail', args=[schedule.pk]), pk=schedule.pk),
+            args.repeat
+        ),
+        # every login and sign up hashes a password, which takes long enough for fewer repetitions
+        ('login and logout', _login(user), args.auth_repeat),
+        ('sign up', _signup(), args.auth_repeat),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--schedules', type=int, default=20, help='schedules per user')
+    parser.add_argument('--entries', type=int, default=200, help='entries per schedule')
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--auth-repeat', type=int, default=10)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    results = {}
+    with benchmark_database(), override_settings(SCHEDULES_CACHE_ENABLED=False):
+        user = generate(args.users, args.schedules, args.entries)[0]
+        for name, func, repeat in _cases(user, args):
+            with QueryCounter() as counter:
+                func()
+            results[name] = {**measure(func, repeat=repeat, warmup=1), 'queries': counter.count}
+
+    print_table(
+        ('case', 'median ms', 'p95 ms', 'p99 ms', 'queries'),
+        [
+            (name, *(f'{metrics[key]:.2f}' for key in ('median', 'p95', 'p99')), metrics['queries'])
+            for name, metrics in results.items()
+        ]
+    )
+    report(results, COMPARED_METRICS, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Measures the template render time per entry of the week on the schedule page.
+
+The legacy rows include a card template which reversed both entry URLs with {% url %}, the current ones render the
+entry_card tag, which reverses them once per schedule. Each runs with the loaders of the development profile, which
+read and parse the templates on every render, and with the cached loader of the production profile. The entries are
+built in memory, so no database is involved.
+
+    python -m benchmarks.bench_templates --sizes 10 100 1000
+"""
+import argparse
+
+from django.conf import settings
+from django.template import Context, Engine
+
+from benchmarks.common import measure, print_table
+from benchmarks.data import MAX_ENTRIES_PER_SCHEDULE, entry_at
+from schedules.week import build_week
+
+LEGACY_TEMPLATES = {
+    'legacy/schedule_week.html': '''
+<div class="flex-grid">
+{% for day in week %}
+    <div class="col">
+        <h3>{{ day.label }}</h3>
+        {% for entry in day.entries %}
+            {% include 'legacy/scheduleentry_card.html' %}
+        {% endfor %}
+    </div>
+{% endfor %}
+</div>
+''',
+    'legacy/scheduleentry_card.html': '''
+<div id="entry-{{ entry.pk }}">
+    <h4>{{ entry.title }}</h4>
+    <p>{{ entry.description }}</p>
+    <p>{{ entry.start_time }}-{{ entry.end_time }}</p>
+    <p style="font-size: x-small;">
+        <a href="{% url 'schedules:scheduleentry_delete' entry.schedule_id entry.pk %}">Delete</a> |
+        <a href="{% url 'schedules:scheduleentry_update' entry.schedule_id entry.pk %}">Edit</a>
+    </p>
+    </br>
+</div>
+''',
+}
+TEMPLATES = {'legacy': 'legacy/schedule_week.html', 'entry_card': 'schedules/schedule_week.html'}
+
+
+def _engine(cached):
+    loaders = [
+        ('django.template.loaders.locmem.Loader', LEGACY_TEMPLATES),
+        'django.template.loaders.app_directories.Loader',
+    ]
+    if cached:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    return Engine(
+        loaders=loaders, libraries={'schedule_tags': 'schedules.templatetags.schedule_tags'}, debug=settings.DEBUG
+    )
+
+
+def _week(size):
+    entries = []
+    for number in range(size):
+        entry = entry_at(1, number)
+        entry.pk = number + 1
+        entries.append(entry)
+    return build_week(entries)
+
+
+def _render(engine, template_name, week):
+    # like render_to_string(), every render looks the template up
+    return lambda: engine.get_template(template_name).render(Context({'week': week}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    engines = {'development': _engine(cached=False), 'production': _engine(cached=True)}
+    rows = []
+    for size in args.sizes:
+        week = _week(min(size, MAX_ENTRIES_PER_SCHEDULE))
+        for loaders, engine in engines.items():
+            for name, template_name in TEMPLATES.items():
+                timings = measure(_render(engine, template_name, week), repeat=args.repeat)
+                rows.append((
+                    size, loaders, name, f"{timings['median']:.2f}", f"{timings['median'] * 1000 / size:.1f}"
+                ))
+
+    print_table(('entries', 'loaders', 'template', 'median ms', 'us/entry'), rows)
+
+
+if __name__ == '__main__':
+    main()
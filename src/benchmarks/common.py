@@ -0,0 +1,134 @@
+import json
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_database(name=None):
+    """ Creates a fresh test database for the duration of the block, by default the one tests would use """
+    if name is not None:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = name
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=100, warmup=5):
+    """ Calls func repeatedly and returns its latency statistics in milliseconds """
+    for _ in range(warmup):
+        func()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def _percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(timings):
+    """ Latency statistics of a list of timings """
+    ordered = sorted(timings)
+    return {
+        'min': ordered[0],
+        'median': statistics.median(ordered),
+        'p95': _percentile(ordered, 0.95),
+        'p99': _percentile(ordered, 0.99),
+        'max': ordered[-1],
+    }
+
+
+def print_table(headers, rows):
+    widths = [max(len(str(value)) for value in column) for column in zip(headers, *rows)]
+    for row in [headers, *rows]:
+        print('  '.join(str(value).rjust(width) for value, width in zip(row, widths)))
+
+
+def write_results(path, results):
+    """ Stores results, a dict mapping case names to dicts of metrics, as JSON """
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def _change(old, new, tolerance):
+    """ The change from old to new as the comparison table shows it, and whether it exceeds the tolerance """
+    if not old:
+        return f'{new - old:+.2f}', new > old
+    change = (new - old) / old
+    return f'{change:+.0%}', change > tolerance
+
+
+def compare_with_baseline(results, path, metrics, tolerance):
+    """
+    Compares results against the baseline stored at path.
+
+    Lower is better for every metric. Returns table rows of the changes and the names of the cases whose metric grew
+    by more than tolerance, a fraction of the baseline. A zero baseline has no fraction, any growth from it regresses.
+    """
+    with open(path, encoding='utf-8') as file:
+        baseline = json.load(file)
+
+    rows, regressions = [], []
+    for name, values in results.items():
+        for metric in metrics:
+            old, new = baseline.get(name, {}).get(metric), values.get(metric)
+            if old is None or new is None:
+                continue
+            shown, regressed = _change(old, new, tolerance)
+            rows.append((name, metric, f'{old:.2f}', f'{new:.2f}', shown))
+            if regressed:
+                regressions.append(f'{name} ({metric})')
+    return rows, regressions
+
+
+def report(results, metrics, output=None, baseline=None, tolerance=0.2):
+    """ Writes and compares the results as the --output and --baseline options of add_result_arguments() ask """
+    if output:
+        write_results(output, results)
+    if baseline:
+        rows, regressions = compare_with_baseline(results, baseline, metrics, tolerance)
+        print()
+        print_table(('case', 'metric', 'baseline', 'current', 'change'), rows)
+        if regressions:
+            raise SystemExit(f"Regressed by more than {tolerance:.0%}: {', '.join(regressions)}")
+
+
+def add_result_arguments(parser):
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', help='compare the results against this JSON file written by --output')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2, help='fraction by which a metric may exceed the baseline'
+    )
+
+
+class QueryCounter:
+    """ Counts the queries executed within the block without keeping them in memory """
+
+    def __init__(self, database_connection=connection):
+        self.connection = database_connection
+        self.count = 0
+        self._wrapper = None
+
+    def __call__(self, execute, *args):
+        self.count += 1
+        return execute(*args)
+
+    def __enter__(self):
+        self._wrapper = self.connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrapper.__exit__(*exc_info)
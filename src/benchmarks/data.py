@@ -0,0 +1,74 @@
+"""
+Synthetic data for the benchmarks: users × schedules × entries, created with bulk queries.
+
+Every user gets the password PASSWORD, hashed only once, so large data sets do not spend minutes in the hasher.
+"""
+from datetime import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from schedules.models import Schedule, ScheduleDaySummary, ScheduleEntry
+
+PASSWORD = 'benchmark'
+BATCH_SIZE = 10000
+# five minute slots over seven days
+MAX_ENTRIES_PER_SCHEDULE = 7 * 24 * 12
+
+
+def entry_at(schedule_id, number):
+    """ The number-th entry of a schedule, the entries fill the five minute slots of the days in turn """
+    if number >= MAX_ENTRIES_PER_SCHEDULE:
+        raise ValueError(f'A schedule fits at most {MAX_ENTRIES_PER_SCHEDULE} five minute entries.')
+    start = number // 7 * 5
+    return ScheduleEntry(
+        schedule_id=schedule_id,
+        title=f'entry {number}',
+        description='generated entry',
+        day=number % 7,
+        start_time=time(*divmod(start, 60)),
+        end_time=time(*divmod(start + 4, 60))
+    )
+
+
+def entries_for(schedule_id, count):
+    """ Yields count entries of the schedule spread evenly over the week and free of collisions """
+    for number in range(count):
+        yield entry_at(schedule_id, number)
+
+
+def _bulk_create(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) == BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    model.objects.bulk_create(batch)
+
+
+def generate(users, schedules_per_user, entries_per_schedule, prefix='user'):
+    """ Creates the users named <prefix><number> with their schedules and entries and returns the users """
+    user_model = get_user_model()
+    password = make_password(PASSWORD)
+    _bulk_create(user_model, (
+        user_model(username=f'{prefix}{number}', password=password) for number in range(users)
+    ))
+    created_users = list(user_model.objects.filter(username__startswith=prefix).order_by('pk'))
+
+    # SQLite does not return the primary keys of bulk created rows, so the schedules are read back
+    _bulk_create(Schedule, (
+        Schedule(name=f'schedule {number}', author=user)
+        for user in created_users
+        for number in range(schedules_per_user)
+    ))
+    schedule_ids = list(Schedule.objects.filter(author__in=created_users).values_list('pk', flat=True))
+    _bulk_create(ScheduleEntry, (
+        entry
+        for schedule_id in schedule_ids
+        for entry in entries_for(schedule_id, entries_per_schedule)
+    ))
+    # bulk_create() sends no signals, which would have created the day summaries
+    for first in range(0, len(schedule_ids), BATCH_SIZE // 7):
+        ScheduleDaySummary.objects.rebuild(schedule_ids[first:first + BATCH_SIZE // 7])
+    return created_users
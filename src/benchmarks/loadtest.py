@@ -0,0 +1,151 @@
+"""
+In-process load test: a pool of threads, each with its own logged in client and database connection, sends requests
+to the application through the WSGI handler of the test client and records latency and queries of each request.
+
+Every scenario is a separate phase in which all threads request the same endpoint, so the requests per second of a
+phase belong to that endpoint alone. Runs against a database file, as the in-memory test database of SQLite is
+shared by the threads through a single cache and would serialize them.
+
+    python -m benchmarks.loadtest --threads 8 --requests 50 --output load.json
+    python -m benchmarks.loadtest --baseline load.json
+"""
+import argparse
+import logging
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from django.db import OperationalError, connections
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks.common import QueryCounter, add_result_arguments, benchmark_database, print_table, report, summarize
+from benchmarks.data import PASSWORD, entry_at, generate
+from schedules.models import Schedule
+
+# request(client, context, number) sends the number-th request of a thread and returns the response, any status
+# code other than the expected one counts as an error
+Scenario = namedtuple('Scenario', ['name', 'expected_status', 'request'])
+Sample = namedtuple('Sample', ['milliseconds', 'queries', 'failed'])
+
+COMPARED_METRICS = ('p50', 'p95', 'queries')
+
+
+def _create_entry(client, context, number):  # pylint: disable=unused-argument
+    # every thread fills the five minute slots of its own empty schedule, so the new entries never collide
+    entry = entry_at(context['empty_schedule_id'], context['created'])
+    context['created'] += 1
+    return client.post(reverse('schedules:scheduleentry_create', args=[entry.schedule_id]), {
+        'title': entry.title,
+        'day': entry.day,
+        'start_time': entry.start_time.isoformat(),
+        'end_time': entry.end_time.isoformat(),
+    })
+
+
+SCENARIOS = [
+    Scenario('schedule list', 200, lambda client, context, number: client.get(reverse('schedules:schedule_list'))),
+    Scenario('schedule detail', 200, lambda client, context, number: client.get(
+        reverse('schedules:schedule_detail', args=[context['schedule_ids'][number % len(context['schedule_ids'])]])
+    )),
+    Scenario('api entries', 200, lambda client, context, number: client.get(
+        reverse('schedules_api:scheduleentry_list', args=[context['schedule_ids'][0]])
+    )),
+    Scenario('create entry', 302, _create_entry),
+    # the login view redirects users who are logged in already, so every login starts from a fresh client
+    Scenario('login', 302, lambda client, context, number: Client().post(
+        reverse('login'), {'username': context['user'].username, 'password': PASSWORD}
+    )),
+]
+
+
+def _worker(client, context, scenario, request_count, samples):
+    try:
+        for number in range(request_count):
+            with QueryCounter() as counter:
+                start = time.perf_counter()
+                try:
+                    failed = scenario.request(client, context, number).status_code != scenario.expected_status
+                except OperationalError:
+                    failed = True
+                milliseconds = (time.perf_counter() - start) * 1000
+            samples.append(Sample(milliseconds, counter.count, failed))
+    finally:
+        connections.close_all()
+
+
+def run_phase(scenario, clients, contexts, request_count):
+    """ Lets every client send request_count requests of the scenario at once and returns the metrics of the phase """
+    samples = []
+    workers = [
+        threading.Thread(target=_worker, args=(client, context, scenario, request_count, samples))
+        for client, context in zip(clients, contexts)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    seconds = time.perf_counter() - start
+
+    latency = summarize([sample.milliseconds for sample in samples])
+    return {
+        'p50': latency['median'],
+        'p95': latency['p95'],
+        'p99': latency['p99'],
+        'rps': len(samples) / seconds,
+        'queries': sum(sample.queries for sample in samples) / len(samples),
+        'errors': sum(sample.failed for sample in samples),
+    }
+
+
+def _prepare_clients(users):
+    clients, contexts = [], []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        schedule_ids = list(user.schedule_set.order_by('pk').values_list('pk', flat=True))
+        empty_schedule = Schedule.objects.create(name='load test', author=user)
+        clients.append(client)
+        contexts.append({
+            'user': user, 'schedule_ids': schedule_ids, 'empty_schedule_id': empty_schedule.pk, 'created': 0
+        })
+    return clients, contexts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='requests per thread and scenario')
+    parser.add_argument('--users', type=int, default=50, help='users in the database, at least --threads')
+    parser.add_argument('--schedules', type=int, default=10, help='schedules per user')
+    parser.add_argument('--entries', type=int, default=100, help='entries per schedule')
+    parser.add_argument('--scenarios', nargs='+', choices=[scenario.name for scenario in SCENARIOS])
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenarios or scenario.name in args.scenarios]
+    # failures are counted, not logged
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        with benchmark_database(str(Path(directory) / 'load.sqlite3')):
+            users = generate(max(args.users, args.threads), args.schedules, args.entries)
+            clients, contexts = _prepare_clients(users[:args.threads])
+            for scenario in scenarios:
+                results[f'load: {scenario.name}'] = run_phase(scenario, clients, contexts, args.requests)
+
+    print_table(
+        ('scenario', 'p50 ms', 'p95 ms', 'p99 ms', 'requests/s', 'queries/request', 'errors'),
+        [
+            (name, *(f'{metrics[key]:.1f}' for key in ('p50', 'p95', 'p99', 'rps', 'queries')), metrics['errors'])
+            for name, metrics in results.items()
+        ]
+    )
+    report(results, COMPARED_METRICS, args.output, args.baseline, args.tolerance)
+
+
+if __name__ == '__main__':
+    main()
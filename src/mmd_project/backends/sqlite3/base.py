@@ -0,0 +1,40 @@
+"""
+SQLite backend understanding the init_command and transaction_mode OPTIONS, which Django supports from 5.1 on.
+
+    'OPTIONS': {
+        'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+init_command runs on every new connection. transaction_mode makes atomic blocks start with BEGIN IMMEDIATE, so a
+transaction takes the write lock up front rather than failing with "database is locked" when it tries to upgrade
+its read lock while another connection writes; waiting for the lock is bounded by the timeout option.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'EXCLUSIVE', 'IMMEDIATE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('init_command', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        init_command = self.settings_dict['OPTIONS'].get('init_command')
+        if init_command:
+            conn.executescript(init_command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        transaction_mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if transaction_mode is None:
+            super()._start_transaction_under_autocommit()
+            return
+        if transaction_mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}.")
+        self.cursor().execute(f'BEGIN {transaction_mode.upper()}')
@@ -0,0 +1,183 @@
+import asyncio
+import cProfile
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from schedules.cache import stats as cache_stats
+
+logger = logging.getLogger('mmd_project.profiling')
+
+
+def health_checked_aliases():
+    """ The databases whose CONN_HEALTH_CHECKS option is enabled """
+    return [alias for alias in connections if connections.databases[alias].get('CONN_HEALTH_CHECKS')]
+
+
+def close_broken_connections(aliases):
+    """ Closes the connections of the current thread which stopped working, unless they are within a transaction """
+    for alias in aliases:
+        connection = connections[alias]
+        if connection.connection is not None and not connection.in_atomic_block and not connection.is_usable():
+            connection.close()
+
+
+class DatabaseHealthCheckMiddleware:
+    """
+    Closes persistent connections which stopped working, e.g. after a database restart, before a request uses them.
+
+    Does the job of the CONN_HEALTH_CHECKS database option of newer Django versions for the databases enabling it.
+    Connections in the middle of a transaction are left alone. Async views run their queries in worker threads, whose
+    connections schedules.async_views.database_sync_to_async() checks, so async requests are merely passed on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.aliases = health_checked_aliases()
+        if not self.aliases:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # tells the handler to await the middleware, as Django's MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine  # pylint: disable=protected-access
+
+    def __call__(self, request):
+        if not self.is_async:
+            close_broken_connections(self.aliases)
+        return self.get_response(request)
+
+
+class _QueryRecorder:
+    """ Execute wrapper timing the queries of one request, it keeps the SQL as well when asked to """
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.seconds = 0
+        self.queries = [] if keep_sql else None
+
+    def __call__(self, execute, sql, params, *args):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, *args)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.seconds += duration
+            if self.queries is not None:
+                self.queries.append((duration, sql, params))
+
+
+class _RequestProfile:
+    def __init__(self, keep_sql):
+        self.queries = _QueryRecorder(keep_sql)
+        self.template_seconds = 0
+        self.profiler = None
+        self.view_name = None
+
+
+class RequestProfilingMiddleware:
+    """
+    Measures wall time, database queries and time, template rendering time and schedules cache hits of each request.
+
+    The numbers go to the Server-Timing header of the response and to a JSON line in the mmd_project.profiling log.
+    Requests of the views listed in REQUEST_PROFILING_VIEWS run under cProfile with their SQL recorded as well, and
+    the profile and the SQL of the slowest REQUEST_PROFILING_SLOWEST fraction of them are written to
+    REQUEST_PROFILING_DIR. Enabled by the REQUEST_PROFILING setting, otherwise it drops out of the middleware chain.
+    """
+
+    # how many of the recent durations of a view define what counts as slow
+    WINDOW = 1000
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILING:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sampled_views = set(settings.REQUEST_PROFILING_VIEWS) if settings.REQUEST_PROFILING_SLOWEST else set()
+        self._durations = defaultdict(lambda: deque(maxlen=self.WINDOW))
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __call__(self, request):
+        profile = self._local.profile = _RequestProfile(keep_sql=bool(self.sampled_views))
+        hits, misses = cache_stats.thread_counts()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.queries))
+                response = self.get_response(request)
+        finally:
+            if profile.profiler is not None:
+                profile.profiler.disable()
+            del self._local.profile
+        duration = time.perf_counter() - start
+        cache_hits, cache_misses = (now - before for now, before in zip(cache_stats.thread_counts(), (hits, misses)))
+
+        response['Server-Timing'] = ', '.join([
+            f'total;dur={duration * 1000:.1f}',
+            f'db;dur={profile.queries.seconds * 1000:.1f};desc="{profile.queries.count} queries"',
+            f'template;dur={profile.template_seconds * 1000:.1f}',
+            f'cache;desc="{cache_hits} hits / {cache_misses} misses"',
+        ])
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': profile.view_name,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 3),
+            'db_queries': profile.queries.count,
+            'db_ms': round(profile.queries.seconds * 1000, 3),
+            'template_ms': round(profile.template_seconds * 1000, 3),
+            'cache_hits': cache_hits,
+            'cache_misses': cache_misses,
+        }))
+        if profile.profiler is not None and self._is_among_slowest(profile.view_name, duration):
+            self._dump(profile, duration)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):  # pylint: disable=unused-argument
+        view = getattr(view_func, 'view_class', view_func)
+        profile = self._local.profile
+        profile.view_name = f'{view.__module__}.{view.__qualname__}'
+        if profile.view_name in self.sampled_views:
+            profile.profiler = cProfile.Profile()
+            profile.profiler.enable()
+
+    def process_template_response(self, request, response):  # pylint: disable=unused-argument
+        profile = self._local.profile
+        start = time.perf_counter()
+
+        def rendered(response):  # pylint: disable=unused-argument
+            profile.template_seconds += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def _is_among_slowest(self, view_name, duration):
+        """ Tells whether duration is within the slowest fraction of the recent durations of the view """
+        with self._lock:
+            durations = self._durations[view_name]
+            slower = sum(1 for other in durations if other > duration)
+            durations.append(duration)
+        return slower < len(durations) * settings.REQUEST_PROFILING_SLOWEST
+
+    @staticmethod
+    def _dump(profile, duration):
+        directory = Path(settings.REQUEST_PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{profile.view_name.rsplit('.', 1)[-1]}-{duration * 1000:.0f}ms"
+        profile.profiler.dump_stats(directory / f'{name}.prof')
+        with open(directory / f'{name}.sql', 'w', encoding='utf-8') as file:
+            for seconds, sql, params in profile.queries.queries:
+                file.write(f'-- {seconds * 1000:.3f} ms, params: {params!r}\n{sql};\n\n')
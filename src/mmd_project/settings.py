@@ -10,6 +10,8 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'mmd_project.middleware.RequestProfilingMiddleware',
+    'mmd_project.middleware.DatabaseHealthCheckMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -69,17 +73,160 @@ TEMPLATES = [
     },
 ]
 
+# TEMPLATES_PROFILE=production parses every template once per process. The cached loader is set up explicitly, as DEBUG
+# turns it off otherwise, and SchedulesConfig.ready() loads the templates of the project's apps at startup, so no
+# request pays for parsing them. Changes of the template files then take a restart.
+
+TEMPLATES_PROFILE = os.environ.get('TEMPLATES_PROFILE', 'development')
+if TEMPLATES_PROFILE == 'production':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'mmd_project.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# SQLite is used unless DATABASE_ENGINE=postgresql, which reads the connection from the other DATABASE_* variables.
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and checked before they are reused by a request.
+# PostgreSQL needs psycopg2 (requirements-postgresql.txt) and the btree_gist extension, see README.md.
+
+if os.environ.get('DATABASE_ENGINE', 'sqlite3') == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DATABASE_NAME', 'make_my_day'),
+            'USER': os.environ.get('DATABASE_USER', ''),
+            'PASSWORD': os.environ.get('DATABASE_PASSWORD', ''),
+            'HOST': os.environ.get('DATABASE_HOST', ''),
+            'PORT': os.environ.get('DATABASE_PORT', ''),
+            'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            # WAL lets readers work alongside the writer and transactions take the write lock when they start,
+            # so concurrent writes wait for each other, for up to timeout seconds, instead of failing
+            'ENGINE': 'mmd_project.backends.sqlite3',
+            'NAME': os.environ.get('DATABASE_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 20,
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
+
+
+# Caches
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+#
+# The schedules and sessions caches have to be shared by all server processes in production, e.g. set
+# SCHEDULES_CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache and SCHEDULES_CACHE_LOCATION=/var/tmp/mmd
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'schedules': {
+        'BACKEND': os.environ.get('SCHEDULES_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SCHEDULES_CACHE_LOCATION', 'schedules'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'sessions': {
+        'BACKEND': os.environ.get('SESSIONS_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SESSIONS_CACHE_LOCATION', 'sessions'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
+}
+
+SCHEDULES_CACHE_ALIAS = 'schedules'
+SCHEDULES_CACHE_TIMEOUT = 24 * 60 * 60
+SCHEDULES_CACHE_ENABLED = True
+# Collision checks consult a cached bitmap of the taken minutes of the schedule first, see schedules/occupancy.py. A
+# bitmap cached per process misses the entries saved by the other processes and would let overlaps through, so the
+# index stays off until SCHEDULES_CACHE_BACKEND names a cache shared by all of them. So do the ETags of the API, which
+# are derived from the cache versions of the schedules.
+SCHEDULES_CACHE_SHARED = CACHES['schedules']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+SCHEDULES_OCCUPANCY_INDEX = SCHEDULES_CACHE_SHARED and os.environ.get('SCHEDULES_OCCUPANCY_INDEX') == '1'
+
+
+# Sessions and authentication
+# https://docs.djangoproject.com/en/3.1/topics/http/sessions/#configuring-the-session-engine
+#
+# SESSION_BACKEND picks where sessions live: 'cached_db' reads them from the sessions cache and writes them to the
+# database as well, 'cache' keeps them in the cache only, so an evicted session logs its user out, 'signed_cookies'
+# keeps them in the browser and 'db' is Django's default. Only the database backed ones need manage.py prune_sessions.
+# The user of a session is cached too on a shared cache, see accounts/backends.py, so neither takes a query on a
+# typical request.
+#
+# A session or a user cached per process would outlive a logout, a flush or a password change handled by another
+# process, so sessions default to 'db' and the user cache stays off until SESSIONS_CACHE_BACKEND names a cache shared
+# by all of them, such as memcached.
+
+SESSION_ENGINES = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}
+SESSIONS_CACHE_SHARED = CACHES['sessions']['BACKEND'] != 'django.core.cache.backends.locmem.LocMemCache'
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('SESSION_BACKEND', 'cached_db' if SESSIONS_CACHE_SHARED else 'db')]
+SESSION_CACHE_ALIAS = 'sessions'
+
+# ModelBackend keeps loading the users of the sessions logged in before CachedModelBackend was added
+AUTHENTICATION_BACKENDS = ['accounts.backends.CachedModelBackend', 'django.contrib.auth.backends.ModelBackend']
+AUTH_USER_CACHE_ALIAS = 'sessions'
+AUTH_USER_CACHE_TIMEOUT = 60 * 60
+AUTH_USER_CACHE_ENABLED = SESSIONS_CACHE_SHARED and os.environ.get('AUTH_USER_CACHE', '1') == '1'
+
+
+# Request profiling
+#
+# REQUEST_PROFILING=1 adds a Server-Timing header and a JSON line in the mmd_project.profiling log to every response.
+# Requests of the REQUEST_PROFILING_VIEWS additionally run under cProfile, and the profile and the SQL of the slowest
+# REQUEST_PROFILING_SLOWEST fraction of them are written to REQUEST_PROFILING_DIR. Set the fraction to 0 to turn that off.
+
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING') == '1'
+REQUEST_PROFILING_VIEWS = [
+    'schedules.views.ScheduleDetailView',
+    'schedules.views.ScheduleListView',
+    'schedules.views.FreeTimeView',
+    'schedules.views.ScheduleOverlayView',
+    'schedules.views.ScheduleExportView',
+    'schedules.views.ScheduleListExportView',
+]
+REQUEST_PROFILING_SLOWEST = float(os.environ.get('REQUEST_PROFILING_SLOWEST', 0.05))
+REQUEST_PROFILING_DIR = os.environ.get('REQUEST_PROFILING_DIR', BASE_DIR / 'profiles')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'mmd_project.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -104,6 +251,35 @@ AUTH_PASSWORD_VALIDATORS = [
 AUTH_USER_MODEL = 'accounts.CustomUser'
 
 
+# Password hashing
+# https://docs.djangoproject.com/en/3.1/topics/auth/passwords/
+#
+# PASSWORD_HASHING_PROFILE picks the hashers, the first one hashes new passwords and the others only verify existing
+# hashes. A successful login rehashes a password stored with another hasher or other parameters than the first one.
+# 'production' hashes with scrypt, see accounts/hashers.py, and upgrades the PBKDF2 hashes of older accounts.
+# 'test' hashes with MD5, which is insecure and only meant to make the users of the tests cheap; manage.py test
+# picks it unless the variable says otherwise.
+
+PASSWORD_HASHING_PROFILES = {
+    'production': [
+        'accounts.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ],
+    'test': [
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+        'accounts.hashers.ScryptPasswordHasher',
+        'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    ],
+}
+PASSWORD_HASHING_PROFILE = os.environ.get(
+    'PASSWORD_HASHING_PROFILE', 'test' if sys.argv[1:2] == ['test'] else 'production'
+)
+PASSWORD_HASHERS = PASSWORD_HASHING_PROFILES[PASSWORD_HASHING_PROFILE]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
 
@@ -122,6 +298,15 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# STATIC_PROFILE=production makes collectstatic store the files under content hashed names with gzip and brotli
+# variants, and mmd_project.wsgi serve them from STATIC_ROOT with immutable cache headers, see mmd_project/staticfiles.py.
+# Run manage.py collectstatic before the server starts, the templates fail on files missing from the manifest.
+
+STATIC_PROFILE = os.environ.get('STATIC_PROFILE', 'development')
+if STATIC_PROFILE == 'production':
+    STATICFILES_STORAGE = 'mmd_project.staticfiles.CompressedManifestStaticFilesStorage'
 
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = 'login'
@@ -0,0 +1,189 @@
+"""
+Static files of the production profile, see the STATIC_PROFILE setting.
+
+collectstatic stores the files under names which contain a hash of their content, along with gzip and brotli
+compressed variants. StaticFilesApplication serves them from STATIC_ROOT in front of Django: hashed names never change
+their content, so browsers may keep them for a year without asking again, and clients get the smallest variant they
+accept. Brotli needs the brotli library (requirements-brotli.txt), without it only gzip variants are written.
+"""
+import gzip
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+from pathlib import Path
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.map', '.svg', '.txt', '.json', '.xml', '.html', '.ico')
+# the variants are served as Content-Encoding, a variant saving less than this is not worth decoding
+MIN_SAVING = 0.05
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# files requested by their original name may change with the next deployment
+MUTABLE_MAX_AGE = 60
+CHUNK_SIZE = 64 * 1024
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _compressors():
+    # mtime=0 keeps the gzip files of unchanged content identical between builds
+    compressors = [('.gz', lambda content: gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        compressors.insert(0, ('.br', lambda content: brotli.compress(content, quality=11)))
+    return compressors
+
+
+def compress_file(path):
+    """ Writes the compressed variants of the file which are small enough, returns their paths """
+    content = path.read_bytes()
+    written = []
+    for suffix, compress in _compressors():
+        compressed = compress(content)
+        if len(compressed) <= len(content) * (1 - MIN_SAVING):
+            variant = path.with_name(path.name + suffix)
+            variant.write_bytes(compressed)
+            written.append(variant)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ ManifestStaticFilesStorage which also writes compressed variants of the collected text files """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        # both the original and the hashed names are collected, and either may be requested
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.exists(name):
+                compress_file(Path(self.path(name)))
+
+
+def accepted_encodings(header):
+    """ The content codings of an Accept-Encoding header, without the ones refused with q=0 """
+    encodings = set()
+    for item in header.split(','):
+        coding, *parameters = [part.strip() for part in item.split(';')]
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        if coding and quality > 0:
+            encodings.add(coding.lower())
+    return encodings
+
+
+class StaticFile:
+    """ A collected file with its compressed variants and the headers they are served with """
+
+    def __init__(self, path, immutable):
+        self.variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.variants[encoding] = (variant, variant.stat().st_size)
+        stat = path.stat()
+        self.variants[None] = (path, stat.st_size)
+        content_type, _ = mimetypes.guess_type(path.name)
+        if content_type and content_type.startswith('text/'):
+            content_type += '; charset=utf-8'
+        if immutable:
+            cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = f'public, max-age={MUTABLE_MAX_AGE}'
+        self.headers = [
+            ('Content-Type', content_type or 'application/octet-stream'),
+            ('Cache-Control', cache_control),
+            ('Last-Modified', formatdate(stat.st_mtime, usegmt=True)),
+        ]
+        if len(self.variants) > 1:
+            self.headers.append(('Vary', 'Accept-Encoding'))
+        self.etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+    def choose(self, accept_encoding):
+        """ The encoding, path and size of the smallest variant the client accepts """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                return (encoding, *self.variants[encoding])
+        return (None, *self.variants[None])
+
+    def respond(self, environ, start_response):
+        encoding, path, size = self.choose(environ.get('HTTP_ACCEPT_ENCODING', ''))
+        # the variants differ in their bytes, so they need different entity tags
+        etag = f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+        headers = [*self.headers, ('ETag', etag)]
+        if etag in [tag.strip() for tag in environ.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            start_response('304 Not Modified', headers)
+            return []
+
+        headers.append(('Content-Length', str(size)))
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        # the WSGI server closes the file by closing the returned iterable once the response is sent
+        file = open(path, 'rb')  # pylint: disable=consider-using-with
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, CHUNK_SIZE)
+        return _iter_file(file)
+
+
+def _iter_file(file):
+    with file:
+        yield from iter(lambda: file.read(CHUNK_SIZE), b'')
+
+
+def index_static_files(root):
+    """ Maps the names of the files under root, except the compressed variants, to StaticFile objects """
+    root = Path(root)
+    manifest = root / ManifestStaticFilesStorage.manifest_name
+    hashed_names = set()
+    if manifest.is_file():
+        hashed_names = set(json.loads(manifest.read_text(encoding='utf-8')).get('paths', {}).values())
+
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = Path(directory, name)
+            relative = path.relative_to(root).as_posix()
+            if relative.endswith(tuple(suffix for _, suffix in ENCODINGS)) and path.with_suffix('').is_file():
+                continue
+            files[relative] = StaticFile(path, immutable=relative in hashed_names)
+    return files
+
+
+class StaticFilesApplication:
+    """
+    WSGI application serving the static files collected to root under the URL prefix, other requests go to application.
+
+    The files are indexed once when the application is created, so a request never touches the file system before its
+    file is opened and requests for other paths never reach it. Files collected later take a restart.
+    """
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.prefix = prefix if prefix.endswith('/') else f'{prefix}/'
+        self.files = index_static_files(root) if Path(root).is_dir() else {}
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        static_file = self.files.get(path[len(self.prefix):]) if path.startswith(self.prefix) else None
+        if static_file is None:
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            start_response('405 Method Not Allowed', [('Allow', 'GET, HEAD'), ('Content-Length', '0')])
+            return []
+        return static_file.respond(environ, start_response)
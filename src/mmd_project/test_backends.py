@@ -0,0 +1,68 @@
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from mmd_project.backends.sqlite3.base import DatabaseWrapper
+
+OPTIONS = {
+    'timeout': 20,
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+    'transaction_mode': 'IMMEDIATE',
+}
+
+
+class TestSQLiteBackend(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = Path(directory) / 'db.sqlite3'
+
+    def open(self, **options):
+        wrapper = DatabaseWrapper({**connection.settings_dict, 'NAME': self.path, 'OPTIONS': {**OPTIONS, **options}})
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    @contextmanager
+    def transaction(self, wrapper):
+        """ Starts a transaction the way atomic() does on SQLite """
+        wrapper.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        try:
+            yield
+        finally:
+            wrapper.rollback()
+            wrapper.set_autocommit(True)
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_applies_init_command_and_timeout(self):
+        wrapper = self.open()
+
+        self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+        self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+        self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 20000)
+
+    def test_transactions_take_the_write_lock_when_they_start(self):
+        wrapper = self.open()
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+
+        with self.transaction(wrapper):
+            with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+                other.execute('BEGIN IMMEDIATE')
+
+    def test_deferred_transactions_take_no_lock_when_they_start(self):
+        wrapper = self.open(transaction_mode='DEFERRED')
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+
+        with self.transaction(wrapper):
+            other.execute('BEGIN IMMEDIATE')
+            other.execute('ROLLBACK')
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from mmd_project.middleware import DatabaseHealthCheckMiddleware, RequestProfilingMiddleware
+from schedules.models import Schedule
+
+
+class FakeConnections(dict):
+    """ Stands in for django.db.connections, which maps aliases to connections and has their settings """
+
+    @property
+    def databases(self):
+        return {alias: connection.settings_dict for alias, connection in self.items()}
+
+
+def fake_connection(health_checks=True, usable=True, in_atomic_block=False):
+    return mock.Mock(
+        settings_dict={'CONN_HEALTH_CHECKS': health_checks},
+        connection=object(),
+        in_atomic_block=in_atomic_block,
+        **{'is_usable.return_value': usable}
+    )
+
+
+class TestDatabaseHealthCheckMiddleware(SimpleTestCase):
+    def run_request(self, connections):
+        with mock.patch('mmd_project.middleware.connections', connections):
+            middleware = DatabaseHealthCheckMiddleware(lambda request: HttpResponse())
+            return middleware(RequestFactory().get('/'))
+
+    def test_is_not_used_without_health_checks(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            self.run_request(FakeConnections(default=fake_connection(health_checks=False)))
+
+    def test_closes_broken_connection(self):
+        connection = fake_connection(usable=False)
+
+        self.run_request(FakeConnections(default=connection))
+
+        connection.close.assert_called_once()
+
+    def test_keeps_working_connection(self):
+        connection = fake_connection()
+
+        self.run_request(FakeConnections(default=connection))
+
+        connection.close.assert_not_called()
+
+    def test_leaves_connection_within_transaction_alone(self):
+        connection = fake_connection(usable=False, in_atomic_block=True)
+
+        self.run_request(FakeConnections(default=connection))
+
+        connection.is_usable.assert_not_called()
+        connection.close.assert_not_called()
+
+    def test_passes_async_requests_on(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        connection = fake_connection(usable=False)
+        with mock.patch('mmd_project.middleware.connections', FakeConnections(default=connection)):
+            middleware = DatabaseHealthCheckMiddleware(get_response)
+
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        self.assertEqual(async_to_sync(middleware)(RequestFactory().get('/')).status_code, 200)
+        connection.close.assert_not_called()
+
+
+@override_settings(REQUEST_PROFILING=True, REQUEST_PROFILING_SLOWEST=0)
+class TestRequestProfilingMiddleware(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='user', password='password')
+        self.schedule = Schedule.objects.create(name='schedule', author=self.user)
+        self.client.force_login(self.user)
+
+    def get_schedule(self):
+        with self.assertLogs('mmd_project.profiling', 'INFO') as logs:
+            response = self.client.get(reverse('schedules:schedule_detail', args=[self.schedule.pk]))
+        return response, json.loads(logs.records[-1].getMessage())
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_is_not_used_when_disabled(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            RequestProfilingMiddleware(lambda request: HttpResponse())
+
+    def test_reports_timings_in_header(self):
+        response, _ = self.get_schedule()
+
+        metrics = [metric.split(';')[0] for metric in response['Server-Timing'].split(', ')]
+        self.assertEqual(metrics, ['total', 'db', 'template', 'cache'])
+
+    def test_logs_request_profile(self):
+        _, profile = self.get_schedule()
+
+        self.assertEqual(profile['view'], 'schedules.views.ScheduleDetailView')
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['db_queries'], 0)
+        self.assertGreater(profile['template_ms'], 0)
+
+    def test_counts_cache_lookups_of_request(self):
+        _, cold = self.get_schedule()
+        _, warm = self.get_schedule()
+
+        self.assertEqual(cold['cache_hits'], 0)
+        self.assertGreater(cold['cache_misses'], 0)
+        self.assertGreater(warm['cache_hits'], 0)
+        self.assertEqual(warm['cache_misses'], 0)
+
+    def test_dumps_slowest_requests_of_sampled_views(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with override_settings(REQUEST_PROFILING_SLOWEST=0.5, REQUEST_PROFILING_DIR=directory):
+            self.get_schedule()
+
+        dumps = sorted(path.suffix for path in Path(directory).iterdir())
+        self.assertEqual(dumps, ['.prof', '.sql'])
+        sql = next(Path(directory).glob('*.sql')).read_text()
+        self.assertIn('FROM "schedules_schedule"', sql)
+
+    def test_does_not_dump_other_views(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        with override_settings(REQUEST_PROFILING_SLOWEST=0.5, REQUEST_PROFILING_DIR=directory):
+            with self.assertLogs('mmd_project.profiling', 'INFO'):
+                self.client.get(reverse('schedules:schedule_create'))
+
+        self.assertEqual(list(Path(directory).iterdir()), [])
@@ -0,0 +1,156 @@
+import gzip
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from mmd_project.staticfiles import (IMMUTABLE_MAX_AGE, MUTABLE_MAX_AGE, StaticFilesApplication, accepted_encodings,
+                                     brotli, compress_file)
+
+CSS = Path(settings.BASE_DIR, 'schedules', 'static', 'schedules', 'base.css').read_text(encoding='utf-8')
+
+
+class CollectedStaticFilesMixin:
+    """ Collects the static files of the schedules app with the storage of the production profile """
+
+    @classmethod
+    def setUpClass(cls):  # pylint: disable=invalid-name
+        cls.static_root = Path(tempfile.mkdtemp())
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        cls.static_settings = override_settings(
+            STATIC_ROOT=cls.static_root,
+            STATICFILES_STORAGE='mmd_project.staticfiles.CompressedManifestStaticFilesStorage',
+            STATICFILES_DIRS=[Path(settings.BASE_DIR, 'schedules', 'static')],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        cls.static_settings.enable()
+        cls.addClassCleanup(cls.static_settings.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def hashed_name(cls):
+        return next(path.name for path in (cls.static_root / 'schedules').glob('base.*.css'))
+
+
+class TestCompressedManifestStaticFilesStorage(CollectedStaticFilesMixin, SimpleTestCase):
+    def test_stores_files_under_content_hash(self):
+        self.assertRegex(self.hashed_name(), r'^base\.[0-9a-f]{12}\.css$')
+        self.assertEqual((self.static_root / 'schedules' / self.hashed_name()).read_text(encoding='utf-8'), CSS)
+
+    def test_writes_gzip_variants(self):
+        for name in ['base.css', self.hashed_name()]:
+            compressed = (self.static_root / 'schedules' / f'{name}.gz').read_bytes()
+
+            self.assertEqual(gzip.decompress(compressed).decode(), CSS)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_writes_brotli_variants(self):
+        compressed = (self.static_root / 'schedules' / f'{self.hashed_name()}.br').read_bytes()
+
+        self.assertEqual(brotli.decompress(compressed).decode(), CSS)
+
+    def test_skips_variants_not_saving_enough(self):
+        path = self.static_root / 'tiny.css'
+        path.write_text('a{}', encoding='utf-8')
+
+        self.assertEqual(compress_file(path), [])
+
+
+class TestHashedStaticUrls(CollectedStaticFilesMixin, TestCase):
+    def test_page_links_hashed_stylesheet(self):
+        response = self.client.get(reverse('login'))
+
+        self.assertContains(response, f'href="{settings.STATIC_URL}schedules/{self.hashed_name()}"')
+        self.assertNotContains(response, '<style>')
+
+
+class TestAcceptedEncodings(SimpleTestCase):
+    def test_parses_header(self):
+        self.assertEqual(accepted_encodings('gzip, deflate, br'), {'gzip', 'deflate', 'br'})
+        self.assertEqual(accepted_encodings('br;q=0, GZIP;q=0.5'), {'gzip'})
+        self.assertEqual(accepted_encodings(''), set())
+
+
+class TestStaticFilesApplication(CollectedStaticFilesMixin, SimpleTestCase):
+    def setUp(self):
+        self.application = StaticFilesApplication(self.django_application, self.static_root, settings.STATIC_URL)
+
+    @staticmethod
+    def django_application(environ, start_response):  # pylint: disable=unused-argument
+        start_response('404 Not Found', [])
+        return [b'django']
+
+    def request(self, path, method='GET', **headers):
+        environ = {'PATH_INFO': path, 'REQUEST_METHOD': method, **headers}
+        setup_testing_defaults(environ)
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = status
+            response['headers'] = dict(response_headers)
+
+        body = b''.join(self.application(environ, start_response))
+        return response['status'], response['headers'], body
+
+    def test_serves_hashed_file_as_immutable(self):
+        status, headers, body = self.request(f'/static/schedules/{self.hashed_name()}')
+
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Cache-Control'], f'public, max-age={IMMUTABLE_MAX_AGE}, immutable')
+        self.assertEqual(headers['Content-Type'], 'text/css; charset=utf-8')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(body.decode(), CSS)
+
+    def test_serves_original_name_briefly(self):
+        _, headers, _ = self.request('/static/schedules/base.css')
+
+        self.assertEqual(headers['Cache-Control'], f'public, max-age={MUTABLE_MAX_AGE}')
+
+    def test_serves_gzip_variant(self):
+        _, headers, body = self.request(f'/static/schedules/{self.hashed_name()}', HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Content-Length'], str(len(body)))
+        self.assertEqual(gzip.decompress(body).decode(), CSS)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_prefers_brotli_variant(self):
+        _, headers, body = self.request(f'/static/schedules/{self.hashed_name()}', HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(headers['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(body).decode(), CSS)
+
+    def test_answers_matching_etag_with_not_modified(self):
+        path = f'/static/schedules/{self.hashed_name()}'
+        _, headers, _ = self.request(path, HTTP_ACCEPT_ENCODING='gzip')
+
+        status, _, body = self.request(path, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=headers['ETag'])
+
+        self.assertEqual(status, '304 Not Modified')
+        self.assertEqual(body, b'')
+
+    def test_answers_head_without_body(self):
+        status, headers, body = self.request(f'/static/schedules/{self.hashed_name()}', method='HEAD')
+
+        self.assertEqual(status, '200 OK')
+        self.assertEqual(headers['Content-Length'], str(len(CSS.encode())))
+        self.assertEqual(body, b'')
+
+    def test_refuses_other_methods(self):
+        status, _, _ = self.request(f'/static/schedules/{self.hashed_name()}', method='POST')
+
+        self.assertEqual(status, '405 Method Not Allowed')
+
+    def test_passes_other_paths_on(self):
+        for path in ['/', '/static/missing.css', '/static/../settings.py', f'/static/schedules/{self.hashed_name()}.gz']:
+            status, _, body = self.request(path)
+
+            self.assertEqual((status, body), ('404 Not Found', b'django'))
@@ -19,6 +19,7 @@ from django.urls import include, path
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('accounts/', include('accounts.urls')),
+    path('api/', include('schedules.api_urls')),
     path('schedules/', include('schedules.urls')),
     path('', include('schedules.urls', namespace='schedules:schedule_list')),
 ]
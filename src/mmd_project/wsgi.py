@@ -1,7 +1,8 @@
 """
 WSGI config for mmd_project project.
 
-It exposes the WSGI callable as a module-level variable named ``application``.
+It exposes the WSGI callable as a module-level variable named ``application``. With STATIC_PROFILE=production
+it serves the collected static files as well.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.1/howto/deployment/wsgi/
@@ -9,8 +10,14 @@ https://docs.djangoproject.com/en/3.1/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from mmd_project.staticfiles import StaticFilesApplication
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mmd_project.settings')
 
 application = get_wsgi_application()
+
+if settings.STATIC_PROFILE == 'production':
+    application = StaticFilesApplication(application, settings.STATIC_ROOT, settings.STATIC_URL)
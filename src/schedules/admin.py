@@ -1,19 +1,156 @@
+"""
+Admin of the schedules, built for tables of millions of entries.
+
+Foreign keys are joined into the changelists and edited with raw id widgets, so no page loads a whole related table.
+Changelists count at most COUNT_LIMIT rows, see EstimatedCountPaginator, and a schedule page shows the first
+INLINE_ENTRY_LIMIT entries with a link to all of them.
+
+Where the database rejects overlapping entries, see ScheduleEntry.overlaps_rejected_by_database(), the forms of the
+admin check them up front anyway, since the admin cannot report a failed save on its forms.
+"""
+from django import forms
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.db import IntegrityError, connections
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html
+from django.utils.http import urlencode
+
+from schedules.intervals import find_collisions
+from schedules.models import OVERLAP_MESSAGE, Schedule, ScheduleEntry
+
+COUNT_LIMIT = 10000
+INLINE_ENTRY_LIMIT = 50
+AUTHOR_FILTER_LIMIT = 100
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Counts at most COUNT_LIMIT rows instead of the whole filtered table.
+
+    An unfiltered list of a larger PostgreSQL table takes the row estimate of the planner, which costs no scan at all.
+    Other lists past COUNT_LIMIT rows link to their first COUNT_LIMIT rows only, narrowing them down with the filters
+    reaches the rest.
+    """
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = self._estimate(queryset)
+            if estimate is not None and estimate > COUNT_LIMIT:
+                return estimate
+        return queryset[:COUNT_LIMIT].count()
+
+    @staticmethod
+    def _estimate(queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
+
 
-from schedules.models import Schedule, ScheduleEntry
+class AuthorListFilter(admin.RelatedFieldListFilter):
+    """ Lists the first AUTHOR_FILTER_LIMIT users and the selected one, rather than the whole user table """
+    def field_choices(self, field, request, model_admin):
+        users = get_user_model().objects.order_by('username').only('username')
+        choices = [(user.pk, str(user)) for user in users[:AUTHOR_FILTER_LIMIT]]
+        if self.lookup_val and self.lookup_val not in {str(pk) for pk, _label in choices}:
+            choices.extend((user.pk, str(user)) for user in users.filter(pk=self.lookup_val))
+        return choices
+
+
+class ScheduleEntryAdminForm(forms.ModelForm):
+    """ Checks overlaps with the stored entries on every database, clean() leaves them to PostgreSQL """
+    def clean(self):
+        cleaned_data = super().clean()
+        schedule = cleaned_data.get('schedule')
+        interval = [cleaned_data.get(field) for field in ('day', 'start_time', 'end_time')]
+        if (ScheduleEntry.overlaps_rejected_by_database() and schedule is not None and schedule.pk is not None
+                and None not in interval and interval[1] < interval[2]):
+            colliding = ScheduleEntry.objects.overlapping(schedule.pk, *interval)
+            if self.instance.pk is not None:
+                colliding = colliding.exclude(pk=self.instance.pk)
+            if colliding.exists():
+                self.add_error('start_time', OVERLAP_MESSAGE)
+        return cleaned_data
+
+
+class CappedInlineFormSet(BaseInlineFormSet):
+    """ Edits the first INLINE_ENTRY_LIMIT entries of the schedule only """
+    def get_queryset(self):
+        if not hasattr(self, '_queryset'):
+            self._queryset = super().get_queryset()[:INLINE_ENTRY_LIMIT]  # pylint: disable=attribute-defined-outside-init
+        return self._queryset
+
+    def clean(self):
+        """ Rejects entries of the formset colliding with each other, each form checks the stored entries only """
+        super().clean()
+        candidates = [
+            (index, form.cleaned_data['day'], form.cleaned_data['start_time'], form.cleaned_data['end_time'])
+            for index, form in enumerate(self.forms)
+            if not form.errors and form.cleaned_data and not form.cleaned_data.get('DELETE')
+        ]
+        for index in find_collisions([], candidates):
+            self.forms[index].add_error('start_time', OVERLAP_MESSAGE)
+
+
+class OverlapRetryMixin:
+    """
+    Shows the form again when the database rejects an overlap with an entry saved by someone else since the
+    validation. The validation of the second attempt finds that entry and reports the overlap on the form.
+    """
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except IntegrityError as error:
+            if not ScheduleEntry.is_overlap_error(error):
+                raise
+        return super().changeform_view(request, object_id, form_url, extra_context)
 
 
 class ScheduleEntryInline(admin.TabularInline):
     model = ScheduleEntry
+    form = ScheduleEntryAdminForm
+    formset = CappedInlineFormSet
+    extra = 1
 
 
-class ScheduleAdmin(admin.ModelAdmin):
+class ScheduleAdmin(OverlapRetryMixin, admin.ModelAdmin):
     list_display = ('name', 'author')
+    list_select_related = ('author',)
+    raw_id_fields = ('author',)
+    readonly_fields = ('entries',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     inlines = [ScheduleEntryInline]
 
+    def entries(self, obj):
+        if obj.pk is None:
+            return '-'
+        url = reverse('admin:schedules_scheduleentry_changelist')
+        return format_html(
+            '<a href="{}?{}">All entries</a>, the list below shows the first {}',
+            url, urlencode({'schedule__id__exact': obj.pk}), INLINE_ENTRY_LIMIT
+        )
+
+
+class ScheduleEntryAdmin(OverlapRetryMixin, admin.ModelAdmin):
+    form = ScheduleEntryAdminForm
+    list_display = ('title', 'schedule', 'day', 'start_time', 'end_time')
+    list_select_related = ('schedule',)
+    list_filter = ('day', ('schedule__author', AuthorListFilter))
+    raw_id_fields = ('schedule',)
+    # the primary key makes the order total, so that scanning scheduleentry_day_start_idx needs no sort
+    ordering = ('day', 'start_time', 'pk')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-class ScheduleEntryAdmin(admin.ModelAdmin):
-    list_display = ('title', 'day', 'start_time', 'end_time')
 
 admin.site.register(Schedule, ScheduleAdmin)
 admin.site.register(ScheduleEntry, ScheduleEntryAdmin)
@@ -0,0 +1,212 @@
+"""
+JSON API mirroring the HTML views of the schedules app.
+
+Requests are authenticated with the session, so unsafe methods need the CSRF token in the X-CSRFToken header.
+List endpoints use keyset pagination: the opaque cursor encodes the sort key of the last returned row, so a page
+is a single index range scan however deep it is. Responses of a schedule carry an ETag derived from its cache
+version, so clients can revalidate them with If-None-Match. The versions of a per-process cache differ between the
+server processes and miss the changes made by the others, so the ETags are left out unless the cache is shared.
+"""
+import json
+
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views.generic import View
+
+from schedules.cache import get_version, versions_shared
+from schedules.forms import ScheduleEntryForm, ScheduleForm, entry_transaction, partial_model_form, save_model_form
+from schedules.models import Schedule, ScheduleEntry
+from schedules.pagination import InvalidCursor, paginate_keyset
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+ENTRY_FIELDS = ('title', 'description', 'day', 'start_time', 'end_time')
+
+
+class ApiError(Exception):
+    def __init__(self, status, detail):
+        super().__init__(detail)
+        self.status = status
+        self.detail = detail
+
+
+def serialize_schedule(schedule):
+    return {'id': schedule.pk, 'name': schedule.name}
+
+
+def serialize_entry(entry, fields=ENTRY_FIELDS):
+    data = {'id': entry.pk}
+    for field in fields:
+        value = getattr(entry, field)
+        if field in ('start_time', 'end_time'):
+            value = value.isoformat()
+        data[field] = value
+    return data
+
+
+class ApiView(View):
+    """ Session authenticated JSON endpoint which reports errors as JSON as well """
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return JsonResponse({'detail': 'Not found.'}, status=404)
+        except ApiError as error:
+            return JsonResponse({'detail': error.detail}, status=error.status)
+
+    def get_owned_schedule(self, pk, queryset=None):
+        schedule = get_object_or_404(Schedule.objects.all() if queryset is None else queryset, pk=pk)
+        if schedule.author_id != self.request.user.pk:
+            raise ApiError(403, 'You do not have permission to perform this action.')
+        return schedule
+
+    def get_page_size(self):
+        try:
+            page_size = int(self.request.GET.get('limit', DEFAULT_PAGE_SIZE))
+        except ValueError as error:
+            raise ApiError(400, 'Invalid limit.') from error
+        return max(1, min(page_size, MAX_PAGE_SIZE))
+
+    def get_fields(self, allowed):
+        if 'fields' not in self.request.GET:
+            return allowed
+        fields = tuple(field for field in self.request.GET['fields'].split(',') if field)
+        unknown = set(fields) - set(allowed)
+        if unknown:
+            raise ApiError(400, f"Unknown fields: {', '.join(sorted(unknown))}.")
+        return fields
+
+    def read_json(self):
+        try:
+            data = json.loads(self.request.body or b'{}')
+        except ValueError as error:
+            raise ApiError(400, 'Malformed JSON.') from error
+        if not isinstance(data, dict):
+            raise ApiError(400, 'Expected a JSON object.')
+        return data
+
+    def conditional(self, etag, build_response):
+        """ Answers 304 when the client already has the current representation """
+        if not versions_shared():
+            return build_response()
+        # the representation depends on the query string as well, e.g. on the projected fields
+        etag = f'"{etag}-{self.request.GET.urlencode()}"'
+        response = get_conditional_response(self.request, etag=etag)
+        if response is None:
+            response = build_response()
+        response['ETag'] = etag
+        return response
+
+    def page(self, queryset, key_fields, serialize):
+        """ Returns the page following the cursor of the queryset ordered by key_fields """
+        try:
+            page = paginate_keyset(queryset, key_fields, self.get_page_size(), after=self.request.GET.get('cursor'))
+        except InvalidCursor as error:
+            raise ApiError(400, 'Invalid cursor.') from error
+
+        next_url = None
+        if page.next_cursor is not None:
+            query = self.request.GET.copy()
+            query['cursor'] = page.next_cursor
+            next_url = self.request.build_absolute_uri(f'{self.request.path}?{query.urlencode()}')
+        return JsonResponse({'results': [serialize(item) for item in page.object_list], 'next': next_url})
+
+    def save_form(self, form_class, instance, partial, **extra):
+        data = self.read_json()
+        for field, value in extra.items():
+            setattr(instance, field, value)
+        # a partial update validates and writes the given fields only
+        form = partial_model_form(form_class, instance, data) if partial else form_class(data, instance=instance)
+        with entry_transaction():
+            instance = save_model_form(form, partial) if form.is_valid() else None
+        if instance is None:
+            return None, JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        return instance, None
+
+
+class ScheduleListApi(ApiView):
+    def get(self, request):
+        user_pk = request.user.pk
+        return self.conditional(
+            f"schedules-{get_version('schedule-list', user_pk)}",
+            lambda: self.page(Schedule.objects.filter(author_id=user_pk), ('pk', ), serialize_schedule)
+        )
+
+    def post(self, request):
+        schedule, error = self.save_form(ScheduleForm, Schedule(), partial=False, author=request.user)
+        return error or JsonResponse(serialize_schedule(schedule), status=201)
+
+
+class ScheduleApi(ApiView):
+    def get(self, request, pk):
+        schedule = self.get_owned_schedule(pk)
+        return self.conditional(
+            f"schedule-{pk}-{get_version('schedule', pk)}",
+            lambda: JsonResponse(serialize_schedule(schedule))
+        )
+
+    def put(self, request, pk, partial=False):
+        schedule, error = self.save_form(ScheduleForm, self.get_owned_schedule(pk), partial)
+        return error or JsonResponse(serialize_schedule(schedule))
+
+    def patch(self, request, pk):
+        return self.put(request, pk, partial=True)
+
+    def delete(self, request, pk):
+        self.get_owned_schedule(pk).delete()
+        return HttpResponse(status=204)
+
+
+class ScheduleEntryListApi(ApiView):
+    def get(self, request, schedule_id):
+        self.get_owned_schedule(schedule_id, Schedule.objects.only('author'))
+        fields = self.get_fields(ENTRY_FIELDS)
+        entries = ScheduleEntry.objects.filter(schedule_id=schedule_id).only('day', 'start_time', *fields)
+        return self.conditional(
+            f"entries-{schedule_id}-{get_version('schedule', schedule_id)}",
+            lambda: self.page(entries, ('day', 'start_time', 'pk'), lambda entry: serialize_entry(entry, fields))
+        )
+
+    def post(self, request, schedule_id):
+        schedule = self.get_owned_schedule(schedule_id, Schedule.objects.only('author'))
+        entry, error = self.save_form(ScheduleEntryForm, ScheduleEntry(), partial=False, schedule=schedule)
+        return error or JsonResponse(serialize_entry(entry), status=201)
+
+
+class ScheduleEntryApi(ApiView):
+    def get_entry(self, schedule_id, pk, fields=ENTRY_FIELDS):
+        """ Fetches the entry together with the ownership check in a single joined query """
+        try:
+            return ScheduleEntry.objects.select_related('schedule').only('schedule__author', *fields).get(
+                schedule_id=schedule_id,
+                schedule__author=self.request.user,
+                pk=pk
+            )
+        except ScheduleEntry.DoesNotExist as error:
+            # Only a failed lookup pays for telling someone else's schedule (403) from a missing one (404)
+            self.get_owned_schedule(schedule_id, Schedule.objects.only('author'))
+            raise Http404 from error
+
+    def get(self, request, schedule_id, pk):
+        fields = self.get_fields(ENTRY_FIELDS)
+        entry = self.get_entry(schedule_id, pk, fields)
+        return self.conditional(
+            f"entry-{pk}-{get_version('schedule', schedule_id)}",
+            lambda: JsonResponse(serialize_entry(entry, fields))
+        )
+
+    def put(self, request, schedule_id, pk, partial=False):
+        entry, error = self.save_form(ScheduleEntryForm, self.get_entry(schedule_id, pk), partial)
+        return error or JsonResponse(serialize_entry(entry))
+
+    def patch(self, request, schedule_id, pk):
+        return self.put(request, schedule_id, pk, partial=True)
+
+    def delete(self, request, schedule_id, pk):
+        self.get_entry(schedule_id, pk).delete()
+        return HttpResponse(status=204)
@@ -0,0 +1,13 @@
+from django.urls import path
+
+from schedules.async_views import schedule_week_api
+from schedules.api import ScheduleApi, ScheduleEntryApi, ScheduleEntryListApi, ScheduleListApi
+
+app_name = 'schedules_api'
+urlpatterns = [
+    path('schedules/', ScheduleListApi.as_view(), name='schedule_list'),
+    path('schedules/<int:pk>/', ScheduleApi.as_view(), name='schedule'),
+    path('schedules/<int:pk>/week/', schedule_week_api, name='schedule_week'),
+    path('schedules/<int:schedule_id>/entries/', ScheduleEntryListApi.as_view(), name='scheduleentry_list'),
+    path('schedules/<int:schedule_id>/entries/<int:pk>/', ScheduleEntryApi.as_view(), name='scheduleentry'),
+]
@@ -1,5 +1,36 @@
-from django.apps import AppConfig
+from pathlib import Path
+
+from django.apps import AppConfig, apps
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+
+
+def warm_templates(app_configs):
+    """
+    Loads the templates of the given apps into every template engine whose loader caches them.
+
+    Returns the number of templates loaded, engines which would parse them again on every use are left out.
+    """
+    loaded = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        if not any(isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders):
+            continue
+        for app_config in app_configs:
+            directory = Path(app_config.path) / 'templates'
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                loaded += 1
+    return loaded
 
 
 class SchedulesConfig(AppConfig):
     name = 'schedules'
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel,unused-import
+        import schedules.signals
+        # Django's own apps bring far more templates than the pages of the project use
+        warm_templates([app_config for app_config in apps.get_app_configs() if not app_config.name.startswith('django.')])
@@ -0,0 +1,174 @@
+"""
+Async variants of the read-heavy schedule endpoints, served by the ASGI application (mmd_project.asgi).
+
+While an async request waits for the database or for a slow client it holds no worker thread. The ORM of Django 3.1
+is synchronous, so each view bundles its database work into as few database_sync_to_async() calls as it can and runs
+the independent ones concurrently. Pages are rendered on the event loop from what those calls loaded, with the
+templates and the caches of the synchronous views.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user
+from django.contrib.auth.views import redirect_to_login
+from django.core.exceptions import PermissionDenied
+from django.db import close_old_connections
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+
+from mmd_project.middleware import close_broken_connections, health_checked_aliases
+from schedules.api import serialize_entry
+from schedules.cache import get_or_compute, get_version, versions_shared
+from schedules.models import Schedule, ScheduleDaySummary, ScheduleEntry
+from schedules.views import ScheduleListView
+from schedules.week import load_week
+
+# the day is implied by the day the entries are listed under
+ENTRY_FIELDS = ('title', 'description', 'start_time', 'end_time')
+
+
+def database_sync_to_async(func):
+    """
+    Runs func in a worker thread of its own, so that calls awaited together query the database concurrently.
+
+    No request signals reach the worker threads, so every call closes the connections of its thread which failed or
+    outlived CONN_MAX_AGE before and after it runs, as those signals do for request threads. With the default
+    CONN_MAX_AGE of 0 that closes them after every call. Connections which stopped working are replaced before a call
+    uses them.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        close_broken_connections(health_checked_aliases())
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def _authenticate(request):
+    """ Loads the session and the user of the request, so that later accesses of request.user need no database """
+    request.user = get_user(request)
+    return request.user.is_authenticated
+
+
+def _get_schedule(pk):
+    return Schedule.objects.filter(pk=pk).first()
+
+
+def _load_schedule(request, pk):
+    """ The schedule for an authenticated user, None for an anonymous one """
+    return _get_schedule(pk) if _authenticate(request) else None
+
+
+def _load_schedule_and_version(request, pk):
+    if not _authenticate(request):
+        return None, None
+    # read first, so that the version never claims changes the loaded data lacks
+    version = get_version('schedule', pk)
+    return _get_schedule(pk), version
+
+
+def _check_owner(schedule, user):
+    if schedule is None:
+        raise Http404
+    if schedule.author_id != user.pk:
+        raise PermissionDenied
+
+
+def _list_context(request):
+    """ The context of the synchronous list view for an authenticated user, None for an anonymous one """
+    if not _authenticate(request):
+        return None
+    view = ScheduleListView()
+    view.setup(request)
+    view.object_list = view.get_queryset()
+    return view.get_context_data()
+
+
+def _week_html(pk):
+    """ The cached week of the schedule page, which needs the primary key of the schedule only """
+    return get_or_compute(
+        'schedule', pk, get_version('schedule', pk), 'week-html',
+        lambda: render_to_string('schedules/schedule_week.html', {'object': Schedule(pk=pk), 'week': load_week(pk)})
+    )
+
+
+async def schedule_list(request):
+    # the page of schedules comes rendered or cached from the same thread hop which loads the user
+    context = await database_sync_to_async(_list_context)(request)
+    if context is None:
+        return redirect_to_login(request.get_full_path())
+    return render(request, 'schedules/schedule_list.html', context)
+
+
+def _load_schedule_and_week(request, pk):
+    """ The schedule and its week, which is loaded for the author of the schedule only """
+    schedule = _load_schedule(request, pk)
+    if schedule is None or schedule.author_id != request.user.pk:
+        return schedule, None
+    return schedule, _week_html(pk)
+
+
+async def schedule_detail(request, pk):
+    # the week of a cached page takes no query, so it shares the thread hop of the ownership check
+    schedule, week_html = await database_sync_to_async(_load_schedule_and_week)(request, pk)
+    if not request.user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    _check_owner(schedule, request.user)
+    return render(request, 'schedules/schedule_detail.html', {
+        'object': schedule, 'schedule': schedule, 'week_html': week_html
+    })
+
+
+def serialize_week(schedule, summaries, entries):
+    """ The schedule with the statistics and the entries of each day of the week, Monday first """
+    days = [
+        {
+            'day': day, 'label': str(label), 'entry_count': 0, 'busy_minutes': 0, 'first_start': None,
+            'last_end': None, 'entries': []
+        }
+        for day, label in ScheduleEntry.DayInWeek.choices
+    ]
+    for summary in summaries:
+        days[summary.day].update(
+            entry_count=summary.entry_count,
+            busy_minutes=summary.busy_seconds // 60,
+            first_start=summary.first_start and summary.first_start.isoformat(),
+            last_end=summary.last_end and summary.last_end.isoformat()
+        )
+    for entry in entries:
+        days[entry.day]['entries'].append(serialize_entry(entry, ENTRY_FIELDS))
+    return {'id': schedule.pk, 'name': schedule.name, 'days': days}
+
+
+async def schedule_week_api(request, pk):
+    """
+    JSON week of a schedule with an ETag of its cache version where the cache is shared, see cache.versions_shared().
+
+    The user, the schedule and its version take one thread hop and the conditional check comes next, so a revalidated
+    week loads nothing more. The summaries and the entries are loaded at once otherwise.
+    """
+    schedule, version = await database_sync_to_async(_load_schedule_and_version)(request, pk)
+    if not request.user.is_authenticated:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    try:
+        _check_owner(schedule, request.user)
+    except Http404:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    except PermissionDenied:
+        return JsonResponse({'detail': 'You do not have permission to perform this action.'}, status=403)
+
+    etag = f'"week-{pk}-{version}"' if versions_shared() else None
+    response = get_conditional_response(request, etag=etag) if etag else None
+    if response is None:
+        summaries, entries = await asyncio.gather(
+            database_sync_to_async(list)(ScheduleDaySummary.objects.filter(schedule_id=pk)),
+            database_sync_to_async(list)(ScheduleEntry.objects.filter(schedule_id=pk).only('day', *ENTRY_FIELDS))
+        )
+        response = JsonResponse(serialize_week(schedule, summaries, entries))
+    if etag:
+        response['ETag'] = etag
+    return response
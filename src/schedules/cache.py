@@ -0,0 +1,141 @@
+"""
+Read-through cache for rendered schedule pages and other data derived from schedules.
+
+Cached values are keyed by a version counter which is bumped whenever the underlying rows change (see signals.py),
+so stale values are never read and simply expire. Versions start from the current time in milliseconds, which keeps
+them unique even when a counter gets evicted from the cache and has to be started again.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import get_language
+
+_MISSING = object()
+
+
+class CacheStats:
+    """
+    Hit and miss counters of the schedules cache within this process.
+
+    The counters of the current thread are kept apart as well, so a request can tell its own lookups from the ones of
+    concurrent requests.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        hits, misses = self.thread_counts()
+        self._local.counts = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def thread_counts(self):
+        """ Hits and misses recorded by the current thread """
+        return getattr(self._local, 'counts', (0, 0))
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+
+stats = CacheStats()
+
+
+def get_cache():
+    return caches[getattr(settings, 'SCHEDULES_CACHE_ALIAS', 'default')]
+
+
+def versions_shared():
+    """ Whether every server process sees the same versions, which ETags derived from them rely on """
+    return getattr(settings, 'SCHEDULES_CACHE_SHARED', False)
+
+
+def _version_key(namespace, pk):
+    return f'schedules:{namespace}-version:{pk}'
+
+
+def get_version(namespace, pk):
+    cache = get_cache()
+    key = _version_key(namespace, pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(namespace, pk):
+    cache = get_cache()
+    key = _version_key(namespace, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+
+
+def get_versions(namespace, pks):
+    """ Batched get_version() returning a dict which maps the primary keys to their versions """
+    keys = {pk: _version_key(namespace, pk) for pk in pks}
+    cached = get_cache().get_many(keys.values())
+    return {pk: cached[key] if key in cached else get_version(namespace, pk) for pk, key in keys.items()}
+
+
+def _value_key(namespace, pk, version, name):
+    return f'schedules:{namespace}:{pk}:{version}:{name}:{get_language()}'
+
+
+def get_or_compute(namespace, pk, version, name, compute):
+    """ Returns the cached value for the given version or stores whatever compute() returns """
+    if not getattr(settings, 'SCHEDULES_CACHE_ENABLED', True):
+        return compute()
+
+    cache = get_cache()
+    key = _value_key(namespace, pk, version, name)
+    value = cache.get(key, _MISSING)
+    stats.record(hit=value is not _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, getattr(settings, 'SCHEDULES_CACHE_TIMEOUT', 24 * 60 * 60))
+    return value
+
+
+def get_many_or_compute(namespace, versions, name, compute):
+    """
+    Batched get_or_compute() for many objects of a namespace.
+
+    versions maps the primary keys of the objects to their versions. compute() is called once with the list of
+    primary keys missing from the cache and returns a dict mapping them to their values.
+    """
+    if not getattr(settings, 'SCHEDULES_CACHE_ENABLED', True):
+        return compute(list(versions))
+
+    cache = get_cache()
+    keys = {pk: _value_key(namespace, pk, version, name) for pk, version in versions.items()}
+    cached = cache.get_many(keys.values())
+    values = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    missing = [pk for pk in keys if pk not in values]
+    for _ in values:
+        stats.record(hit=True)
+    for _ in missing:
+        stats.record(hit=False)
+    if missing:
+        computed = compute(missing)
+        cache.set_many(
+            {keys[pk]: value for pk, value in computed.items()},
+            getattr(settings, 'SCHEDULES_CACHE_TIMEOUT', 24 * 60 * 60)
+        )
+        values.update(computed)
+    return values
@@ -0,0 +1,123 @@
+import csv
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from schedules.models import ScheduleEntry
+
+EXPORT_CHUNK_SIZE = 2000
+STREAM_BUFFER_SIZE = 64 * 1024
+
+EXPORTED_VALUES = ('pk', 'schedule__name', 'title', 'description', 'day', 'start_time', 'end_time')
+ICAL_WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+
+class _Echo:
+    """ File-like object handing back whatever csv.writer writes into it """
+
+    @staticmethod
+    def write(value):
+        return value
+
+
+def export_rows(entries):
+    """ Streams the exported values of the entries from the database without caching the queryset """
+    return (
+        entries.order_by('schedule_id', 'day', 'start_time', 'pk')
+        .values_list(*EXPORTED_VALUES)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def _buffered(lines):
+    """ Joins small lines into bigger chunks, so the server does not flush every line separately """
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    day_labels = dict(ScheduleEntry.DayInWeek.choices)
+
+    def lines():
+        yield writer.writerow(('schedule', 'title', 'description', 'day', 'start_time', 'end_time'))
+        for _, schedule_name, title, description, day, start_time, end_time in rows:
+            yield writer.writerow((
+                schedule_name, title, description, day_labels[day], start_time.isoformat(), end_time.isoformat()
+            ))
+
+    return _buffered(lines())
+
+
+def _escape_ical_text(value):
+    return (
+        value.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold_ical_line(line):
+    """ Splits content lines longer than 75 octets as required by RFC 5545 """
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # never cut a multi-byte character in half
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def iter_ical(rows, calendar_name):
+    """
+    Renders the entries as weekly recurring events.
+
+    Entries have no date, so every event starts in the current week and repeats every week on its day.
+    """
+    today = timezone.localdate()
+    monday = today - timedelta(days=today.weekday())
+    stamp = timezone.now().strftime('%Y%m%dT%H%M%SZ')
+
+    def lines():
+        yield from (_fold_ical_line(line) for line in (
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'PRODID:-//MakeMyDay//Schedules//EN',
+            'CALSCALE:GREGORIAN',
+            f'X-WR-CALNAME:{_escape_ical_text(calendar_name)}',
+        ))
+        for pk, schedule_name, title, description, day, start_time, end_time in rows:
+            date = monday + timedelta(days=day)
+            event = [
+                'BEGIN:VEVENT',
+                f'UID:scheduleentry-{pk}@make-my-day',
+                f'DTSTAMP:{stamp}',
+                f"DTSTART:{datetime.combine(date, start_time).strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND:{datetime.combine(date, end_time).strftime('%Y%m%dT%H%M%S')}",
+                f'RRULE:FREQ=WEEKLY;BYDAY={ICAL_WEEKDAYS[day]}',
+                f'SUMMARY:{_escape_ical_text(title)}',
+                f'CATEGORIES:{_escape_ical_text(schedule_name)}',
+            ]
+            if description:
+                event.append(f'DESCRIPTION:{_escape_ical_text(description)}')
+            event.append('END:VEVENT')
+            yield ''.join(_fold_ical_line(line) for line in event)
+        yield 'END:VCALENDAR\r\n'
+
+    return _buffered(lines())
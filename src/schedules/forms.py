@@ -0,0 +1,154 @@
+from contextlib import nullcontext
+
+from django import forms
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext_lazy as _
+
+from schedules.imports import read_rows
+from schedules.models import OVERLAP_MESSAGE, Schedule, ScheduleEntry
+
+MAX_IMPORTED_ROWS = 5000
+
+
+class ScheduleEntryImportForm(forms.Form):
+    file = forms.FileField(help_text=_(
+        'A CSV file with a header row or a JSON list of objects. '
+        'Both use the title, description, day, start_time and end_time fields.'
+    ))
+
+    def clean_file(self):
+        rows = read_rows(self.cleaned_data['file'])
+        if len(rows) > MAX_IMPORTED_ROWS:
+            raise ValidationError(
+                _('A single import can contain up to %(limit)s entries.'),
+                params={'limit': MAX_IMPORTED_ROWS}
+            )
+        return rows
+
+
+class ScheduleDuplicateForm(forms.Form):
+    name = forms.CharField(max_length=Schedule._meta.get_field('name').max_length)
+
+
+class CopyDayForm(forms.Form):
+    source_day = forms.TypedChoiceField(choices=ScheduleEntry.DayInWeek.choices, coerce=int)
+    target_days = forms.TypedMultipleChoiceField(
+        choices=ScheduleEntry.DayInWeek.choices,
+        coerce=int,
+        widget=forms.CheckboxSelectMultiple
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('source_day') in cleaned_data.get('target_days', ()):
+            self.add_error('target_days', _('A day cannot be copied onto itself.'))
+        return cleaned_data
+
+
+class ScheduleSelectionForm(forms.Form):
+    """ Picks some of the schedules of the user """
+    schedules = forms.ModelMultipleChoiceField(queryset=Schedule.objects.none(), widget=forms.CheckboxSelectMultiple)
+
+    def __init__(self, *args, user, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['schedules'].queryset = Schedule.objects.filter(author=user).order_by('name', 'pk')
+
+
+class FreeTimeForm(ScheduleSelectionForm):
+    first_day = forms.TypedChoiceField(
+        choices=ScheduleEntry.DayInWeek.choices,
+        coerce=int,
+        initial=ScheduleEntry.DayInWeek.MONDAY
+    )
+    last_day = forms.TypedChoiceField(
+        choices=ScheduleEntry.DayInWeek.choices,
+        coerce=int,
+        initial=ScheduleEntry.DayInWeek.SUNDAY
+    )
+    min_duration = forms.IntegerField(min_value=0, max_value=24 * 60, initial=30, label=_('Minimum duration (minutes)'))
+    participants = forms.CharField(
+        required=False,
+        help_text=_('Usernames of other people sharing their free time, separated by commas, who have to be free as well.')
+    )
+
+    def clean_participants(self):
+        # Free time shared with one other person gives away when they are busy, so only people who opted in take
+        # part. The others are reported like unknown users, so that the form does not tell them apart either.
+        usernames = {username.strip() for username in self.cleaned_data['participants'].split(',') if username.strip()}
+        participants = list(get_user_model().objects.filter(username__in=usernames, shares_free_time=True))
+        unknown = usernames - {participant.username for participant in participants}
+        if unknown:
+            raise ValidationError(
+                _('Unknown users or users not sharing their free time: %(usernames)s.'),
+                params={'usernames': ', '.join(sorted(unknown))}
+            )
+        return participants
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('first_day', 0) > cleaned_data.get('last_day', 6):
+            self.add_error('last_day', _('The last day cannot come before the first one.'))
+        return cleaned_data
+
+
+class ScheduleForm(forms.ModelForm):
+    class Meta:
+        model = Schedule
+        fields = ('name', )
+
+
+class ScheduleEntryForm(forms.ModelForm):
+    class Meta:
+        model = ScheduleEntry
+        fields = ('title', 'description', 'day', 'start_time', 'end_time')
+
+
+def partial_model_form(form_class, instance, data):
+    """
+    A form_class form of the instance changing the fields given in data, the others keep their current values.
+
+    All fields stay in the form, as the validation of the model may report errors of any of them.
+    """
+    current = {field: getattr(instance, field) for field in form_class.Meta.fields}
+    given = data.dict() if hasattr(data, 'dict') else data
+    return form_class({**current, **given}, instance=instance)
+
+
+def save_model_form(form, partial=False):
+    """
+    Saves a valid model form and returns the saved object.
+
+    A partial save writes the changed fields only, and nothing at all when none of them changed. Where the database
+    rather than clean() rejects overlapping entries, an overlap is added to the errors of the form and None is
+    returned instead.
+    """
+    def save():
+        if not partial:
+            return form.save()
+        instance = form.save(commit=False)
+        if form.changed_data:
+            instance.save(update_fields=form.changed_data)
+        return instance
+
+    if not ScheduleEntry.overlaps_rejected_by_database():
+        return save()
+    try:
+        with transaction.atomic():
+            return save()
+    except IntegrityError as error:
+        if not ScheduleEntry.is_overlap_error(error):
+            raise
+        form.add_error('start_time', OVERLAP_MESSAGE)
+        return None
+
+
+def entry_transaction():
+    """
+    Transaction for validating and saving entries, so that no other write gets between the collision check of
+    clean() and the save. Needless where the database rejects overlaps by itself.
+    """
+    if ScheduleEntry.overlaps_rejected_by_database():
+        return nullcontext()
+    return transaction.atomic()
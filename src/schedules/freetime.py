@@ -0,0 +1,98 @@
+"""
+Free time: the gaps between the entries of one or many schedules.
+
+The busy time of a schedule is loaded in a single query ordered by day and start time, merged per day in one linear
+sweep and cached until the schedule changes. A search combines the busy time of the selected schedules and emits its
+complement. Free time shared by several people is the complement of all their busy time taken together, so it needs
+no separate intersection step.
+"""
+from collections import namedtuple
+from datetime import time, timedelta
+from itertools import chain, groupby
+
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from schedules.cache import get_many_or_compute, get_versions
+from schedules.intervals import merge_intervals
+from schedules.models import Schedule, ScheduleEntry
+
+SECONDS_PER_DAY = 24 * 60 * 60
+DAYS_IN_WEEK = 7
+
+# end_time is None for a slot lasting until midnight, which a time cannot represent
+FreeSlot = namedtuple('FreeSlot', ['day', 'start_time', 'end_time'])
+
+
+def _seconds(value):
+    """ Seconds since midnight of a HH:MM:SS[.ffffff] string, parsed by hand as parse_time() is slow in bulk """
+    return int(value[:2]) * 3600 + int(value[3:5]) * 60 + int(value[6:8])
+
+
+def _time(seconds):
+    if seconds >= SECONDS_PER_DAY:
+        return None
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def load_busy_time(schedule_ids):
+    """
+    Busy time of the given schedules in a single ordered query.
+
+    Returns a dict mapping the schedule ids to seven lists, Monday first, of disjoint (start, end) intervals in
+    seconds since midnight.
+    """
+    rows = ScheduleEntry.objects.filter(schedule_id__in=schedule_ids).order_by(
+        'schedule_id', 'day', 'start_time'
+    ).values_list(
+        'schedule_id',
+        'day',
+        # text is parsed much faster than times converted by the database backend
+        Cast('start_time', output_field=CharField()),
+        Cast('end_time', output_field=CharField())
+    )
+    busy_time = {schedule_id: [[] for _ in range(DAYS_IN_WEEK)] for schedule_id in schedule_ids}
+    for (schedule_id, day), intervals in groupby(rows, key=lambda row: row[:2]):
+        busy_time[schedule_id][day] = merge_intervals(
+            (_seconds(start_time), _seconds(end_time)) for _schedule_id, _day, start_time, end_time in intervals
+        )
+    return busy_time
+
+
+def get_busy_time(schedule_ids):
+    """ Cached load_busy_time() """
+    return get_many_or_compute('schedule', get_versions('schedule', schedule_ids), 'busy-time', load_busy_time)
+
+
+def free_slots(busy, days, min_duration=timedelta(0)):
+    """
+    Complements the busy time of each of the given days.
+
+    busy maps the days to lists of (start, end) intervals in seconds since midnight sorted by start.
+    Returns the FreeSlots lasting at least min_duration ordered by day and start time.
+    """
+    min_seconds = max(min_duration.total_seconds(), 1)
+    slots = []
+    for day in sorted(days):
+        free_from = 0
+        for start, end in chain(merge_intervals(busy[day]), [(SECONDS_PER_DAY, SECONDS_PER_DAY)]):
+            if start - free_from >= min_seconds:
+                slots.append(FreeSlot(day, _time(free_from), _time(start)))
+            free_from = end
+    return slots
+
+
+def find_free_time(schedules, days, min_duration=timedelta(0), participants=()):
+    """
+    Free time within the given days which lasts at least min_duration.
+
+    schedules is a queryset or a list of schedules. All schedules of the participants are taken into account as
+    well, which leaves only the time everybody has free.
+    """
+    schedule_ids = {schedule.pk for schedule in schedules}
+    if participants:
+        schedule_ids.update(Schedule.objects.filter(author__in=participants).values_list('pk', flat=True))
+    busy_time = get_busy_time(sorted(schedule_ids)).values()
+    # the busy time of every schedule is sorted already, so sorting the combined lists merely merges their runs
+    busy = {day: sorted(chain.from_iterable(intervals[day] for intervals in busy_time)) for day in days}
+    return free_slots(busy, days, min_duration)
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.translation import gettext as _
+
+from schedules.intervals import find_collisions
+from schedules.models import OVERLAP_MESSAGE, ScheduleDaySummary, ScheduleEntry
+from schedules.occupancy import get_occupancy, is_enabled as occupancy_index_enabled
+
+IMPORT_FIELDS = ('title', 'description', 'day', 'start_time', 'end_time')
+
+ImportResult = namedtuple('ImportResult', ['created', 'errors'])
+RowError = namedtuple('RowError', ['row', 'messages'])
+
+
+def read_rows(uploaded_file):
+    """ Reads a CSV file with a header row or a JSON list of objects into a list of dicts """
+    is_json = uploaded_file.name.lower().endswith('.json') or uploaded_file.content_type == 'application/json'
+    try:
+        content = uploaded_file.read().decode('utf-8-sig')
+        if is_json:
+            rows = json.loads(content)
+        else:
+            rows = list(csv.DictReader(io.StringIO(content, newline='')))
+    except (UnicodeDecodeError, ValueError, csv.Error) as error:
+        raise ValidationError(_('The file could not be read: %(error)s'), params={'error': error}) from error
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValidationError(_('The file has to contain a list of entries.'))
+    return rows
+
+
+def _day_numbers():
+    numbers = {str(value): value for value in ScheduleEntry.DayInWeek.values}
+    numbers.update({str(label).lower(): value for value, label in ScheduleEntry.DayInWeek.choices})
+    return numbers
+
+
+def _build_entry(schedule, row, day_numbers):
+    # JSON rows may hold numbers, lists or objects, which the fields would fail on instead of rejecting
+    values = {field: '' if row.get(field) is None else str(row[field]) for field in IMPORT_FIELDS}
+    values['day'] = day_numbers.get(values['day'].strip().lower(), values['day'])
+    entry = ScheduleEntry(schedule=schedule, **values)
+    # the schedule is known to exist, validating it would cost a query per row
+    entry.clean_fields(exclude=['schedule'])
+    entry.validate_interval()
+    return entry
+
+
+def import_entries(schedule, rows):
+    """
+    Validates a batch of rows against the schedule and against each other and stores the valid ones.
+
+    Collisions are detected in memory, so the whole import costs one read of the existing entries and one
+    bulk insert regardless of the number of rows. With the occupancy index the read is skipped when no row touches
+    a taken minute. An import colliding with entries saved in the meantime raises a ValidationError.
+    """
+    day_numbers = _day_numbers()
+    entries = {}
+    errors = {}
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            entries[row_number] = _build_entry(schedule, row, day_numbers)
+        except ValidationError as error:
+            errors[row_number] = [f'{field}: {message}' for field, messages in error.message_dict.items()
+                                  for message in messages]
+
+    try:
+        with transaction.atomic():
+            existing = ScheduleEntry.objects.filter(schedule=schedule).values_list('day', 'start_time', 'end_time')
+            if occupancy_index_enabled() and not any(get_occupancy(schedule.pk, existing).may_overlap_many(
+                    [(entry.day, entry.start_time, entry.end_time) for entry in entries.values()])):
+                # no row touches a taken minute, so the rows can only collide with each other
+                existing = []
+            collisions = find_collisions(
+                existing,
+                ((row_number, entry.day, entry.start_time, entry.end_time) for row_number, entry in entries.items())
+            )
+            for row_number, other_row_number in collisions.items():
+                if other_row_number is None:
+                    message = _('You already have an entry in this time frame!!')
+                else:
+                    message = _('Collides with row %(row)s.') % {'row': other_row_number}
+                errors[row_number] = [message]
+                del entries[row_number]
+
+            ScheduleEntry.objects.bulk_create(entries.values())
+            # bulk_create() does not send post_save signals
+            ScheduleDaySummary.objects.apply_changes(
+                schedule.pk, added=((entry.day, entry.start_time, entry.end_time) for entry in entries.values())
+            )
+            schedule.invalidate_cache()
+    except IntegrityError as error:
+        # an entry saved since the existing ones were read collides with a row, where the database rejects overlaps
+        if not ScheduleEntry.is_overlap_error(error):
+            raise
+        raise ValidationError(OVERLAP_MESSAGE) from error
+
+    return ImportResult(
+        created=len(entries),
+        errors=[RowError(row_number, errors[row_number]) for row_number in sorted(errors)]
+    )
@@ -0,0 +1,48 @@
+from bisect import bisect_right
+from collections import defaultdict
+
+
+def merge_intervals(intervals):
+    """ Merges (start, end) pairs sorted by start into a list of disjoint intervals """
+    merged = []
+    for start, end in intervals:
+        if merged and start < merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def find_collisions(existing, candidates):
+    """
+    Sort-and-sweep overlap check of a batch of intervals.
+
+    existing is an iterable of (day, start, end) tuples that are already stored, candidates an iterable of
+    (key, day, start, end) tuples about to be added. A candidate collides when it overlaps an existing interval or
+    a candidate accepted before it in (day, start) order. Returns a dict mapping the key of every colliding
+    candidate to the key of the candidate it collides with, or to None when it collides with an existing interval.
+    """
+    existing_by_day = defaultdict(list)
+    for day, start, end in existing:
+        existing_by_day[day].append((start, end))
+    for day, intervals in existing_by_day.items():
+        existing_by_day[day] = merge_intervals(sorted(intervals))
+    existing_ends = {day: [end for _, end in intervals] for day, intervals in existing_by_day.items()}
+
+    collisions = {}
+    last_accepted = {}
+    for key, day, start, end in sorted(candidates, key=lambda candidate: candidate[1:]):
+        intervals = existing_by_day.get(day, [])
+        index = bisect_right(existing_ends.get(day, []), start)
+        if index < len(intervals) and intervals[index][0] < end:
+            collisions[key] = None
+            continue
+
+        previous = last_accepted.get(day)
+        if previous is not None and start < previous[2]:
+            collisions[key] = previous[0]
+            continue
+
+        last_accepted[day] = (key, start, end)
+    return collisions
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from schedules.models import Schedule, ScheduleDaySummary
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the day summaries of schedules from their entries, e.g. after entries were changed in bulk.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('schedule_ids', nargs='*', type=int, help='schedules to rebuild, all of them by default')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000, help='schedules rebuilt per query and transaction'
+        )
+
+    def handle(self, *args, **options):
+        schedules = Schedule.objects.order_by('pk')
+        if options['schedule_ids']:
+            schedules = schedules.filter(pk__in=options['schedule_ids'])
+        schedule_ids = list(schedules.values_list('pk', flat=True))
+
+        batch_size = options['batch_size']
+        summaries = 0
+        for first in range(0, len(schedule_ids), batch_size):
+            batch = schedule_ids[first:first + batch_size]
+            summaries += len(ScheduleDaySummary.objects.rebuild(batch))
+            for schedule in Schedule.objects.filter(pk__in=batch).only('author'):
+                schedule.invalidate_cache()
+        self.stdout.write(f'Rebuilt {summaries} day summaries of {len(schedule_ids)} schedules.')
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0004_auto_20210328_1057'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduleentry',
+            index=models.Index(fields=['schedule', 'day', 'start_time', 'end_time'], name='scheduleentry_interval_idx'),
+        ),
+    ]
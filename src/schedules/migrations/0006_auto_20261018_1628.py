@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0005_auto_20261018_1602'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['author', 'name'], name='schedule_author_name_idx'),
+        ),
+    ]
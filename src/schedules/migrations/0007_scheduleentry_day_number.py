@@ -0,0 +1,28 @@
+# Generated by Django 3.1.7 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0006_auto_20261018_1628'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='scheduleentry',
+            name='scheduleentry_interval_idx',
+        ),
+        # nullable, so that the column can be added back when migrating backwards
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='day',
+            field=models.CharField(choices=[('0', 'Monday'), ('1', 'Tuesday'), ('2', 'Wednesday'), ('3', 'Thursday'), ('4', 'Friday'), ('5', 'Saturday'), ('6', 'Sunday')], max_length=3, null=True),
+        ),
+        migrations.AddField(
+            model_name='scheduleentry',
+            name='day_number',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+    ]
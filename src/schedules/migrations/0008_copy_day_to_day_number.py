@@ -0,0 +1,36 @@
+from django.db import migrations, models, transaction
+from django.db.models.functions import Cast
+
+BATCH_SIZE = 10000
+
+
+def _copy_in_batches(apps, schema_editor, target, value):
+    """ Fills the target field of ScheduleEntry one primary key range per transaction, to keep locks short """
+    entries = apps.get_model('schedules', 'ScheduleEntry').objects.using(schema_editor.connection.alias)
+    bounds = entries.aggregate(first=models.Min('pk'), last=models.Max('pk'))
+    if bounds['first'] is None:
+        return
+    for start in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            entries.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(**{target: value})
+
+
+def copy_day_to_day_number(apps, schema_editor):
+    _copy_in_batches(apps, schema_editor, 'day_number', Cast('day', models.PositiveSmallIntegerField()))
+
+
+def copy_day_number_to_day(apps, schema_editor):
+    _copy_in_batches(apps, schema_editor, 'day', Cast('day_number', models.CharField(max_length=3)))
+
+
+class Migration(migrations.Migration):
+    # every batch commits on its own
+    atomic = False
+
+    dependencies = [
+        ('schedules', '0007_scheduleentry_day_number'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_day_to_day_number, copy_day_number_to_day),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.1.7 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0008_copy_day_to_day_number'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='scheduleentry',
+            name='day',
+        ),
+        migrations.RenameField(
+            model_name='scheduleentry',
+            old_name='day_number',
+            new_name='day',
+        ),
+        migrations.AlterField(
+            model_name='scheduleentry',
+            name='day',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')]),
+        ),
+        migrations.AddIndex(
+            model_name='scheduleentry',
+            index=models.Index(fields=['schedule', 'day', 'start_time', 'end_time'], name='scheduleentry_interval_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# Times are anchored to an arbitrary date, as PostgreSQL has no range type of times
+ADD_CONSTRAINT = """
+    ALTER TABLE schedules_scheduleentry ADD CONSTRAINT scheduleentry_no_overlap EXCLUDE USING gist (
+        schedule_id WITH =,
+        day WITH =,
+        tsrange(DATE '2000-01-01' + start_time, DATE '2000-01-01' + end_time, '[)') WITH &&
+    )
+"""
+DROP_CONSTRAINT = 'ALTER TABLE schedules_scheduleentry DROP CONSTRAINT scheduleentry_no_overlap'
+FIND_OVERLAPS = """
+    SELECT entry.schedule_id, entry.day, entry.id, other.id
+    FROM schedules_scheduleentry AS entry
+    JOIN schedules_scheduleentry AS other ON other.schedule_id = entry.schedule_id AND other.day = entry.day
+        AND other.id > entry.id AND other.start_time < entry.end_time AND entry.start_time < other.end_time
+    ORDER BY entry.schedule_id, entry.day, entry.id, other.id
+    LIMIT %s
+"""
+REPORTED_OVERLAPS = 20
+
+
+def find_overlaps(connection):
+    """ The first REPORTED_OVERLAPS pairs of overlapping entries written before the constraint kept them out """
+    with connection.cursor() as cursor:
+        cursor.execute(FIND_OVERLAPS, [REPORTED_OVERLAPS])
+        return cursor.fetchall()
+
+
+def add_constraint(apps, schema_editor):  # pylint: disable=unused-argument
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    overlaps = find_overlaps(schema_editor.connection)
+    if overlaps:
+        # the constraint would fail on the first of them with a message naming neither
+        raise RuntimeError(
+            'Overlapping schedule entries have to be moved or deleted before the constraint can be added:\n'
+            + '\n'.join(
+                f'schedule {schedule_id}, day {day}: entries {first_id} and {second_id}'
+                for schedule_id, day, first_id, second_id in overlaps
+            )
+        )
+    # the = operator of plain columns in a GiST index comes from btree_gist
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.execute(ADD_CONSTRAINT)
+
+
+def drop_constraint(apps, schema_editor):  # pylint: disable=unused-argument
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_CONSTRAINT)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0009_scheduleentry_day_integer'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_constraint, drop_constraint),
+    ]
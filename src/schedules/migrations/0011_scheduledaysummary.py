@@ -0,0 +1,61 @@
+# Generated by Django 3.1.7 on 2026-10-18 15:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 10000
+
+
+def summarize_entries(apps, schema_editor):
+    """ Builds the summaries of all days of the existing schedules, the same way rebuild() does """
+    alias = schema_editor.connection.alias
+    summary_model = apps.get_model('schedules', 'ScheduleDaySummary')
+    summaries = {
+        (schedule_id, day): summary_model(schedule_id=schedule_id, day=day)
+        for schedule_id in apps.get_model('schedules', 'Schedule').objects.using(alias).values_list('pk', flat=True)
+        for day in range(7)
+    }
+    rows = apps.get_model('schedules', 'ScheduleEntry').objects.using(alias).order_by().values(
+        'schedule_id', 'day'
+    ).annotate(
+        entry_count=models.Count('pk'),
+        busy_time=models.Sum(models.ExpressionWrapper(
+            models.F('end_time') - models.F('start_time'), output_field=models.DurationField()
+        )),
+        first_start=models.Min('start_time'),
+        last_end=models.Max('end_time')
+    )
+    for row in rows:
+        summary = summaries[row['schedule_id'], row['day']]
+        summary.entry_count = row['entry_count']
+        summary.busy_seconds = int(row['busy_time'].total_seconds())
+        summary.first_start = row['first_start']
+        summary.last_end = row['last_end']
+    summary_model.objects.using(alias).bulk_create(summaries.values(), batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0010_scheduleentry_no_overlap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleDaySummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('entry_count', models.PositiveIntegerField(default=0)),
+                ('busy_seconds', models.PositiveIntegerField(default=0)),
+                ('first_start', models.TimeField(null=True)),
+                ('last_end', models.TimeField(null=True)),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='day_summaries', to='schedules.schedule')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledaysummary',
+            constraint=models.UniqueConstraint(fields=('schedule', 'day'), name='scheduledaysummary_unique_day'),
+        ),
+        migrations.RunPython(summarize_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('schedules', '0011_scheduledaysummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scheduleentry',
+            index=models.Index(fields=['day', 'start_time', 'id'], name='scheduleentry_day_start_idx'),
+        ),
+    ]
@@ -1,23 +1,134 @@
+from collections import defaultdict
+from datetime import time
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models import Case, Count, DurationField, ExpressionWrapper, F, Max, Min, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
 from django.utils.translation import gettext_lazy as _
 
+from schedules.cache import bump_version
+from schedules.intervals import find_collisions
+from schedules.occupancy import get_occupancy, is_enabled as occupancy_index_enabled
+
+COPIED_ENTRY_FIELDS = ('title', 'description', 'day', 'start_time', 'end_time')
+INTERVAL_FIELDS = ('day', 'start_time', 'end_time')
+SUMMARY_FIELDS = ('entry_count', 'busy_seconds', 'first_start', 'last_end')
+
+# created on PostgreSQL by migration 0010
+OVERLAP_CONSTRAINT = 'scheduleentry_no_overlap'
+OVERLAP_MESSAGE = _('You already have an entry in this time frame!!')
+
 
 class Schedule(models.Model):
+    class Meta:
+        indexes = [
+            models.Index(fields=['author', 'name'], name='schedule_author_name_idx'),
+        ]
+
     name = models.CharField(max_length=100)
     author = models.ForeignKey(get_user_model(), on_delete=models.CASCADE)
 
     def __str__(self):
         return str(self.name)
 
+    def invalidate_cache(self):
+        """ Bulk writes of entries send no signals, so they have to drop the cached pages themselves """
+        bump_version('schedule', self.pk)
+        bump_version('schedule-list', self.author_id)
+
+    def duplicate(self, name):
+        """
+        Copies the schedule together with all of its entries in a constant number of queries.
+
+        Raises a ValidationError when the database rejects the copied entries as overlapping.
+        """
+        try:
+            with transaction.atomic():
+                copy = Schedule.objects.create(name=name, author_id=self.author_id)
+                ScheduleEntry.objects.bulk_create(
+                    ScheduleEntry(schedule=copy, **dict(zip(COPIED_ENTRY_FIELDS, row)))
+                    for row in self.scheduleentry_set.values_list(*COPIED_ENTRY_FIELDS)
+                )
+                # the copy has the very same entries, so it gets the same summaries as well
+                source = self.day_summaries.filter(day=OuterRef('day'))
+                copy.day_summaries.update(**{field: Subquery(source.values(field)[:1]) for field in SUMMARY_FIELDS})
+        except IntegrityError as error:
+            # the entries of the schedule cannot collide with each other, unless the database says so
+            if not ScheduleEntry.is_overlap_error(error):
+                raise
+            raise ValidationError(OVERLAP_MESSAGE) from error
+        copy.invalidate_cache()
+        return copy
+
+    def copy_day(self, source_day, target_days):
+        """
+        Copies the entries of source_day to every one of target_days and returns the number of created entries.
+
+        Nothing is copied when any of the copies would collide with an entry already planned for its day, a
+        ValidationError tells the days instead. Where the database rejects the copies, it only tells that they collide.
+        """
+        target_days = [day for day in target_days if day != source_day]
+        try:
+            with transaction.atomic():
+                entries = self.scheduleentry_set.all()
+                source = list(entries.filter(day=source_day).values_list('title', 'description', 'start_time', 'end_time'))
+                collisions = find_collisions(
+                    entries.filter(day__in=target_days).values_list('day', 'start_time', 'end_time'),
+                    (
+                        (day, day, start_time, end_time)
+                        for day in target_days for _title, _description, start_time, end_time in source
+                    )
+                )
+                if collisions:
+                    labels = dict(ScheduleEntry.DayInWeek.choices)
+                    raise ValidationError(
+                        _('The copied entries collide with entries on %(days)s.'),
+                        params={'days': ', '.join(str(labels[day]) for day in sorted(collisions))}
+                    )
+
+                copies = ScheduleEntry.objects.bulk_create(
+                    ScheduleEntry(
+                        schedule=self, title=title, description=description, day=day, start_time=start_time,
+                        end_time=end_time
+                    )
+                    for day in target_days for title, description, start_time, end_time in source
+                )
+                ScheduleDaySummary.objects.apply_changes(self.pk, added=(
+                    (day, start_time, end_time)
+                    for day in target_days for _title, _description, start_time, end_time in source
+                ))
+        except IntegrityError as error:
+            # an entry saved since the target days were read collides with a copy, where the database rejects overlaps
+            if not ScheduleEntry.is_overlap_error(error):
+                raise
+            raise ValidationError(_('The copied entries collide with entries saved in the meantime.')) from error
+        self.invalidate_cache()
+        return len(copies)
+
+
+class ScheduleEntryQuerySet(models.QuerySet):
+    def overlapping(self, schedule_id, day, start_time, end_time):
+        """ Entries of the given schedule and day sharing any part of the [start_time, end_time) interval """
+        return self.filter(
+            schedule_id=schedule_id,
+            day=day,
+            start_time__lt=end_time,
+            end_time__gt=start_time
+        )
+
 
 class ScheduleEntry(models.Model):
     class Meta:
         verbose_name_plural = "Schedule entries"
         ordering = ["day", "start_time"]
+        indexes = [
+            models.Index(fields=['schedule', 'day', 'start_time', 'end_time'], name='scheduleentry_interval_idx'),
+            models.Index(fields=['day', 'start_time', 'id'], name='scheduleentry_day_start_idx'),
+        ]
 
-    class DayInWeek(models.TextChoices):
+    class DayInWeek(models.IntegerChoices):
         MONDAY = 0, _('Monday')
         TUESDAY = 1, _('Tuesday')
         WEDNESDAY = 2, _('Wednesday')
@@ -29,32 +140,214 @@ class ScheduleEntry(models.Model):
     schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE)
     title = models.CharField(max_length=50)
     description = models.CharField(max_length=100, blank=True)
-    day = models.CharField(max_length=3, choices=DayInWeek.choices)
+    day = models.PositiveSmallIntegerField(choices=DayInWeek.choices)
     start_time = models.TimeField()
     end_time = models.TimeField()
 
+    objects = ScheduleEntryQuerySet.as_manager()
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if self._state.adding or (update_fields is not None and not set(update_fields).intersection(INTERVAL_FIELDS)):
+            super().save(*args, **kwargs)
+            return
+        if update_fields is not None:
+            # the interval was validated as a whole, none of it may come from another request
+            kwargs['update_fields'] = {*update_fields, *INTERVAL_FIELDS}
+        # the day summaries are changed by the difference to the row replaced, not to the one loaded
+        with transaction.atomic(using=router.db_for_write(ScheduleEntry), savepoint=False):
+            self.refresh_stored_interval()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic(using=router.db_for_write(ScheduleEntry), savepoint=False):
+            self.refresh_stored_interval()
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        entry = super().from_db(db, field_names, values)
+        # the day summaries need to know where a changed entry used to be
+        if not entry.get_deferred_fields().intersection(('schedule_id', 'day', 'start_time', 'end_time')):
+            entry.stored_interval = entry.interval()  # pylint: disable=no-member
+        return entry
+
+    def interval(self):
+        """ The (schedule_id, day, start_time, end_time) of the entry with values converted to their Python types """
+        return (
+            self.schedule_id,
+            *(self._meta.get_field(name).to_python(getattr(self, name)) for name in ('day', 'start_time', 'end_time'))
+        )
+
     def clean(self):
-        colliding = ScheduleEntry.objects.filter(
-            day__exact=self.day,
-            start_time__gte=self.start_time,
-            start_time__lt=self.end_time
+        if not isinstance(self.start_time, time) or not isinstance(self.end_time, time):
+            # missing or malformed values are already reported by clean_fields()
+            return
+
+        self.validate_interval()
+
+        if (self.schedule_id is not None and isinstance(self.day, int) and not self.overlaps_rejected_by_database()
+                and self.interval_changed() and self._collides_with_other_entries()):
+            raise ValidationError({'start_time': OVERLAP_MESSAGE})
+
+    def interval_changed(self):
+        """ Whether the entry is new or moved, an entry keeping its stored interval cannot collide with the others """
+        if self.pk is not None and getattr(self, 'stored_interval', None) == self.interval():
+            # Someone else may have moved the entry since it was loaded, writing the loaded interval back would move
+            # it again. Only the row as it is now tells, which costs a lookup by primary key instead of the check.
+            self.refresh_stored_interval()
+        return getattr(self, 'stored_interval', None) != self.interval()
+
+    def refresh_stored_interval(self):
+        """ Reads the stored interval again, locked until the end of the transaction where the database supports it """
+        self.stored_interval = ScheduleEntry.objects.select_for_update().filter(pk=self.pk).values_list(
+            'schedule_id', *INTERVAL_FIELDS
+        ).first()
+
+    @staticmethod
+    def overlaps_rejected_by_database():
+        """ The exclusion constraint of PostgreSQL rejects overlaps without races, saves fail with an IntegrityError """
+        return connections[router.db_for_write(ScheduleEntry)].vendor == 'postgresql'
+
+    @staticmethod
+    def is_overlap_error(error):
+        """ Tells whether the IntegrityError was caused by the exclusion constraint """
+        return OVERLAP_CONSTRAINT in str(error)
+
+    def validate_interval(self):
+        if self.start_time >= self.end_time:
+            raise ValidationError({'end_time': _('End time must be after start time.')})
+
+    def occupancy(self):
+        """ The occupancy index of the schedule of the entry """
+        intervals = ScheduleEntry.objects.filter(schedule_id=self.schedule_id).order_by().values_list(
+            # text is parsed much faster than times converted by the database backend
+            'day', Cast('start_time', output_field=models.CharField()), Cast('end_time', output_field=models.CharField())
         )
-        self._check_colliding(colliding)
+        return get_occupancy(self.schedule_id, intervals)
+
+    def _collides_with_other_entries(self):
+        if occupancy_index_enabled() and not self.occupancy().may_overlap(self.day, self.start_time, self.end_time):
+            return False
+        colliding = ScheduleEntry.objects.overlapping(self.schedule_id, self.day, self.start_time, self.end_time)
+        if self.pk is not None:
+            colliding = colliding.exclude(pk=self.pk)
+        return colliding.exists()
 
-        colliding = ScheduleEntry.objects.filter(
-            day__exact=self.day,
-            end_time__gt=self.start_time,
-            end_time__lte=self.end_time
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _day_change(schedule_id, day, added, removed):
+    """ Update expressions applying the (start_time, end_time) intervals added to and removed from a day """
+    first_start, last_end = F('first_start'), F('last_end')
+    if added:
+        earliest = Value(min(start_time for start_time, _end_time in added), output_field=models.TimeField())
+        latest = Value(max(end_time for _start_time, end_time in added), output_field=models.TimeField())
+        # MIN() and MAX() of SQLite return NULL when an argument is NULL, as they are for a day without entries
+        first_start = Coalesce(Least(first_start, earliest), earliest)
+        last_end = Coalesce(Greatest(last_end, latest), latest)
+    if removed:
+        # only the removal of the first or the last entry of the day looks its new bounds up in the entries index
+        entries = ScheduleEntry.objects.filter(schedule_id=schedule_id, day=day)
+        first_start = Case(
+            When(first_start__in=[start_time for start_time, _end_time in removed],
+                 then=Subquery(entries.order_by('start_time').values('start_time')[:1])),
+            default=first_start
         )
-        self._check_colliding(colliding)
+        last_end = Case(
+            When(last_end__in=[end_time for _start_time, end_time in removed],
+                 then=Subquery(entries.order_by('-end_time').values('end_time')[:1])),
+            default=last_end
+        )
+    busy_seconds = sum(_seconds(end) - _seconds(start) for start, end in added)
+    busy_seconds -= sum(_seconds(end) - _seconds(start) for start, end in removed)
+    return {
+        'entry_count': F('entry_count') + (len(added) - len(removed)),
+        'busy_seconds': F('busy_seconds') + busy_seconds,
+        'first_start': first_start,
+        'last_end': last_end,
+    }
+
+
+class ScheduleDaySummaryQuerySet(models.QuerySet):
+    def apply_changes(self, schedule_id, added=(), removed=()):
+        """
+        Applies the entries added to and removed from a schedule to its summaries in a single update.
 
-        if self.start_time > self.end_time:
-            raise ValidationError({'end_time': _('End time cannot be before start time.')})
+        added and removed are (day, start_time, end_time) tuples and the entries table has to reflect the change
+        already. Schedules created in bulk have no summaries, those are built from the entries of the changed days.
+        """
+        changes = defaultdict(lambda: ([], []))
+        for index, intervals in enumerate((added, removed)):
+            for day, start_time, end_time in intervals:
+                changes[day][index].append((start_time, end_time))
+        if not changes:
+            return
+        per_day = {day: _day_change(schedule_id, day, *intervals) for day, intervals in changes.items()}
 
-    def _check_colliding(self, scheduled_entries):
-        any_other_entry = not all(entry.pk == self.pk for entry in scheduled_entries)
-        if any_other_entry:
-            raise ValidationError({'start_time': _('You already have an entry in this time frame!!')})
+        summaries = self.filter(schedule_id=schedule_id, day__in=per_day)
+        if len(per_day) == 1:
+            updates = next(iter(per_day.values()))
+        else:
+            updates = {
+                field: Case(*(When(day=day, then=update[field]) for day, update in per_day.items()))
+                for field in SUMMARY_FIELDS
+            }
+        if summaries.update(**updates) < len(per_day):
+            self.rebuild([schedule_id], days=set(per_day) - set(summaries.values_list('day', flat=True)))
+
+    def rebuild(self, schedule_ids, days=None):
+        """ Recomputes the summaries of the given schedules, optionally of some of their days only, from their entries """
+        days = ScheduleEntry.DayInWeek.values if days is None else list(days)
+        rows = ScheduleEntry.objects.filter(schedule_id__in=schedule_ids, day__in=days).order_by().values(
+            'schedule_id', 'day'
+        ).annotate(
+            entry_count=Count('pk'),
+            busy_time=Sum(ExpressionWrapper(F('end_time') - F('start_time'), output_field=DurationField())),
+            first_start=Min('start_time'),
+            last_end=Max('end_time')
+        )
+        summaries = {
+            (schedule_id, day): ScheduleDaySummary(schedule_id=schedule_id, day=day)
+            for schedule_id in schedule_ids for day in days
+        }
+        for row in rows:
+            summary = summaries[row['schedule_id'], row['day']]
+            summary.entry_count = row['entry_count']
+            summary.busy_seconds = int(row['busy_time'].total_seconds())
+            summary.first_start = row['first_start']
+            summary.last_end = row['last_end']
+        with transaction.atomic():
+            self.filter(schedule_id__in=schedule_ids, day__in=days).delete()
+            return self.bulk_create(summaries.values())
+
+
+class ScheduleDaySummary(models.Model):
+    """
+    Entry statistics of a day of a schedule, kept up to date by applying every entry change to them.
+
+    Every schedule has a summary of each of the seven days of the week, created together with the schedule, so pages
+    showing statistics of many schedules read seven rows per schedule instead of all of its entries.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['schedule', 'day'], name='scheduledaysummary_unique_day'),
+        ]
+
+    schedule = models.ForeignKey(Schedule, on_delete=models.CASCADE, related_name='day_summaries')
+    day = models.PositiveSmallIntegerField(choices=ScheduleEntry.DayInWeek.choices)
+    entry_count = models.PositiveIntegerField(default=0)
+    busy_seconds = models.PositiveIntegerField(default=0)
+    first_start = models.TimeField(null=True)
+    last_end = models.TimeField(null=True)
+
+    objects = ScheduleDaySummaryQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.schedule_id}: {self.get_day_display()}'
@@ -0,0 +1,92 @@
+"""
+Occupancy index: a bitmap of the 7 × 1440 minutes of the week per schedule, about 1.3 KB, with a bit set for every
+minute touched by an entry.
+
+A clear bit proves the minute free, so a check finding no set bit needs no query at all. Entries may start or end
+within a minute, so a set bit only means that the minute may be taken and the caller has to confirm a hit with the
+precise SQL check. The bitmap is cached along with the other data of the schedule and rebuilt from the entries in
+one query after the schedule changes.
+
+Batch checks use NumPy when it is installed (see requirements-numpy.txt) and plain integer arithmetic otherwise.
+"""
+from django.conf import settings
+
+from schedules.cache import get_or_compute, get_version
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+MINUTES_PER_DAY = 24 * 60
+WEEK_MINUTES = 7 * MINUTES_PER_DAY
+BITMAP_SIZE = WEEK_MINUTES // 8
+
+
+def is_enabled():
+    """ The index pays off only when it is cached, otherwise every check would rebuild it """
+    return getattr(settings, 'SCHEDULES_OCCUPANCY_INDEX', False) and getattr(settings, 'SCHEDULES_CACHE_ENABLED', True)
+
+
+def _minute_of_day(value, round_up=False):
+    """ Minutes since midnight of a time or of its HH:MM:SS[.ffffff] text, which loads much faster in bulk """
+    if isinstance(value, str):
+        minute, partial = int(value[:2]) * 60 + int(value[3:5]), value[6:].strip('0.') != ''
+    else:
+        minute, partial = value.hour * 60 + value.minute, bool(value.second or value.microsecond)
+    return minute + 1 if round_up and partial else minute
+
+
+def _minutes(day, start_time, end_time):
+    """ The [first, last) minutes of the week touched by the interval """
+    return day * MINUTES_PER_DAY + _minute_of_day(start_time), day * MINUTES_PER_DAY + _minute_of_day(end_time, True)
+
+
+class Occupancy:
+    def __init__(self, bits=0):
+        self.bits = bits
+
+    @classmethod
+    def from_intervals(cls, intervals):
+        """ Builds the bitmap of (day, start_time, end_time) tuples """
+        # setting ranges of digits and parsing them once is much faster than or-ing shifted masks into a big integer
+        digits = bytearray(b'0' * WEEK_MINUTES)
+        for interval in intervals:
+            first, last = _minutes(*interval)
+            digits[first:last] = b'1' * (last - first)
+        return cls(int(digits[::-1], 2))
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(int.from_bytes(data, 'little'))
+
+    def to_bytes(self):
+        return self.bits.to_bytes(BITMAP_SIZE, 'little')
+
+    def may_overlap(self, day, start_time, end_time):
+        """ False when no minute of the interval is taken, True when some may be """
+        first, last = _minutes(day, start_time, end_time)
+        return bool(self.bits >> first & ((1 << (last - first)) - 1))
+
+    def may_overlap_many(self, intervals):
+        """ may_overlap() of every (day, start_time, end_time) tuple, vectorized with NumPy when available """
+        if numpy is None or not intervals:
+            return [self.may_overlap(*interval) for interval in intervals]
+        taken = numpy.unpackbits(numpy.frombuffer(self.to_bytes(), dtype=numpy.uint8), bitorder='little')
+        # taken minutes before every minute of the week, so that a range is a difference of two lookups
+        taken_before = numpy.concatenate(([0], numpy.cumsum(taken, dtype=numpy.int32)))
+        first, last = numpy.array([_minutes(*interval) for interval in intervals]).T
+        return (taken_before[last] - taken_before[first] > 0).tolist()
+
+
+def get_occupancy(schedule_id, intervals):
+    """
+    The cached occupancy of the schedule, rebuilt when its entries changed.
+
+    intervals is a lazy queryset of the (day, start_time, end_time) of the entries of the schedule, the times may be
+    cast to text.
+    """
+    return Occupancy.from_bytes(get_or_compute(
+        'schedule', schedule_id, get_version('schedule', schedule_id), 'occupancy',
+        lambda: Occupancy.from_intervals(intervals).to_bytes()
+    ))
@@ -0,0 +1,92 @@
+"""
+Keyset (cursor) pagination.
+
+A cursor encodes the sort key of the row a page starts after or ends before, so every page is a single index range
+scan, no matter how deep it is. The key fields have to end with a unique field, usually the primary key.
+"""
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+KeysetPage = namedtuple('KeysetPage', ['object_list', 'next_cursor', 'previous_cursor'])
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _is_key_value(value):
+    # the fields would turn objects and lists into strings instead of rejecting them, and the database drivers
+    # fail on integers beyond 64 bits
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return -2 ** 63 <= value < 2 ** 63
+    return isinstance(value, (str, float))
+
+
+def decode_cursor(cursor, fields):
+    """ Decodes the key values of a cursor, cleaned by the key fields since a cursor is user input """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise InvalidCursor(cursor)
+    if not all(_is_key_value(value) for value in values):
+        raise InvalidCursor(cursor)
+    try:
+        return [field.clean(value, None) for field, value in zip(fields, values)]
+    except (ValidationError, TypeError, ValueError, OverflowError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def _keyset_condition(key_fields, values, lookup):
+    """ Builds (a > x) OR (a = x AND b > y) OR ... for the row comparison (a, b, ...) > (x, y, ...) """
+    condition = Q()
+    for index, field in enumerate(key_fields):
+        equal = {key_fields[i]: values[i] for i in range(index)}
+        condition |= Q(**equal, **{f'{field}__{lookup}': values[index]})
+    return condition
+
+
+def paginate_keyset(queryset, key_fields, page_size, after=None, before=None):
+    """ Returns the page following the after cursor, preceding the before cursor or the first page """
+    def cursor_of(item):
+        return encode_cursor([getattr(item, field) for field in key_fields])
+
+    opts = queryset.model._meta
+    fields = [opts.pk if field == 'pk' else opts.get_field(field) for field in key_fields]
+
+    if before is not None:
+        values = decode_cursor(before, fields)
+        queryset = queryset.filter(_keyset_condition(key_fields, values, 'lt'))
+        items = list(queryset.order_by(*(f'-{field}' for field in key_fields))[:page_size + 1])
+        has_previous = len(items) > page_size
+        items = items[:page_size][::-1]
+        return KeysetPage(
+            items,
+            cursor_of(items[-1]) if items else None,
+            cursor_of(items[0]) if items and has_previous else None
+        )
+
+    if after is not None:
+        values = decode_cursor(after, fields)
+        queryset = queryset.filter(_keyset_condition(key_fields, values, 'gt'))
+    items = list(queryset.order_by(*key_fields)[:page_size + 1])
+    has_next = len(items) > page_size
+    items = items[:page_size]
+    return KeysetPage(
+        items,
+        cursor_of(items[-1]) if has_next else None,
+        cursor_of(items[0]) if items and after is not None else None
+    )
@@ -0,0 +1,103 @@
+import threading
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from schedules.cache import bump_version
+from schedules.models import Schedule, ScheduleDaySummary, ScheduleEntry
+
+_local = threading.local()
+
+
+def _schedules_being_deleted():
+    """ The pks of the schedules whose deletion is under way in this thread """
+    if not hasattr(_local, 'schedules'):
+        _local.schedules = {}
+    if _local.schedules:
+        # A deletion runs in a transaction. When it fails, rolling it back drops the on_commit callbacks registered
+        # by remember_deleted_schedule, and its schedules are forgotten with them instead of skipping later changes.
+        pending = [callback for _, callback in transaction.get_connection().run_on_commit]
+        for pk, forget in list(_local.schedules.items()):
+            if not any(callback is forget for callback in pending):
+                del _local.schedules[pk]
+    return _local.schedules
+
+
+def _author_id(entry):
+    if ScheduleEntry._meta.get_field('schedule').is_cached(entry):
+        return entry.schedule.author_id
+    return Schedule.objects.filter(pk=entry.schedule_id).values_list('author_id', flat=True).first()
+
+
+@receiver(pre_delete, sender=Schedule)
+def remember_deleted_schedule(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    pk = instance.pk
+
+    def forget():
+        _schedules_being_deleted().pop(pk, None)
+
+    _schedules_being_deleted()[pk] = forget
+    transaction.on_commit(forget)
+
+
+@receiver([post_save, post_delete], sender=Schedule)
+def invalidate_schedule(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    _schedules_being_deleted().pop(instance.pk, None)
+    bump_version('schedule', instance.pk)
+    bump_version('schedule-list', instance.author_id)
+
+
+@receiver([post_save, post_delete], sender=ScheduleEntry)
+def invalidate_schedule_entries(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    # Entries deleted along with their schedule leave the invalidation to the schedule, which spares a lookup of the
+    # author and an on_commit callback per cascaded entry.
+    if instance.schedule_id in _schedules_being_deleted():
+        return
+    bump_version('schedule', instance.schedule_id)
+    # Values computed by other requests before the change got committed did not see it, yet they are stored under
+    # the new version. Collision checks must never trust those, see occupancy.py.
+    schedule_id = instance.schedule_id
+    transaction.on_commit(lambda: bump_version('schedule', schedule_id))
+    # the list shows entry statistics too
+    bump_version('schedule-list', _author_id(instance))
+
+
+@receiver(post_save, sender=Schedule)
+def create_day_summaries(sender, instance, created, raw=False, **kwargs):  # pylint: disable=unused-argument
+    if created and not raw:
+        ScheduleDaySummary.objects.bulk_create(
+            ScheduleDaySummary(schedule=instance, day=day) for day in ScheduleEntry.DayInWeek.values
+        )
+
+
+@receiver(post_save, sender=ScheduleEntry)
+def summarize_saved_entry(sender, instance, created, raw=False, **kwargs):  # pylint: disable=unused-argument
+    if raw:
+        return
+    interval = instance.interval()
+    stored_interval = getattr(instance, 'stored_interval', None)
+    if created:
+        ScheduleDaySummary.objects.apply_changes(interval[0], added=[interval[1:]])
+    elif stored_interval is None:
+        # an entry saved without having been loaded gives no clue what it replaced
+        ScheduleDaySummary.objects.rebuild([interval[0]])
+    elif stored_interval[0] != interval[0]:
+        ScheduleDaySummary.objects.apply_changes(stored_interval[0], removed=[stored_interval[1:]])
+        ScheduleDaySummary.objects.apply_changes(interval[0], added=[interval[1:]])
+    elif stored_interval != interval:
+        ScheduleDaySummary.objects.apply_changes(interval[0], added=[interval[1:]], removed=[stored_interval[1:]])
+    instance.stored_interval = interval
+
+
+@receiver(post_delete, sender=ScheduleEntry)
+def summarize_deleted_entry(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    # the summaries of a deleted schedule go away with it
+    if instance.schedule_id in _schedules_being_deleted():
+        return
+    stored_interval = getattr(instance, 'stored_interval', None)
+    if stored_interval is None:
+        # the row was gone already, or the entry was never loaded
+        ScheduleDaySummary.objects.rebuild([instance.schedule_id])
+    else:
+        ScheduleDaySummary.objects.apply_changes(stored_interval[0], removed=[stored_interval[1:]])
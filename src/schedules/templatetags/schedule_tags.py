@@ -0,0 +1,39 @@
+"""
+Fragments of the schedule pages, which render one card per entry.
+
+Reversing a URL walks the URL patterns, so the entry URLs are reversed once per schedule and action with a placeholder
+for the entry, which the primary key of every entry then replaces.
+"""
+from django import template
+from django.urls import reverse
+
+register = template.Library()
+
+ENTRY_ACTIONS = ('update', 'delete')
+# no schedule id contains this number, reverse() checks it against the int converter like any primary key
+_PLACEHOLDER = str(2 ** 62 + 1)
+
+
+def entry_url(action, entry, memo=None):
+    """ The URL of the scheduleentry_<action> view of entry, memo is a dict keeping the reversed URLs for later calls """
+    memo = {} if memo is None else memo
+    key = ('schedule_tags.entry_url', action, entry.schedule_id)
+    if key not in memo:
+        memo[key] = reverse(f'schedules:scheduleentry_{action}', args=[entry.schedule_id, _PLACEHOLDER])
+    return memo[key].replace(_PLACEHOLDER, str(entry.pk))
+
+
+def entry_urls(entry, memo=None):
+    """ The context of a card of entry: the entry and its <action>_url for every action """
+    return {'entry': entry, **{f'{action}_url': entry_url(action, entry, memo) for action in ENTRY_ACTIONS}}
+
+
+@register.inclusion_tag('schedules/scheduleentry_card.html', takes_context=True)
+def entry_card(context, entry):
+    # the render context lives as long as the rendering of the template, e.g. of the week, which uses the tag
+    return entry_urls(entry, context.render_context)
+
+
+@register.simple_tag(takes_context=True, name='entry_url')
+def entry_url_tag(context, action, entry):
+    return entry_url(action, entry, context.render_context)
@@ -0,0 +1,152 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from django.urls import reverse
+
+from schedules import admin
+from schedules.models import OVERLAP_MESSAGE, Schedule, ScheduleEntry
+
+
+class ScheduleAdminTests(TestCase):
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(username='admin', password='admin_password')
+        self.users = [
+            get_user_model().objects.create_user(username=f'user{number}', password='password') for number in range(3)
+        ]
+        self.schedules = [Schedule.objects.create(name=f'schedule {user}', author=user) for user in self.users]
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(
+                schedule=schedule, title=f'entry {number}', day=number % 7,
+                start_time=f'{number // 7:02}:00', end_time=f'{number // 7:02}:30'
+            )
+            for schedule in self.schedules
+            for number in range(10)
+        )
+        self.client.force_login(self.admin)
+        # the pages look the content type up once per process
+        ContentType.objects.clear_cache()
+
+    def test_schedule_changelist_joins_the_authors(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('admin:schedules_schedule_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        for user in self.users:
+            self.assertContains(response, str(user))
+
+    def test_schedule_change_page_caps_the_entries(self):
+        schedule = self.schedules[0]
+        path = reverse('admin:schedules_schedule_change', args=[schedule.pk])
+
+        with mock.patch.object(admin, 'INLINE_ENTRY_LIMIT', 4), self.assertNumQueries(8):
+            response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['inline_admin_formsets'][0].formset.initial_form_count(), 4)
+        self.assertContains(
+            response, f"{reverse('admin:schedules_scheduleentry_changelist')}?schedule__id__exact={schedule.pk}"
+        )
+
+    def test_schedule_change_page_saves_the_shown_entries(self):
+        schedule = self.schedules[0]
+        entries = list(schedule.scheduleentry_set.all()[:2])
+        data = {
+            'name': 'renamed', 'author': schedule.author_id,
+            'scheduleentry_set-TOTAL_FORMS': 2, 'scheduleentry_set-INITIAL_FORMS': 2,
+            'scheduleentry_set-MIN_NUM_FORMS': 0, 'scheduleentry_set-MAX_NUM_FORMS': 1000,
+        }
+        for number, entry in enumerate(entries):
+            data.update({
+                f'scheduleentry_set-{number}-id': entry.pk, f'scheduleentry_set-{number}-schedule': schedule.pk,
+                f'scheduleentry_set-{number}-title': f'retitled {number}', f'scheduleentry_set-{number}-day': entry.day,
+                f'scheduleentry_set-{number}-start_time': entry.start_time,
+                f'scheduleentry_set-{number}-end_time': entry.end_time,
+            })
+
+        with mock.patch.object(admin, 'INLINE_ENTRY_LIMIT', 2):
+            response = self.client.post(reverse('admin:schedules_schedule_change', args=[schedule.pk]), data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(schedule.scheduleentry_set.order_by('day', 'start_time').values_list('title', flat=True)[:3]),
+            ['retitled 0', 'retitled 1', 'entry 1']
+        )
+
+    def test_schedule_add_page_loads_no_users(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('admin:schedules_schedule_add'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_entry_changelist_joins_the_schedules(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('admin:schedules_scheduleentry_changelist'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['cl'].result_count, 30)
+        self.assertContains(response, 'schedule user2')
+
+    def test_entry_changelist_filters_by_day_and_author(self):
+        path = reverse('admin:schedules_scheduleentry_changelist')
+
+        with self.assertNumQueries(5):
+            response = self.client.get(path, {'day__exact': 1, 'schedule__author__id__exact': self.users[1].pk})
+
+        self.assertEqual(
+            {(entry.schedule_id, entry.day) for entry in response.context['cl'].result_list},
+            {(self.schedules[1].pk, 1)}
+        )
+
+    def test_entry_changelist_lists_the_selected_author_past_the_filter_limit(self):
+        path = reverse('admin:schedules_scheduleentry_changelist')
+
+        with mock.patch.object(admin, 'AUTHOR_FILTER_LIMIT', 1):
+            response = self.client.get(path, {'schedule__author__id__exact': self.users[2].pk})
+
+        self.assertContains(response, f'?schedule__author__id__exact={self.users[2].pk}')
+        self.assertEqual(response.context['cl'].result_count, 10)
+
+    def test_entry_changelist_counts_up_to_the_limit(self):
+        with mock.patch.object(admin, 'COUNT_LIMIT', 25):
+            response = self.client.get(reverse('admin:schedules_scheduleentry_changelist'))
+
+        self.assertEqual(response.context['cl'].result_count, 25)
+
+    def test_entry_change_page_loads_no_schedules(self):
+        entry = self.schedules[0].scheduleentry_set.first()
+
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse('admin:schedules_scheduleentry_change', args=[entry.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'schedule user0')
+
+    def test_entry_add_page_loads_no_schedules(self):
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('admin:schedules_scheduleentry_add'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_schedule_change_page_rejects_new_entries_colliding_with_each_other(self):
+        schedule = self.schedules[0]
+        data = {
+            'name': schedule.name, 'author': schedule.author_id,
+            'scheduleentry_set-TOTAL_FORMS': 2, 'scheduleentry_set-INITIAL_FORMS': 0,
+            'scheduleentry_set-MIN_NUM_FORMS': 0, 'scheduleentry_set-MAX_NUM_FORMS': 1000,
+        }
+        for number, (start_time, end_time) in enumerate([('10:00', '11:00'), ('10:30', '11:30')]):
+            data.update({
+                f'scheduleentry_set-{number}-schedule': schedule.pk, f'scheduleentry_set-{number}-title': 'new',
+                f'scheduleentry_set-{number}-day': ScheduleEntry.DayInWeek.SUNDAY,
+                f'scheduleentry_set-{number}-start_time': start_time, f'scheduleentry_set-{number}-end_time': end_time,
+            })
+
+        with mock.patch.object(admin, 'INLINE_ENTRY_LIMIT', 0):
+            response = self.client.post(reverse('admin:schedules_schedule_change', args=[schedule.pk]), data)
+
+        self.assertEqual(response.status_code, 200)
+        formset = response.context['inline_admin_formsets'][0].formset
+        self.assertEqual([form.errors.get('start_time') for form in formset.forms], [None, [OVERLAP_MESSAGE]])
+        self.assertFalse(schedule.scheduleentry_set.filter(title='new').exists())
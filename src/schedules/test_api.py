@@ -0,0 +1,291 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from schedules.models import Schedule, ScheduleEntry
+from schedules.pagination import encode_cursor
+
+
+class ApiTestCase(TestCase):
+
+    def setUp(self):
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.schedule_1 = Schedule.objects.create(
+            name="user1_schedule",
+            author=self.user_1
+        )
+        self.schedule_1_entry = ScheduleEntry.objects.create(
+            schedule = self.schedule_1,
+            title = 'entry_1_title',
+            day = ScheduleEntry.DayInWeek.TUESDAY,
+            start_time = '10:00',
+            end_time = '12:00'
+        )
+
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='user2_password')
+        self.schedule_2 = Schedule.objects.create(
+            name="user2_schedule",
+            author=self.user_2
+        )
+
+    def send(self, method, path, data):
+        return getattr(self.client, method)(path, json.dumps(data), content_type='application/json')
+
+
+class ScheduleApiTests(ApiTestCase):
+
+    def test_rejects_unauthenticated_users(self):
+        response = self.client.get(reverse('schedules_api:schedule_list'))
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_returns_user_schedules_only(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(reverse('schedules_api:schedule_list'))
+
+        self.assertEqual(response.json(), {'results': [{'id': 1, 'name': 'user1_schedule'}], 'next': None})
+
+    def test_list_is_paginated_with_cursor(self):
+        for i in range(4):
+            Schedule.objects.create(name=f'schedule_{i}', author=self.user_1)
+        self.client.login(username='user1', password='user1_password')
+
+        names = []
+        path = f"{reverse('schedules_api:schedule_list')}?limit=2"
+        while path:
+            page = self.client.get(path).json()
+            names.extend(schedule['name'] for schedule in page['results'])
+            path = page['next']
+
+        self.assertEqual(names, ['user1_schedule', 'schedule_0', 'schedule_1', 'schedule_2', 'schedule_3'])
+
+    def test_list_rejects_crafted_cursor(self):
+        self.client.login(username='user1', password='user1_password')
+        for values in [['x'], [{'a': 1}], [None], [2 ** 64]]:
+            response = self.client.get(reverse('schedules_api:schedule_list'), {'cursor': encode_cursor(values)})
+
+            self.assertEqual(response.status_code, 400, values)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor.'})
+
+    def test_create_assigns_schedule_to_user(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('post', reverse('schedules_api:schedule_list'), {'name': 'new_schedule'})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Schedule.objects.get(pk=response.json()['id']).author, self.user_1)
+
+    def test_create_reports_invalid_data(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('post', reverse('schedules_api:schedule_list'), {'name': 'a' * 101})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('name', response.json()['errors'])
+
+    def test_detail_does_not_allow_to_see_other_users_schedule(self):
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(reverse('schedules_api:schedule', args=[1]))
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_detail_fails_on_not_existing_schedule(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(reverse('schedules_api:schedule', args=[123]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_patch_renames_schedule(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('patch', reverse('schedules_api:schedule', args=[1]), {'name': 'renamed'})
+
+        self.assertEqual(response.json(), {'id': 1, 'name': 'renamed'})
+
+    def test_delete_removes_schedule(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.delete(reverse('schedules_api:schedule', args=[1]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Schedule.objects.filter(pk=1).exists())
+
+    @override_settings(SCHEDULES_CACHE_SHARED=True)
+    def test_detail_answers_not_modified_until_schedule_changes(self):
+        path = reverse('schedules_api:schedule', args=[1])
+        self.client.login(username='user1', password='user1_password')
+        etag = self.client.get(path)['ETag']
+
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.send('patch', path, {'name': 'renamed'})
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_has_no_etag_on_a_per_process_cache(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(reverse('schedules_api:schedule', args=[1]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class ScheduleEntryApiTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.list_path = reverse('schedules_api:scheduleentry_list', args=[1])
+        self.entry_path = reverse('schedules_api:scheduleentry', args=[1, 1])
+
+    def test_list_returns_entries_of_the_schedule(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(self.list_path)
+
+        self.assertEqual(response.json()['results'], [{
+            'id': 1,
+            'title': 'entry_1_title',
+            'description': '',
+            'day': 1,
+            'start_time': '10:00:00',
+            'end_time': '12:00:00',
+        }])
+
+    def test_list_does_not_allow_to_see_other_users_entries(self):
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(self.list_path)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_list_is_paginated_in_entry_order(self):
+        for day, start_time in [(0, '9:00'), (1, '8:00'), (1, '13:00'), (6, '7:00')]:
+            ScheduleEntry.objects.create(
+                schedule=self.schedule_1, title=f'{day} {start_time}', day=day,
+                start_time=start_time, end_time=start_time.replace(':00', ':30')
+            )
+        self.client.login(username='user1', password='user1_password')
+
+        titles = []
+        path = f'{self.list_path}?limit=2&fields=title'
+        while path:
+            with self.assertNumQueries(4):
+                page = self.client.get(path).json()
+            titles.extend(entry['title'] for entry in page['results'])
+            path = page['next']
+
+        self.assertEqual(titles, ['0 9:00', '1 8:00', 'entry_1_title', '1 13:00', '6 7:00'])
+
+    def test_list_projects_requested_fields(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(f'{self.list_path}?fields=title,day')
+
+        self.assertEqual(response.json()['results'], [{'id': 1, 'title': 'entry_1_title', 'day': 1}])
+
+    def test_list_rejects_unknown_fields(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(f'{self.list_path}?fields=title,password')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_rejects_malformed_cursor(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(f'{self.list_path}?cursor=abc')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_list_rejects_crafted_cursor(self):
+        self.client.login(username='user1', password='user1_password')
+        for values in [['x', 'y', 'z'], [0, 'notatime', 1], [{'a': 1}, '10:00', 1], [9, '10:00', 1], [0, '10:00', 'x']]:
+            response = self.client.get(self.list_path, {'cursor': encode_cursor(values)})
+
+            self.assertEqual(response.status_code, 400, values)
+            self.assertEqual(response.json(), {'detail': 'Invalid cursor.'})
+
+    @override_settings(SCHEDULES_CACHE_SHARED=True)
+    def test_list_answers_not_modified_until_an_entry_changes(self):
+        self.client.login(username='user1', password='user1_password')
+        etag = self.client.get(self.list_path)['ETag']
+
+        self.assertEqual(self.client.get(self.list_path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.send('patch', self.entry_path, {'title': 'new_title'})
+        self.assertEqual(self.client.get(self.list_path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_create_adds_entry_to_schedule(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('post', self.list_path, {
+            'title': 'new_title', 'day': 2, 'start_time': '8:00', 'end_time': '9:00'
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(self.schedule_1.scheduleentry_set.filter(title='new_title').exists())
+
+    def test_create_rejects_colliding_entry(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('post', self.list_path, {
+            'title': 'new_title', 'day': 1, 'start_time': '11:00', 'end_time': '13:00'
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_time', response.json()['errors'])
+
+    def test_create_rejects_malformed_json(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(self.list_path, '{', content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_fetches_entry_in_a_single_query(self):
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            response = self.client.get(self.entry_path)
+        self.assertEqual(response.json()['title'], 'entry_1_title')
+
+    def test_detail_does_not_allow_to_see_other_users_entry(self):
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(self.entry_path)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_detail_does_not_allow_to_reach_entry_through_own_schedule(self):
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(reverse('schedules_api:scheduleentry', args=[2, 1]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_patch_updates_given_fields_only(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('patch', self.entry_path, {'end_time': '13:00'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'entry_1_title')
+        self.assertEqual(response.json()['end_time'], '13:00:00')
+
+    def test_patch_writes_changed_fields_only(self):
+        self.client.login(username='user1', password='user1_password')
+
+        # session, user, entry, its stored interval read again, and the update within a savepoint, the unchanged time
+        # needs no collision check
+        with self.assertNumQueries(7):
+            response = self.send('patch', self.entry_path, {'title': 'new_title'})
+
+        self.assertEqual(response.json()['title'], 'new_title')
+        self.assertEqual(response.json()['start_time'], '10:00:00')
+
+    def test_put_requires_all_fields(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.send('put', self.entry_path, {'title': 'new_title'})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_delete_removes_entry(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.delete(self.entry_path)
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(ScheduleEntry.objects.filter(pk=1).exists())
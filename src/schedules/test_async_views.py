@@ -0,0 +1,118 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from schedules import async_views
+from schedules.cache import get_cache
+from schedules.models import Schedule, ScheduleEntry
+
+
+class AsyncViewTests(TransactionTestCase):
+    """ The async views query the database from worker threads, which see committed rows only """
+
+    def setUp(self):
+        get_cache().clear()
+        self.user_1 = get_user_model().objects.create_user(username='user1', password='user1_password')
+        self.user_2 = get_user_model().objects.create_user(username='user2', password='user2_password')
+        self.schedule = Schedule.objects.create(name='user1_schedule', author=self.user_1)
+        ScheduleEntry.objects.create(
+            schedule=self.schedule, title='entry_title', day=ScheduleEntry.DayInWeek.TUESDAY, start_time='10:00',
+            end_time='11:30'
+        )
+        # logging in queries the database, which async tests must not do themselves
+        self.async_client = AsyncClient()
+        self.async_client.force_login(self.user_1)
+        self.other_client = AsyncClient()
+        self.other_client.force_login(self.user_2)
+
+    async def test_list_redirects_unauthenticated_users_to_login(self):
+        path = reverse('schedules:schedule_list_async')
+        response = await AsyncClient().get(path)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, f"{reverse('login')}?next={path}")
+
+    async def test_list_shows_schedules_of_the_user(self):
+        response = await self.async_client.get(reverse('schedules:schedule_list_async'))
+
+        self.assertContains(response, 'user1_schedule')
+        self.assertContains(response, '1 entry, 90 min scheduled')
+
+    async def test_detail_shows_the_week(self):
+        response = await self.async_client.get(reverse('schedules:schedule_detail_async', args=[self.schedule.pk]))
+
+        self.assertContains(response, 'user1_schedule')
+        self.assertContains(response, 'entry_title')
+
+    async def test_detail_refuses_other_users(self):
+        response = await self.other_client.get(reverse('schedules:schedule_detail_async', args=[self.schedule.pk]))
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_detail_loads_the_week_for_the_owner_only(self):
+        path = reverse('schedules:schedule_detail_async', args=[self.schedule.pk])
+
+        with mock.patch.object(async_views, '_week_html', return_value='') as week_html:
+            await AsyncClient().get(path)
+            await self.other_client.get(path)
+            await self.async_client.get(path)
+
+        week_html.assert_called_once_with(self.schedule.pk)
+
+    async def test_detail_of_missing_schedule_is_not_found(self):
+        response = await self.async_client.get(reverse('schedules:schedule_detail_async', args=[self.schedule.pk + 1]))
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_week_api_returns_summaries_and_entries_of_every_day(self):
+        response = await self.async_client.get(reverse('schedules_api:schedule_week', args=[self.schedule.pk]))
+
+        days = response.json()['days']
+        self.assertEqual(len(days), 7)
+        self.assertEqual(days[1]['label'], 'Tuesday')
+        self.assertEqual(days[1]['entry_count'], 1)
+        self.assertEqual(days[1]['busy_minutes'], 90)
+        self.assertEqual(days[1]['entries'], [{
+            'id': days[1]['entries'][0]['id'], 'title': 'entry_title', 'description': '', 'start_time': '10:00:00',
+            'end_time': '11:30:00'
+        }])
+        self.assertEqual(days[0]['entries'], [])
+
+    @override_settings(SCHEDULES_CACHE_SHARED=True)
+    async def test_week_api_answers_not_modified_for_current_etag(self):
+        path = reverse('schedules_api:schedule_week', args=[self.schedule.pk])
+        etag = (await self.async_client.get(path))['ETag']
+
+        response = await self.async_client.get(path, **{'If-None-Match': etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_week_api_reports_errors_as_json(self):
+        path = reverse('schedules_api:schedule_week', args=[self.schedule.pk])
+
+        self.assertEqual((await AsyncClient().get(path)).status_code, 401)
+        response = await self.other_client.get(path)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'detail': 'You do not have permission to perform this action.'})
+
+    async def test_week_api_has_no_etag_on_a_per_process_cache(self):
+        response = await self.async_client.get(reverse('schedules_api:schedule_week', args=[self.schedule.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+
+class DatabaseSyncToAsyncTests(SimpleTestCase):
+    async def test_closes_old_connections_around_every_call(self):
+        def fail():
+            raise ValueError
+
+        with mock.patch.object(async_views, 'close_old_connections') as close_old_connections:
+            self.assertEqual(await async_views.database_sync_to_async(len)('call'), 4)
+            self.assertEqual(close_old_connections.call_count, 2)
+            with self.assertRaises(ValueError):
+                await async_views.database_sync_to_async(fail)()
+
+        self.assertEqual(close_old_connections.call_count, 4)
@@ -0,0 +1,160 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, transaction
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from schedules.cache import get_cache, stats
+from schedules.models import Schedule, ScheduleEntry
+
+
+class ScheduleCacheTests(TestCase):
+
+    def setUp(self):
+        get_cache().clear()
+        stats.reset()
+
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.schedule_1 = Schedule.objects.create(
+            name="user1_schedule",
+            author=self.user_1
+        )
+        self.schedule_1_entry = ScheduleEntry.objects.create(
+            schedule = self.schedule_1,
+            title = 'entry_1_title',
+            day = ScheduleEntry.DayInWeek.TUESDAY,
+            start_time = '10:00',
+            end_time = '12:00'
+        )
+        self.detail_path = reverse('schedules:schedule_detail', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+
+    def test_detail_is_served_from_cache_on_repeated_requests(self):
+        first_response = self.client.get(self.detail_path)
+
+        with self.assertNumQueries(3):
+            second_response = self.client.get(self.detail_path)
+
+        self.assertEqual(first_response.content, second_response.content)
+        self.assertEqual(stats.as_dict(), {'hits': 1, 'misses': 2})
+
+    def test_detail_shows_added_entry(self):
+        self.client.get(self.detail_path)
+
+        ScheduleEntry.objects.create(
+            schedule=self.schedule_1,
+            title='entry_2_title',
+            day=ScheduleEntry.DayInWeek.MONDAY,
+            start_time='8:00',
+            end_time='9:00'
+        )
+
+        self.assertContains(self.client.get(self.detail_path), 'entry_2_title')
+
+    def test_detail_shows_updated_entry(self):
+        self.client.get(self.detail_path)
+
+        self.schedule_1_entry.title = 'new_title'
+        self.schedule_1_entry.save()
+
+        self.assertContains(self.client.get(self.detail_path), 'new_title')
+
+    def test_detail_hides_deleted_entry(self):
+        self.client.get(self.detail_path)
+
+        self.schedule_1_entry.delete()
+
+        self.assertNotContains(self.client.get(self.detail_path), 'entry_1_title')
+
+    def test_detail_shows_imported_entries(self):
+        self.client.get(self.detail_path)
+
+        self.client.post(
+            reverse('schedules:scheduleentry_import', args=[self.schedule_1.pk]),
+            {'file': SimpleUploadedFile('entries.csv', b'title,day,start_time,end_time\nimported_title,0,8:00,9:00\n')}
+        )
+
+        self.assertContains(self.client.get(self.detail_path), 'imported_title')
+
+    def test_list_shows_renamed_schedule(self):
+        self.client.get('/')
+
+        self.schedule_1.name = 'renamed_schedule'
+        self.schedule_1.save()
+
+        self.assertContains(self.client.get('/'), 'renamed_schedule')
+
+    def test_list_shows_created_schedule(self):
+        self.client.get('/')
+
+        Schedule.objects.create(name='created_schedule', author=self.user_1)
+
+        self.assertContains(self.client.get('/'), 'created_schedule')
+
+    def test_list_shows_entry_count_of_added_entry(self):
+        self.assertContains(self.client.get('/'), '1 entry,')
+
+        ScheduleEntry.objects.create(
+            schedule_id=self.schedule_1.pk, title='title', day=0, start_time='10:00', end_time='11:00'
+        )
+
+        self.assertContains(self.client.get('/'), '2 entries,')
+
+    def test_list_shows_entry_count_of_imported_entries(self):
+        self.client.get('/')
+
+        self.client.post(
+            reverse('schedules:scheduleentry_import', args=[self.schedule_1.pk]),
+            {'file': SimpleUploadedFile('entries.csv', b'title,day,start_time,end_time\nimported_title,0,10:00,11:00\n')}
+        )
+
+        self.assertContains(self.client.get('/'), '2 entries,')
+
+    def test_deleting_schedule_does_not_look_up_author_per_entry(self):
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(schedule=self.schedule_1, title='title', day=day, start_time='08:00', end_time='09:00')
+            for day in range(7)
+        )
+
+        schedule = Schedule.objects.get(pk=self.schedule_1.pk)
+
+        # select entries, delete entries, delete summaries, delete schedule
+        with self.assertNumQueries(4):
+            schedule.delete()
+
+    def test_failed_schedule_deletion_does_not_stop_invalidation(self):
+        self.assertContains(self.client.get('/'), '1 entry,')
+
+        def fail(**kwargs):
+            raise DatabaseError('deletion failed')
+
+        post_delete.connect(fail, sender=ScheduleEntry)
+        try:
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                Schedule.objects.get(pk=self.schedule_1.pk).delete()
+        finally:
+            post_delete.disconnect(fail, sender=ScheduleEntry)
+        ScheduleEntry.objects.create(
+            schedule_id=self.schedule_1.pk, title='title', day=0, start_time='10:00', end_time='11:00'
+        )
+
+        self.assertContains(self.client.get('/'), '2 entries,')
+
+    def test_detail_shows_copied_day(self):
+        self.client.get(self.detail_path)
+
+        self.schedule_1.copy_day(ScheduleEntry.DayInWeek.TUESDAY, [ScheduleEntry.DayInWeek.SUNDAY])
+
+        self.assertEqual(self.client.get(self.detail_path).context['week'][6].entries[0].title, 'entry_1_title')
+
+    @override_settings(SCHEDULES_CACHE_ENABLED=False)
+    def test_cache_can_be_disabled(self):
+        self.client.get(self.detail_path)
+
+        with self.assertNumQueries(4):
+            self.client.get(self.detail_path)
+        self.assertEqual(stats.as_dict(), {'hits': 0, 'misses': 0})
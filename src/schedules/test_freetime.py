@@ -0,0 +1,164 @@
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from schedules.cache import get_cache
+from schedules.freetime import FreeSlot, find_free_time, free_slots
+from schedules.models import Schedule, ScheduleEntry
+
+
+def seconds(hours, minutes=0):
+    return hours * 3600 + minutes * 60
+
+
+class TestFreeSlots(SimpleTestCase):
+    def test_complements_merged_busy_intervals(self):
+        busy = {0: [(seconds(8), seconds(10)), (seconds(9), seconds(11)), (seconds(11), seconds(12)),
+                    (seconds(14), seconds(23, 30))]}
+
+        slots = free_slots(busy, [0])
+
+        self.assertEqual(slots, [
+            FreeSlot(0, time(0), time(8)),
+            FreeSlot(0, time(12), time(14)),
+            FreeSlot(0, time(23, 30), None),
+        ])
+
+    def test_whole_day_is_free_without_entries(self):
+        self.assertEqual(free_slots({2: [], 3: []}, [2, 3]), [FreeSlot(2, time(0), None), FreeSlot(3, time(0), None)])
+
+    def test_skips_slots_shorter_than_minimum_duration(self):
+        busy = {0: [(seconds(0), seconds(8)), (seconds(8, 15), seconds(12)), (seconds(13), seconds(23, 45))]}
+
+        slots = free_slots(busy, [0], timedelta(minutes=30))
+
+        self.assertEqual(slots, [FreeSlot(0, time(12), time(13))])
+
+
+class TestFindFreeTime(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user_1 = get_user_model().objects.create_user(username='user1', password='user1_password')
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2', password='user2_password', shares_free_time=True
+        )
+        self.work = Schedule.objects.create(name='work', author=self.user_1)
+        self.gym = Schedule.objects.create(name='gym', author=self.user_1)
+        self.meetings = Schedule.objects.create(name='meetings', author=self.user_2)
+        for schedule, start_time, end_time in (
+                (self.work, '08:00', '16:00'),
+                (self.gym, '18:00', '19:00'),
+                (self.meetings, '16:00', '17:00'),
+        ):
+            ScheduleEntry.objects.create(
+                schedule=schedule, title='title', day=ScheduleEntry.DayInWeek.MONDAY, start_time=start_time,
+                end_time=end_time
+            )
+
+    def test_combines_selected_schedules(self):
+        slots = find_free_time([self.work, self.gym], [0], timedelta(hours=1))
+
+        self.assertEqual(slots, [
+            FreeSlot(0, time(0), time(8)),
+            FreeSlot(0, time(16), time(18)),
+            FreeSlot(0, time(19), None),
+        ])
+
+    def test_leaves_time_free_for_all_participants(self):
+        slots = find_free_time([self.work, self.gym], [0], timedelta(hours=1), participants=[self.user_2])
+
+        self.assertEqual(slots, [
+            FreeSlot(0, time(0), time(8)),
+            FreeSlot(0, time(17), time(18)),
+            FreeSlot(0, time(19), None),
+        ])
+
+    def test_ignores_days_outside_the_range(self):
+        slots = find_free_time([self.work], [0, 2], timedelta(hours=1))
+
+        self.assertEqual(slots, [
+            FreeSlot(0, time(0), time(8)),
+            FreeSlot(0, time(16), None),
+            FreeSlot(2, time(0), None),
+        ])
+
+    def test_loads_entries_in_a_single_query(self):
+        schedules = Schedule.objects.filter(author=self.user_1)
+
+        # schedules, schedules of the participants, entries
+        with self.assertNumQueries(3):
+            find_free_time(schedules, range(7), participants=[self.user_2])
+
+    def test_busy_time_is_cached_until_an_entry_changes(self):
+        find_free_time([self.work], [0])
+
+        with self.assertNumQueries(0):
+            find_free_time([self.work], [0])
+
+        ScheduleEntry.objects.create(
+            schedule=self.work, title='title', day=ScheduleEntry.DayInWeek.MONDAY, start_time='20:00', end_time='21:00'
+        )
+        self.assertIn(FreeSlot(0, time(16), time(20)), find_free_time([self.work], [0]))
+
+    def test_view_lists_free_time_of_selected_schedules(self):
+        self.client.login(username='user1', password='user1_password')
+
+        response = self.client.get(reverse('schedules:free_time'), {
+            'schedules': [self.work.pk],
+            'first_day': '0',
+            'last_day': '1',
+            'min_duration': '60',
+            'participants': 'user2',
+        })
+
+        self.assertContains(response, '00:00 - 08:00')
+        self.assertContains(response, '17:00 - 24:00')
+        self.assertEqual([label for label, _slots in response.context['free_days']], ['Monday', 'Tuesday'])
+
+    def test_view_offers_only_schedules_of_the_user(self):
+        self.client.login(username='user1', password='user1_password')
+
+        response = self.client.get(reverse('schedules:free_time'), {
+            'schedules': [self.meetings.pk],
+            'first_day': '0',
+            'last_day': '0',
+            'min_duration': '0',
+        })
+
+        self.assertFormError(response, 'form', 'schedules', [
+            f'Select a valid choice. {self.meetings.pk} is not one of the available choices.'
+        ])
+
+    def test_view_reports_unknown_participants(self):
+        self.client.login(username='user1', password='user1_password')
+
+        response = self.client.get(reverse('schedules:free_time'), {
+            'schedules': [self.work.pk],
+            'first_day': '0',
+            'last_day': '0',
+            'min_duration': '0',
+            'participants': 'user2, nobody',
+        })
+
+        self.assertFormError(
+            response, 'form', 'participants', ['Unknown users or users not sharing their free time: nobody.']
+        )
+
+    def test_view_does_not_tell_users_not_sharing_free_time_from_unknown_ones(self):
+        get_user_model().objects.create_user(username='user3', password='user3_password')
+        self.client.login(username='user1', password='user1_password')
+
+        response = self.client.get(reverse('schedules:free_time'), {
+            'schedules': [self.work.pk],
+            'first_day': '0',
+            'last_day': '0',
+            'min_duration': '0',
+            'participants': 'user3, nobody',
+        })
+
+        self.assertFormError(
+            response, 'form', 'participants', ['Unknown users or users not sharing their free time: nobody, user3.']
+        )
+        self.assertNotIn('free_days', response.context)
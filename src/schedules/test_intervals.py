@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase
+
+from schedules.intervals import find_collisions, merge_intervals
+
+
+class TestMergeIntervals(SimpleTestCase):
+    def test_merges_overlapping_and_contained_intervals(self):
+        merged = merge_intervals([(1, 3), (2, 4), (5, 9), (6, 7)])
+
+        self.assertEqual(merged, [(1, 4), (5, 9)])
+
+    def test_keeps_adjacent_intervals_apart(self):
+        merged = merge_intervals([(1, 2), (2, 3)])
+
+        self.assertEqual(merged, [(1, 2), (2, 3)])
+
+
+class TestFindCollisions(SimpleTestCase):
+    def test_detects_candidates_overlapping_existing_intervals(self):
+        existing = [(0, 10, 12), (0, 14, 16)]
+        candidates = [('inside', 0, 11, 12), ('between', 0, 12, 14), ('across', 0, 9, 17), ('other_day', 1, 10, 12)]
+
+        collisions = find_collisions(existing, candidates)
+
+        self.assertEqual(collisions, {'inside': None, 'across': None})
+
+    def test_keeps_the_earlier_of_two_overlapping_candidates(self):
+        candidates = [('later', 0, 9, 11), ('earlier', 0, 8, 10), ('after', 0, 11, 12)]
+
+        collisions = find_collisions([], candidates)
+
+        self.assertEqual(collisions, {'later': 'earlier'})
+
+    def test_does_not_let_rejected_candidates_block_others(self):
+        existing = [(0, 11, 13)]
+        candidates = [('rejected', 0, 9, 12), ('fits_before', 0, 10, 11)]
+
+        collisions = find_collisions(existing, candidates)
+
+        self.assertEqual(collisions, {'rejected': None})
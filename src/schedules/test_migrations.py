@@ -0,0 +1,37 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class TestDayToIntegerMigration(TransactionTestCase):
+    # the users are created with the fields they have in the database
+    before = [('accounts', '0002_customuser_shares_free_time'), ('schedules', '0006_auto_20261018_1628')]
+    after = [('accounts', '0002_customuser_shares_free_time'), ('schedules', '0009_scheduleentry_day_integer')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_days_are_converted_to_numbers_and_back(self):
+        apps = self.migrate(self.before)
+        user = apps.get_model('accounts', 'CustomUser').objects.create(username='user')
+        schedule = apps.get_model('schedules', 'Schedule').objects.create(name='schedule', author_id=user.pk)
+        apps.get_model('schedules', 'ScheduleEntry').objects.bulk_create(
+            apps.get_model('schedules', 'ScheduleEntry')(
+                schedule_id=schedule.pk, title='title', day=str(day), start_time='10:00', end_time='11:00'
+            )
+            for day in range(7)
+        )
+
+        apps = self.migrate(self.after)
+        days = apps.get_model('schedules', 'ScheduleEntry').objects.order_by('pk').values_list('day', flat=True)
+        self.assertEqual(list(days), list(range(7)))
+
+        apps = self.migrate(self.before)
+        days = apps.get_model('schedules', 'ScheduleEntry').objects.order_by('pk').values_list('day', flat=True)
+        self.assertEqual(list(days), [str(day) for day in range(7)])
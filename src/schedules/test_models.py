@@ -1,9 +1,14 @@
+from datetime import time
+from io import StringIO
+
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase
 from parameterized import parameterized
 
-from schedules.models import Schedule, ScheduleEntry
+from schedules.imports import import_entries
+from schedules.models import Schedule, ScheduleDaySummary, ScheduleEntry
 
 
 class TestSchedule(TestCase):
@@ -46,6 +51,66 @@ class TestSchedule(TestCase):
             Schedule.objects.get(name=schedule_name)
 
 
+class TestScheduleCopying(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='test_user',
+            email='test_user@test.com',
+            password='test_password'
+        )
+        self.schedule = Schedule.objects.create(name='test_schedule', author=self.user)
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(
+                schedule=self.schedule,
+                title=f'title_{hour}',
+                description='description',
+                day=ScheduleEntry.DayInWeek.MONDAY,
+                start_time=f'{hour:02}:00',
+                end_time=f'{hour:02}:30'
+            )
+            for hour in range(8, 18)
+        )
+
+    def entries(self, schedule, day):
+        return list(schedule.scheduleentry_set.filter(day=day).values_list('title', 'description', 'start_time', 'end_time'))
+
+    def test_duplicate_copies_all_entries(self):
+        copy = self.schedule.duplicate('copied_schedule')
+
+        self.assertEqual(copy.name, 'copied_schedule')
+        self.assertEqual(copy.author, self.user)
+        self.assertEqual(self.entries(copy, 0), self.entries(self.schedule, 0))
+
+    def test_duplicate_runs_constant_number_of_queries(self):
+        # savepoint, insert schedule, insert its summaries, select entries, insert entries, copy summaries, release
+        with self.assertNumQueries(7):
+            self.schedule.duplicate('copied_schedule')
+
+    def test_copy_day_copies_entries_to_target_days(self):
+        created = self.schedule.copy_day(0, [2, 4])
+
+        self.assertEqual(created, 20)
+        self.assertEqual(self.entries(self.schedule, 2), self.entries(self.schedule, 0))
+        self.assertEqual(self.entries(self.schedule, 4), self.entries(self.schedule, 0))
+
+    def test_copy_day_ignores_the_source_day_among_targets(self):
+        self.assertEqual(self.schedule.copy_day(0, [0, 1]), 10)
+
+    def test_copy_day_copies_nothing_when_any_copy_collides(self):
+        ScheduleEntry.objects.create(
+            schedule=self.schedule, title='title', day=ScheduleEntry.DayInWeek.FRIDAY, start_time='12:15', end_time='12:45'
+        )
+
+        with self.assertRaisesMessage(ValidationError, 'Friday'):
+            self.schedule.copy_day(0, [1, 4])
+        self.assertEqual(self.entries(self.schedule, 1), [])
+
+    def test_copy_day_runs_constant_number_of_queries(self):
+        # savepoint, select source entries, select target entries, insert entries, update summaries, release
+        with self.assertNumQueries(6):
+            self.schedule.copy_day(0, [1, 2, 3])
+
+
 class TestScheduleEntry(TestCase):
     def setUp(self):
         self.user = get_user_model().objects.create_user(
@@ -108,16 +173,20 @@ class TestScheduleEntry(TestCase):
         self.schedule_entry_data['start_time'] = start_time
         self.schedule_entry_data['end_time'] = end_time
 
-        schedule = ScheduleEntry(**self.schedule_entry_data)
+        schedule = ScheduleEntry(schedule=self.schedule, **self.schedule_entry_data)
 
-        with self.assertRaises(ValidationError):
+        with self.assertRaises(ValidationError) as context:
             schedule.full_clean()
 
+        self.assertIn('end_time', context.exception.message_dict)
+
     @parameterized.expand([
         ('starts_when_the_other_starts', '10:00', '13:00'),
         ('starts_in_the_middle_of_the_other', '11:00', '13:00'),
         ('ends_in_the_middle_of_the_other', '9:00', '11:00'),
         ('ends_when_the_other_ends', '9:00', '12:00'),
+        ('contains_the_other', '9:00', '13:00'),
+        ('is_contained_by_the_other', '10:30', '11:30'),
     ])
     def test_entry_cannot_overlap_with_another(self, _, start_time, end_time):
         initial_entry_data = self.schedule_entry_data.copy()
@@ -129,10 +198,34 @@ class TestScheduleEntry(TestCase):
         overlapping_entry_data['start_time'] = start_time
         overlapping_entry_data['end_time'] = end_time
 
-        schedule = ScheduleEntry(**overlapping_entry_data)
-        with self.assertRaises(ValidationError):
+        schedule = ScheduleEntry(schedule=self.schedule, **overlapping_entry_data)
+        with self.assertRaises(ValidationError) as context:
             schedule.full_clean()
 
+        self.assertIn('start_time', context.exception.message_dict)
+
+    def test_entry_can_overlap_with_entries_of_other_schedules(self):
+        other_schedule = Schedule.objects.create(name='other_schedule', author=self.user)
+        ScheduleEntry.objects.create(schedule=other_schedule, **self.schedule_entry_data)
+
+        schedule_entry = ScheduleEntry(schedule=self.schedule, **self.schedule_entry_data)
+        schedule_entry.full_clean()
+
+    def test_entry_can_overlap_with_entries_of_other_days(self):
+        ScheduleEntry.objects.create(schedule=self.schedule, **self.schedule_entry_data)
+        self.schedule_entry_data['day'] = ScheduleEntry.DayInWeek.TUESDAY
+
+        schedule_entry = ScheduleEntry(schedule=self.schedule, **self.schedule_entry_data)
+        schedule_entry.full_clean()
+
+    def test_collision_check_is_a_single_query(self):
+        ScheduleEntry.objects.create(schedule=self.schedule, **self.schedule_entry_data)
+        schedule_entry = ScheduleEntry(schedule=self.schedule, **self.schedule_entry_data)
+        schedule_entry.clean_fields()
+
+        with self.assertNumQueries(1), self.assertRaises(ValidationError):
+            schedule_entry.clean()
+
     @parameterized.expand([
         ('starts_when_the_other_ends', '12:00', '13:00'),
         ('ends_when_the_other_starts', '9:00', '10:00'),
@@ -157,3 +250,148 @@ class TestScheduleEntry(TestCase):
 
         schedule_entry.full_clean()
         schedule_entry.save()
+
+    def test_entry_keeping_its_time_is_not_checked_for_collisions(self):
+        ScheduleEntry.objects.create(schedule=self.schedule, **self.schedule_entry_data)
+        schedule_entry = ScheduleEntry.objects.get()
+        schedule_entry.title = 'new_title'
+
+        # the stored interval is read again, the other entries are not
+        with self.assertNumQueries(1):
+            schedule_entry.clean()
+
+    def test_stale_entry_is_checked_where_it_was_loaded(self):
+        ScheduleEntry.objects.create(schedule=self.schedule, **self.schedule_entry_data)
+        stale_entry = ScheduleEntry.objects.get()
+        moved_entry = ScheduleEntry.objects.get()
+        moved_entry.day = ScheduleEntry.DayInWeek.TUESDAY
+        moved_entry.save()
+        ScheduleEntry.objects.create(schedule=self.schedule, **self.schedule_entry_data)
+        stale_entry.title = 'new_title'
+
+        with self.assertRaises(ValidationError) as context:
+            stale_entry.full_clean()
+
+        self.assertIn('start_time', context.exception.message_dict)
+
+
+class TestScheduleDaySummary(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='test_user',
+            email='test_user@test.com',
+            password='test_password'
+        )
+        self.schedule = Schedule.objects.create(name='test_schedule', author=self.user)
+        self.entries = [
+            ScheduleEntry.objects.create(
+                schedule=self.schedule, title='title', day=day, start_time=f'{hour}:00', end_time=f'{hour}:30'
+            )
+            for day, hour in ((0, 8), (0, 10), (0, 12), (3, 9))
+        ]
+
+    def summaries(self, schedule=None):
+        return list(
+            ScheduleDaySummary.objects.filter(schedule=schedule or self.schedule).order_by('day').values_list(
+                'day', 'entry_count', 'busy_seconds', 'first_start', 'last_end'
+            )
+        )
+
+    def assert_summaries_match_entries(self, schedule=None):
+        schedule = schedule or self.schedule
+        maintained = self.summaries(schedule)
+        ScheduleDaySummary.objects.rebuild([schedule.pk])
+        self.assertEqual(maintained, self.summaries(schedule))
+
+    def test_schedule_has_summary_of_every_day(self):
+        schedule = Schedule.objects.create(name='empty_schedule', author=self.user)
+
+        self.assertEqual(self.summaries(schedule), [(day, 0, 0, None, None) for day in range(7)])
+
+    def test_created_entries_are_summarized(self):
+        self.assertEqual(self.summaries()[0], (0, 3, 3 * 30 * 60, time(8), time(12, 30)))
+        self.assertEqual(self.summaries()[3], (3, 1, 30 * 60, time(9), time(9, 30)))
+
+    def test_entry_moved_to_another_day_is_summarized(self):
+        entry = ScheduleEntry.objects.get(pk=self.entries[0].pk)
+        entry.day = 3
+        entry.end_time = time(8, 45)
+        entry.save()
+
+        self.assertEqual(self.summaries()[0], (0, 2, 2 * 30 * 60, time(10), time(12, 30)))
+        self.assertEqual(self.summaries()[3], (3, 2, 75 * 60, time(8), time(9, 30)))
+        self.assert_summaries_match_entries()
+
+    def test_shortened_last_entry_is_summarized(self):
+        entry = self.entries[2]
+        entry.end_time = time(12, 15)
+        entry.save()
+
+        self.assertEqual(self.summaries()[0], (0, 3, 75 * 60, time(8), time(12, 15)))
+        self.assert_summaries_match_entries()
+
+    def test_entry_saved_without_being_loaded_is_summarized(self):
+        ScheduleEntry(
+            pk=self.entries[1].pk, schedule=self.schedule, title='title', day=1, start_time='7:00', end_time='8:00'
+        ).save()
+
+        self.assertEqual(self.summaries()[1], (1, 1, 60 * 60, time(7), time(8)))
+        self.assert_summaries_match_entries()
+
+    def test_stale_entry_is_summarized_by_the_row_it_replaces(self):
+        stale_entry = self.entries[0]
+        moved_entry = ScheduleEntry.objects.get(pk=stale_entry.pk)
+        moved_entry.day = ScheduleEntry.DayInWeek.TUESDAY
+        moved_entry.save()
+
+        stale_entry.title = 'new_title'
+        stale_entry.save()
+
+        self.assert_summaries_match_entries()
+
+    def test_stale_entry_is_summarized_when_deleted(self):
+        stale_entry = self.entries[0]
+        moved_entry = ScheduleEntry.objects.get(pk=stale_entry.pk)
+        moved_entry.day = ScheduleEntry.DayInWeek.TUESDAY
+        moved_entry.save()
+
+        stale_entry.delete()
+
+        self.assert_summaries_match_entries()
+
+    def test_deleted_entries_are_summarized(self):
+        for entry in self.entries[:2]:
+            entry.delete()
+        self.entries[3].delete()
+
+        self.assertEqual(self.summaries()[0], (0, 1, 30 * 60, time(12), time(12, 30)))
+        self.assertEqual(self.summaries()[3], (3, 0, 0, None, None))
+
+    def test_duplicate_copies_summaries(self):
+        copy = self.schedule.duplicate('copy')
+
+        self.assertEqual(self.summaries(copy), self.summaries())
+
+    def test_bulk_writes_are_summarized(self):
+        self.schedule.copy_day(0, [1, 3])
+        import_entries(self.schedule, [{'title': 'title', 'day': 'Sunday', 'start_time': '6:00', 'end_time': '7:00'}])
+
+        self.assertEqual(self.summaries()[1], (1, 3, 3 * 30 * 60, time(8), time(12, 30)))
+        self.assert_summaries_match_entries()
+
+    def test_schedule_created_in_bulk_gets_summaries_built_on_first_change(self):
+        schedule = Schedule.objects.bulk_create([Schedule(name='bulk', author=self.user)])[0]
+        schedule = Schedule.objects.get(name='bulk')
+
+        ScheduleEntry.objects.create(schedule=schedule, title='title', day=2, start_time='8:00', end_time='9:00')
+
+        self.assertEqual(self.summaries(schedule), [(2, 1, 60 * 60, time(8), time(9))])
+
+    def test_rebuild_command_recomputes_summaries(self):
+        ScheduleDaySummary.objects.update(entry_count=0, busy_seconds=0, first_start=None, last_end=None)
+        output = StringIO()
+
+        call_command('rebuild_schedule_summaries', stdout=output)
+
+        self.assertEqual(self.summaries()[0], (0, 3, 3 * 30 * 60, time(8), time(12, 30)))
+        self.assertIn('Rebuilt 7 day summaries of 1 schedules.', output.getvalue())
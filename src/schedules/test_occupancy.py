@@ -0,0 +1,113 @@
+import os
+import runpy
+from datetime import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from schedules.cache import get_cache
+from schedules.imports import import_entries
+from schedules.models import Schedule, ScheduleEntry
+from schedules.occupancy import BITMAP_SIZE, Occupancy
+
+
+class TestOccupancy(SimpleTestCase):
+    def setUp(self):
+        self.occupancy = Occupancy.from_intervals([(0, time(10), time(12)), (6, time(23), time(23, 59, 30))])
+
+    def test_detects_overlapping_intervals(self):
+        self.assertTrue(self.occupancy.may_overlap(0, time(11), time(13)))
+        self.assertTrue(self.occupancy.may_overlap(6, time(23, 59), time(23, 59, 59)))
+
+    def test_clears_adjacent_intervals_and_other_days(self):
+        self.assertFalse(self.occupancy.may_overlap(0, time(9), time(10)))
+        self.assertFalse(self.occupancy.may_overlap(0, time(12), time(13)))
+        self.assertFalse(self.occupancy.may_overlap(1, time(10), time(12)))
+
+    def test_marks_partially_taken_minutes_as_possibly_taken(self):
+        occupancy = Occupancy.from_intervals([(2, time(8), time(8, 0, 30))])
+
+        self.assertTrue(occupancy.may_overlap(2, time(8, 0, 30), time(8, 1)))
+
+    def test_checks_many_intervals_at_once(self):
+        intervals = [(0, time(9), time(10)), (0, time(9), time(10, 1)), (6, time(0), time(23)), (6, time(0), time(23, 1))]
+
+        self.assertEqual(self.occupancy.may_overlap_many(intervals), [False, True, False, True])
+
+    def test_survives_serialization(self):
+        data = self.occupancy.to_bytes()
+
+        self.assertEqual(len(data), BITMAP_SIZE)
+        self.assertEqual(Occupancy.from_bytes(data).bits, self.occupancy.bits)
+
+
+class TestOccupancySettings(SimpleTestCase):
+    @staticmethod
+    def load_settings(**environ):
+        environ = {**{name: value for name, value in os.environ.items() if not name.startswith('SCHEDULES_')}, **environ}
+        with mock.patch.dict(os.environ, environ, clear=True):
+            return runpy.run_path(settings.BASE_DIR / 'mmd_project' / 'settings.py')
+
+    def test_index_is_ignored_on_a_per_process_cache(self):
+        self.assertFalse(self.load_settings(SCHEDULES_OCCUPANCY_INDEX='1')['SCHEDULES_OCCUPANCY_INDEX'])
+
+    def test_index_is_enabled_on_a_shared_cache(self):
+        loaded = self.load_settings(
+            SCHEDULES_OCCUPANCY_INDEX='1', SCHEDULES_CACHE_BACKEND='django.core.cache.backends.filebased.FileBasedCache'
+        )
+
+        self.assertTrue(loaded['SCHEDULES_OCCUPANCY_INDEX'])
+
+
+# the settings leave the index off on the per-process LocMemCache, which the single test process shares
+@override_settings(SCHEDULES_OCCUPANCY_INDEX=True)
+class TestOccupancyIndex(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(username='test_user', password='test_password')
+        self.schedule = Schedule.objects.create(name='test_schedule', author=self.user)
+        ScheduleEntry.objects.create(
+            schedule=self.schedule, title='title', day=0, start_time='10:00', end_time='12:00:30'
+        )
+
+    def entry(self, start_time, end_time, day=0):
+        return ScheduleEntry(schedule=self.schedule, title='title', day=day, start_time=start_time, end_time=end_time)
+
+    def test_free_slot_is_validated_without_queries_once_indexed(self):
+        self.entry(time(8), time(9)).full_clean(exclude=['schedule'])
+
+        with self.assertNumQueries(0):
+            self.entry(time(13), time(14)).full_clean(exclude=['schedule'])
+
+    def test_collision_is_confirmed_by_database(self):
+        with self.assertRaises(ValidationError):
+            self.entry(time(11), time(13)).full_clean(exclude=['schedule'])
+
+    def test_entry_sharing_a_partially_taken_minute_is_accepted(self):
+        self.entry(time(12, 0, 30), time(13)).full_clean(exclude=['schedule'])
+
+    def test_index_sees_new_entries(self):
+        self.entry(time(13), time(14)).full_clean(exclude=['schedule'])
+        self.entry(time(13), time(14)).save()
+
+        with self.assertRaises(ValidationError):
+            self.entry(time(13, 30), time(15)).full_clean(exclude=['schedule'])
+
+    def test_import_skips_reading_entries_when_rows_fit(self):
+        self.entry(time(8), time(9)).full_clean(exclude=['schedule'])
+        rows = [{'title': 'title', 'day': 0, 'start_time': '14:00', 'end_time': '14:30'}]
+
+        # savepoint, insert entries, update summaries, release
+        with self.assertNumQueries(4):
+            result = import_entries(self.schedule, rows)
+
+        self.assertEqual(result.created, 1)
+
+    def test_import_detects_collisions_with_existing_entries(self):
+        result = import_entries(self.schedule, [{'title': 'title', 'day': 0, 'start_time': '11:00', 'end_time': '13:00'}])
+
+        self.assertEqual(result.created, 0)
+        self.assertEqual(len(result.errors), 1)
@@ -0,0 +1,172 @@
+from unittest import mock, skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from schedules.models import OVERLAP_CONSTRAINT, OVERLAP_MESSAGE, Schedule, ScheduleEntry
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the exclusion constraint exists on PostgreSQL only')
+class TestOverlapConstraint(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='user1', password='user1_password')
+        self.schedule = Schedule.objects.create(name='schedule', author=self.user)
+        self.entry = self.create_entry(ScheduleEntry.DayInWeek.MONDAY, '10:00', '12:00')
+
+    def create_entry(self, day, start_time, end_time, schedule=None):
+        return ScheduleEntry.objects.create(
+            schedule=schedule or self.schedule, title='title', day=day, start_time=start_time, end_time=end_time
+        )
+
+    def test_database_rejects_overlapping_entry(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_entry(ScheduleEntry.DayInWeek.MONDAY, '11:00', '13:00')
+
+    def test_database_accepts_adjacent_entries_and_other_days(self):
+        self.create_entry(ScheduleEntry.DayInWeek.MONDAY, '12:00', '13:00')
+        self.create_entry(ScheduleEntry.DayInWeek.TUESDAY, '10:00', '12:00')
+        self.create_entry(ScheduleEntry.DayInWeek.MONDAY, '10:00', '12:00', Schedule.objects.create(
+            name='other_schedule', author=self.user
+        ))
+
+    def test_validation_leaves_overlaps_to_the_database(self):
+        entry = ScheduleEntry(schedule=self.schedule, title='title', day=0, start_time='11:00', end_time='13:00')
+        entry.clean_fields()
+
+        with self.assertNumQueries(0):
+            entry.clean()
+
+    def test_view_reports_overlap_rejected_by_the_database(self):
+        self.client.login(username='user1', password='user1_password')
+
+        response = self.client.post(
+            reverse('schedules:scheduleentry_create', args=[self.schedule.pk]),
+            {'title': 'title', 'day': 0, 'start_time': '11:00', 'end_time': '13:00'}
+        )
+
+        self.assertFormError(response, 'form', 'start_time', 'You already have an entry in this time frame!!')
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+    def test_import_reports_overlap_rejected_by_the_database(self):
+        self.client.login(username='user1', password='user1_password')
+        content = 'title,day,start_time,end_time\ntitle,0,11:00,13:00\n'
+
+        # the collision check misses the entry as if it was saved by someone else after it
+        with mock.patch('schedules.imports.find_collisions', return_value={}):
+            response = self.client.post(
+                reverse('schedules:scheduleentry_import', args=[self.schedule.pk]),
+                {'file': SimpleUploadedFile('entries.csv', content.encode())}
+            )
+
+        self.assertFormError(response, 'form', 'file', OVERLAP_MESSAGE)
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+    def test_copy_day_reports_overlap_rejected_by_the_database(self):
+        self.create_entry(ScheduleEntry.DayInWeek.TUESDAY, '11:00', '13:00')
+        self.client.login(username='user1', password='user1_password')
+
+        # the collision check misses the entry as if it was saved by someone else after it
+        with mock.patch('schedules.models.find_collisions', return_value={}):
+            response = self.client.post(
+                reverse('schedules:schedule_copy_day', args=[self.schedule.pk]),
+                {'source_day': ScheduleEntry.DayInWeek.TUESDAY, 'target_days': [ScheduleEntry.DayInWeek.MONDAY]}
+            )
+
+        self.assertFormError(response, 'form', None, 'The copied entries collide with entries saved in the meantime.')
+        self.assertEqual(ScheduleEntry.objects.count(), 2)
+
+    def test_duplicate_reports_overlap_rejected_by_the_database(self):
+        self.client.login(username='user1', password='user1_password')
+
+        with mock.patch.object(ScheduleEntry.objects, 'bulk_create', side_effect=IntegrityError(OVERLAP_CONSTRAINT)):
+            response = self.client.post(
+                reverse('schedules:schedule_duplicate', args=[self.schedule.pk]), {'name': 'copy'}
+            )
+
+        self.assertFormError(response, 'form', None, OVERLAP_MESSAGE)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_admin_reports_overlap_on_the_entry_form(self):
+        get_user_model().objects.create_superuser(username='admin', password='admin_password')
+        self.client.login(username='admin', password='admin_password')
+
+        response = self.client.post(reverse('admin:schedules_scheduleentry_add'), {
+            'schedule': self.schedule.pk, 'title': 'title', 'day': 0, 'start_time': '11:00', 'end_time': '13:00'
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['adminform'].form.errors['start_time'], [OVERLAP_MESSAGE])
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+    def test_admin_reports_overlap_on_the_schedule_inline(self):
+        get_user_model().objects.create_superuser(username='admin', password='admin_password')
+        self.client.login(username='admin', password='admin_password')
+        prefix = 'scheduleentry_set'
+
+        response = self.client.post(reverse('admin:schedules_schedule_change', args=[self.schedule.pk]), {
+            'name': self.schedule.name, 'author': self.user.pk,
+            f'{prefix}-TOTAL_FORMS': 2, f'{prefix}-INITIAL_FORMS': 1,
+            f'{prefix}-MIN_NUM_FORMS': 0, f'{prefix}-MAX_NUM_FORMS': 1000,
+            f'{prefix}-0-id': self.entry.pk, f'{prefix}-0-schedule': self.schedule.pk, f'{prefix}-0-title': 'title',
+            f'{prefix}-0-day': 0, f'{prefix}-0-start_time': '10:00', f'{prefix}-0-end_time': '12:00',
+            f'{prefix}-1-schedule': self.schedule.pk, f'{prefix}-1-title': 'title',
+            f'{prefix}-1-day': 0, f'{prefix}-1-start_time': '11:00', f'{prefix}-1-end_time': '13:00',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ScheduleEntry.objects.count(), 1)
+
+    def test_admin_reports_overlap_saved_since_the_validation(self):
+        get_user_model().objects.create_superuser(username='admin', password='admin_password')
+        self.client.login(username='admin', password='admin_password')
+        overlapping = ScheduleEntry.objects.overlapping
+        # the first validation misses the entry as if it was saved by someone else after it
+        answers = [ScheduleEntry.objects.none()]
+
+        def racing_overlapping(*args):
+            return answers.pop() if answers else overlapping(*args)
+
+        with mock.patch.object(ScheduleEntry.objects, 'overlapping', side_effect=racing_overlapping):
+            response = self.client.post(reverse('admin:schedules_scheduleentry_add'), {
+                'schedule': self.schedule.pk, 'title': 'title', 'day': 0, 'start_time': '11:00', 'end_time': '13:00'
+            })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['adminform'].form.errors['start_time'], [OVERLAP_MESSAGE])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'the exclusion constraint exists on PostgreSQL only')
+class TestOverlapConstraintMigration(TransactionTestCase):
+    before = [('accounts', '0002_customuser_shares_free_time'), ('schedules', '0009_scheduleentry_day_integer')]
+    after = [('accounts', '0002_customuser_shares_free_time'), ('schedules', '0010_scheduleentry_no_overlap')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def setUp(self):
+        self.apps = self.migrate(self.before)
+
+    def tearDown(self):
+        # the constraint cannot be added again over the overlapping entries
+        self.apps.get_model('schedules', 'ScheduleEntry').objects.all().delete()
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_reports_overlapping_entries(self):
+        user = self.apps.get_model('accounts', 'CustomUser').objects.create(username='user')
+        schedule = self.apps.get_model('schedules', 'Schedule').objects.create(name='schedule', author_id=user.pk)
+        entry_model = self.apps.get_model('schedules', 'ScheduleEntry')
+        first, second = entry_model.objects.bulk_create(
+            entry_model(schedule_id=schedule.pk, title='title', day=0, start_time=start_time, end_time=end_time)
+            for start_time, end_time in [('10:00', '12:00'), ('11:00', '13:00')]
+        )
+
+        with self.assertRaisesMessage(
+                RuntimeError, f'schedule {schedule.pk}, day 0: entries {first.pk} and {second.pk}'):
+            self.migrate(self.after)
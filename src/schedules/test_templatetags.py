@@ -0,0 +1,75 @@
+from datetime import time
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+from django.template.loader import render_to_string
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from schedules.apps import warm_templates
+from schedules.models import ScheduleEntry
+from schedules.templatetags import schedule_tags
+from schedules.week import build_week
+
+
+def templates_with_loaders(loaders):
+    return [{
+        **settings.TEMPLATES[0],
+        'APP_DIRS': False,
+        'OPTIONS': {**settings.TEMPLATES[0]['OPTIONS'], 'loaders': loaders},
+    }]
+
+
+def entry(schedule_id, pk, day):
+    return ScheduleEntry(
+        schedule_id=schedule_id, pk=pk, title=f'entry {pk}', day=day, start_time=time(pk % 24), end_time=time(pk % 24, 30)
+    )
+
+
+class TestEntryCard(SimpleTestCase):
+    def test_links_entry_views(self):
+        html = render_to_string('schedules/schedule_week.html', {'week': build_week([entry(12, 3, 0)])})
+
+        self.assertIn(f'href="{reverse("schedules:scheduleentry_update", args=[12, 3])}"', html)
+        self.assertIn(f'href="{reverse("schedules:scheduleentry_delete", args=[12, 3])}"', html)
+        self.assertIn('id="entry-3"', html)
+
+    def test_reverses_urls_once_per_schedule(self):
+        week = build_week([entry(1, pk, pk % 7) for pk in range(1, 15)] + [entry(2, 20, 0)])
+
+        with mock.patch.object(schedule_tags, 'reverse', wraps=reverse) as reverse_mock:
+            html = render_to_string('schedules/schedule_week.html', {'week': week})
+
+        self.assertEqual(reverse_mock.call_count, 2 * len(schedule_tags.ENTRY_ACTIONS))
+        self.assertIn(f'href="{reverse("schedules:scheduleentry_update", args=[1, 14])}"', html)
+        self.assertIn(f'href="{reverse("schedules:scheduleentry_delete", args=[2, 20])}"', html)
+
+    def test_builds_urls_without_memo(self):
+        self.assertEqual(
+            schedule_tags.entry_urls(entry(10, 100, 0)),
+            {
+                'entry': mock.ANY,
+                'update_url': reverse('schedules:scheduleentry_update', args=[10, 100]),
+                'delete_url': reverse('schedules:scheduleentry_delete', args=[10, 100]),
+            }
+        )
+
+
+class TestWarmTemplates(SimpleTestCase):
+    # Django caches templates unless DEBUG is on or the loaders are given, like the production profile does
+    @override_settings(TEMPLATES=templates_with_loaders(['django.template.loaders.app_directories.Loader']))
+    def test_skips_engines_without_cached_loader(self):
+        self.assertEqual(warm_templates([apps.get_app_config('schedules')]), 0)
+
+    @override_settings(TEMPLATES=templates_with_loaders([
+        ('django.template.loaders.cached.Loader', ['django.template.loaders.app_directories.Loader'])
+    ]))
+    def test_loads_app_templates_into_cached_loader(self):
+        loaded = warm_templates([apps.get_app_config('schedules')])
+
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertGreater(loaded, 0)
+        self.assertEqual(len(loader.get_template_cache), loaded)
+        self.assertIn('schedules/schedule_week.html', loader.get_template_cache)
@@ -1,11 +1,22 @@
+import json
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing, contextmanager
+from pathlib import Path
+from unittest import mock, skipUnless
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 
-from schedules.models import Schedule, ScheduleEntry
+from schedules.models import Schedule, ScheduleDaySummary, ScheduleEntry
+from schedules.pagination import encode_cursor
 
 
-class ScheduleTests(TestCase):
+class ScheduleTestCase(TestCase):
 
     def setUp(self):
         self.user_1 = get_user_model().objects.create_user(
@@ -27,6 +38,9 @@ class ScheduleTests(TestCase):
             author=self.user_2
         )
 
+
+class ScheduleTests(ScheduleTestCase):
+
     def test_list_redirects_unauthenticated_users_to_login(self):
         path = '/'
         response = self.client.get(path)
@@ -162,7 +176,198 @@ class ScheduleTests(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
-class ScheduleEntryTests(TestCase):
+class ScheduleQueryTests(ScheduleTestCase):
+
+    def test_list_runs_minimal_number_of_queries(self):
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get('/')
+
+    def test_detail_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:schedule_detail', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(4):
+            self.client.get(path)
+
+    def test_update_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:schedule_update', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get(path)
+        with self.assertNumQueries(4):
+            self.client.post(path, {'name': 'new_schedule_name'})
+
+    def test_delete_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:schedule_delete', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get(path)
+        with self.assertNumQueries(6):
+            self.client.post(path)
+
+
+class ScheduleCopyingTests(TestCase):
+
+    def setUp(self):
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.schedule_1 = Schedule.objects.create(
+            name="user1_schedule",
+            author=self.user_1
+        )
+        ScheduleEntry.objects.create(
+            schedule=self.schedule_1,
+            title='entry_title',
+            day=ScheduleEntry.DayInWeek.MONDAY,
+            start_time='10:00',
+            end_time='11:00'
+        )
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='user2_password')
+
+    def test_duplicate_does_not_allow_to_copy_other_users_schedule(self):
+        path = reverse('schedules:schedule_duplicate', args=[self.schedule_1.pk])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.post(path, {'name': 'copied_schedule'})
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Schedule.objects.count(), 1)
+
+    def test_duplicate_proposes_name_of_copy(self):
+        path = reverse('schedules:schedule_duplicate', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        self.assertContains(response, 'user1_schedule (copy)')
+
+    def test_duplicate_redirects_to_the_copy(self):
+        path = reverse('schedules:schedule_duplicate', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {'name': 'copied_schedule'})
+
+        copy = Schedule.objects.get(name='copied_schedule')
+        self.assertRedirects(response, reverse('schedules:schedule_detail', args=[copy.pk]))
+        self.assertEqual(copy.scheduleentry_set.count(), 1)
+
+    def test_copy_day_does_not_allow_to_change_other_users_schedule(self):
+        path = reverse('schedules:schedule_copy_day', args=[self.schedule_1.pk])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.post(path, {'source_day': '0', 'target_days': ['1']})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_copy_day_redirects_to_detail_view(self):
+        path = reverse('schedules:schedule_copy_day', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {'source_day': '0', 'target_days': ['1', '2']})
+
+        self.assertRedirects(response, reverse('schedules:schedule_detail', args=[self.schedule_1.pk]))
+        self.assertEqual(self.schedule_1.scheduleentry_set.count(), 3)
+
+    def test_copy_day_reports_collisions(self):
+        ScheduleEntry.objects.create(
+            schedule=self.schedule_1,
+            title='title',
+            day=ScheduleEntry.DayInWeek.TUESDAY,
+            start_time='10:30',
+            end_time='12:00'
+        )
+        path = reverse('schedules:schedule_copy_day', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {'source_day': '0', 'target_days': ['1', '2']})
+
+        self.assertContains(response, 'collide with entries on Tuesday')
+        self.assertEqual(self.schedule_1.scheduleentry_set.count(), 2)
+
+    def test_copy_day_rejects_copying_day_onto_itself(self):
+        path = reverse('schedules:schedule_copy_day', args=[self.schedule_1.pk])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {'source_day': '0', 'target_days': ['0']})
+
+        self.assertContains(response, 'cannot be copied onto itself')
+
+
+class ScheduleListPaginationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        Schedule.objects.bulk_create(Schedule(name=f'schedule_{number:02}', author=self.user) for number in range(45))
+        self.schedules = list(Schedule.objects.order_by('name'))
+        self.client.login(username='user1', password='user1_password')
+
+    def test_list_is_split_into_pages_ordered_by_name(self):
+        first_page = self.client.get('/')
+        next_cursor = first_page.context['page_obj'].next_cursor
+        second_page = self.client.get('/', {'after': next_cursor})
+        third_page = self.client.get('/', {'after': second_page.context['page_obj'].next_cursor})
+
+        self.assertContains(first_page, 'schedule_00')
+        self.assertContains(first_page, 'schedule_19')
+        self.assertNotContains(first_page, 'schedule_20')
+        self.assertIsNone(first_page.context['page_obj'].previous_cursor)
+        self.assertContains(second_page, 'schedule_20')
+        self.assertContains(second_page, 'schedule_39')
+        self.assertContains(third_page, 'schedule_44')
+        self.assertIsNone(third_page.context['page_obj'].next_cursor)
+
+    def test_previous_page_is_reachable_from_next_page(self):
+        second_page = self.client.get('/', {'after': self.client.get('/').context['page_obj'].next_cursor})
+        previous_page = self.client.get('/', {'before': second_page.context['page_obj'].previous_cursor})
+
+        self.assertContains(previous_page, 'schedule_00')
+        self.assertContains(previous_page, 'schedule_19')
+        self.assertNotContains(previous_page, 'schedule_20')
+        self.assertIsNone(previous_page.context['page_obj'].previous_cursor)
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get('/', {'after': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_crafted_cursor_is_not_found(self):
+        for values in [['x', 'y'], [{'a': 1}, 1], [['x'], 1], ['x', None], ['x', True], ['x', 10 ** 30]]:
+            for parameter in ['after', 'before']:
+                response = self.client.get('/', {parameter: encode_cursor(values)})
+
+                self.assertEqual(response.status_code, 404, (parameter, values))
+
+    def test_schedules_are_annotated_with_entry_statistics(self):
+        for day, start_time, end_time in ((0, '08:30', '10:00'), (0, '12:00', '12:15'), (3, '18:00', '19:45')):
+            ScheduleEntry.objects.create(
+                schedule=self.schedules[0], title='title', day=day, start_time=start_time, end_time=end_time
+            )
+
+        response = self.client.get('/')
+
+        schedule = response.context['page_obj'].object_list[0]
+        self.assertEqual(schedule.entry_count, 3)
+        self.assertEqual(schedule.scheduled_minutes, 210)
+        self.assertContains(response, '3 entries, 210 min scheduled between 08:30 and 19:45')
+        self.assertContains(response, '0 entries')
+
+    @override_settings(SCHEDULES_CACHE_ENABLED=False)
+    def test_list_runs_the_same_number_of_queries_for_any_number_of_entries(self):
+        ScheduleEntry.objects.bulk_create(
+            ScheduleEntry(schedule=schedule, title='title', day=day, start_time='10:00', end_time='11:00')
+            for schedule in self.schedules for day in range(7)
+        )
+
+        with self.assertNumQueries(3):
+            self.client.get('/')
+
+
+class ScheduleEntryTestCase(TestCase):
 
     def setUp(self):
         self.user_1 = get_user_model().objects.create_user(
@@ -190,6 +395,9 @@ class ScheduleEntryTests(TestCase):
             author=self.user_2
         )
 
+
+class ScheduleEntryTests(ScheduleEntryTestCase):
+
     def test_create_redirects_unauthenticated_users_to_login(self):
         path = reverse('schedules:scheduleentry_create', args=['1'])
         response = self.client.get(path)
@@ -236,6 +444,165 @@ class ScheduleEntryTests(TestCase):
 
         self.assertEqual(response.status_code, 404)
 
+    def test_detail_groups_entries_by_day(self):
+        ScheduleEntry.objects.create(
+            schedule=self.schedule_1,
+            title='entry_2_title',
+            day=ScheduleEntry.DayInWeek.SUNDAY,
+            start_time='8:00',
+            end_time='9:00'
+        )
+        path = reverse('schedules:schedule_detail', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        week = response.context['week']
+        self.assertEqual([str(day.label) for day in week], [str(label) for label in ScheduleEntry.DayInWeek.labels])
+        self.assertEqual([entry.title for entry in week[int(ScheduleEntry.DayInWeek.TUESDAY)].entries], ['entry_1_title'])
+        self.assertEqual([entry.title for entry in week[int(ScheduleEntry.DayInWeek.SUNDAY)].entries], ['entry_2_title'])
+        self.assertContains(response, 'entry_1_title', count=1)
+
+    def test_update_redirects_unauthenticated_users_to_login(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, f"{reverse('login')}?next={path}")
+
+    def test_update_lets_in_authenticated_owner(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_does_not_allow_to_update_other_users_schedule_entry(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_update_redirects_to_detail_view(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {
+            'schedule': self.schedule_1,
+            'title': 'new_title',
+            'day': ScheduleEntry.DayInWeek.TUESDAY,
+            'start_time': '16:00',
+            'end_time': '19:00'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, reverse('schedules:schedule_detail', args=[1]))
+
+    def test_update_detects_missing_parent_schedule(self):
+        path = reverse('schedules:scheduleentry_update', args=['123', '1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {
+            'schedule': self.schedule_1,
+            'title': 'new_title',
+            'day': ScheduleEntry.DayInWeek.TUESDAY,
+            'start_time': '16:00',
+            'end_time': '19:00'})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_rejects_entry_colliding_with_another(self):
+        path = reverse('schedules:scheduleentry_create', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {
+            'title': 'new_title',
+            'day': ScheduleEntry.DayInWeek.TUESDAY,
+            'start_time': '11:00',
+            'end_time': '13:00'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response, 'form', 'start_time', 'You already have an entry in this time frame!!')
+
+    def test_update_does_not_allow_to_reach_entry_through_own_schedule(self):
+        path = reverse('schedules:scheduleentry_update', args=['2', '1'])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_detects_missing_schedule_entry(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '123'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {
+            'schedule': self.schedule_1,
+            'title': 'new_title',
+            'day': ScheduleEntry.DayInWeek.TUESDAY,
+            'start_time': '16:00',
+            'end_time': '19:00'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ScheduleEntryQueryTests(ScheduleEntryTestCase):
+
+    def test_create_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:scheduleentry_create', args=['1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get(path)
+        # the collision check, the save and the day summary update share a transaction, a savepoint within the test's one
+        with self.assertNumQueries(8):
+            self.client.post(path, {
+                'title': 'new_title',
+                'day': ScheduleEntry.DayInWeek.TUESDAY,
+                'start_time': '16:00',
+                'end_time': '19:00'})
+
+    def test_delete_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:scheduleentry_delete', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get(path)
+        # the delete reads the stored interval again and updates the day summary as well
+        with self.assertNumQueries(6):
+            self.client.post(path)
+
+    def test_update_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+
+        with self.assertNumQueries(3):
+            self.client.get(path)
+        # the collision check, the stored interval read again, the save and the day summary update share a transaction,
+        # a savepoint within the test's one
+        with self.assertNumQueries(9):
+            self.client.post(path, {
+                'title': 'new_title',
+                'day': ScheduleEntry.DayInWeek.TUESDAY,
+                'start_time': '16:00',
+                'end_time': '19:00'})
+
+    def test_patch_of_title_skips_collision_check_and_summaries(self):
+        path = reverse('schedules:scheduleentry_patch', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+
+        # session, user, entry, its stored interval read again, and the update within a savepoint
+        with self.assertNumQueries(7):
+            self.client.post(path, {'title': 'new_title'})
+        self.assertEqual(ScheduleEntry.objects.get(pk=1).title, 'new_title')
+
+    def test_patch_of_interval_runs_minimal_number_of_queries(self):
+        path = reverse('schedules:scheduleentry_patch', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+
+        # session, user, entry, and the update within a savepoint, plus the collision check, the stored interval read
+        # again and the day summary update
+        with self.assertNumQueries(9):
+            self.client.post(path, {'start_time': '09:00'})
+        self.assertEqual(ScheduleDaySummary.objects.get(schedule=self.schedule_1, day=1).busy_seconds, 3 * 3600)
+
+
+class ScheduleEntryDeletionTests(ScheduleEntryTestCase):
+
     def test_delete_redirects_unauthenticated_users_to_login(self):
         path = reverse('schedules:scheduleentry_delete', args=['1', '1'])
         response = self.client.get(path)
@@ -280,60 +647,399 @@ class ScheduleEntryTests(TestCase):
 
         self.assertEqual(response.status_code, 404)
 
-    def test_update_redirects_unauthenticated_users_to_login(self):
-        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
-        response = self.client.get(path)
+    def test_delete_does_not_allow_to_reach_entry_through_own_schedule(self):
+        path = reverse('schedules:scheduleentry_delete', args=['2', '1'])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.post(path)
 
-        self.assertEqual(response.status_code, 302)
-        self.assertEqual(response.url, f"{reverse('login')}?next={path}")
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(ScheduleEntry.objects.filter(pk=1).exists())
 
-    def test_update_lets_in_authenticated_owner(self):
-        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+
+class ScheduleEntryPatchTests(ScheduleEntryTestCase):
+
+    def test_patch_moves_entry_in_place(self):
+        path = reverse('schedules:scheduleentry_patch', args=['1', '1'])
         self.client.login(username='user1', password='user1_password')
-        response = self.client.get(path)
+        response = self.client.post(path, {
+            'day': ScheduleEntry.DayInWeek.FRIDAY,
+            'start_time': '16:00',
+            'end_time': '17:00'})
 
         self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="entry-1"')
+        self.assertContains(response, 'entry_1_title')
+        entry = ScheduleEntry.objects.get(pk=1)
+        self.assertEqual((entry.day, entry.start_time.hour, entry.end_time.hour), (ScheduleEntry.DayInWeek.FRIDAY, 16, 17))
 
-    def test_update_does_not_allow_to_update_other_users_schedule_entry(self):
-        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+    def test_patch_rejects_entry_colliding_with_another(self):
+        ScheduleEntry.objects.create(
+            schedule=self.schedule_1, title='other', day=ScheduleEntry.DayInWeek.TUESDAY, start_time='13:00',
+            end_time='14:00'
+        )
+        path = reverse('schedules:scheduleentry_patch', args=['1', '1'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(path, {'end_time': '13:30'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_time', response.json()['errors'])
+        self.assertEqual(ScheduleEntry.objects.get(pk=1).end_time.hour, 12)
+
+    def test_patch_does_not_allow_to_update_other_users_schedule_entry(self):
+        path = reverse('schedules:scheduleentry_patch', args=['1', '1'])
         self.client.login(username='user2', password='user2_password')
-        response = self.client.get(path)
+        response = self.client.post(path, {'title': 'new_title'})
 
         self.assertEqual(response.status_code, 403)
+        self.assertEqual(ScheduleEntry.objects.get(pk=1).title, 'entry_1_title')
 
-    def test_update_redirects_to_detail_view(self):
-        path = reverse('schedules:scheduleentry_update', args=['1', '1'])
+
+class ScheduleEntryImportTests(TestCase):
+
+    def setUp(self):
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.schedule_1 = Schedule.objects.create(
+            name="user1_schedule",
+            author=self.user_1
+        )
+        self.schedule_1_entry = ScheduleEntry.objects.create(
+            schedule = self.schedule_1,
+            title = 'entry_1_title',
+            day = ScheduleEntry.DayInWeek.TUESDAY,
+            start_time = '10:00',
+            end_time = '12:00'
+        )
+
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='user2_password')
+
+        self.path = reverse('schedules:scheduleentry_import', args=['1'])
+
+    def test_import_redirects_unauthenticated_users_to_login(self):
+        response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, f"{reverse('login')}?next={self.path}")
+
+    def test_import_does_not_allow_to_import_into_other_users_schedule(self):
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(self.path)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_import_accepts_csv_and_redirects_to_detail_view(self):
+        content = (
+            'title,description,day,start_time,end_time\n'
+            'csv_title_1,,0,8:00,9:00\n'
+            'csv_title_2,some description,Tuesday,12:00,13:00\n'
+        )
         self.client.login(username='user1', password='user1_password')
-        response = self.client.post(path, {
-            'schedule': self.schedule_1,
-            'title': 'new_title',
-            'day': ScheduleEntry.DayInWeek.TUESDAY,
-            'start_time': '16:00',
-            'end_time': '19:00'})
+        response = self.client.post(self.path, {'file': SimpleUploadedFile('entries.csv', content.encode())})
 
         self.assertEqual(response.status_code, 302)
         self.assertEqual(response.url, reverse('schedules:schedule_detail', args=[1]))
+        self.assertQuerysetEqual(
+            self.schedule_1.scheduleentry_set.all(),
+            ['csv_title_1', 'entry_1_title', 'csv_title_2'],
+            transform=str
+        )
 
-    def test_update_detects_missing_parent_schedule(self):
-        path = reverse('schedules:scheduleentry_update', args=['123', '1'])
+    def test_import_accepts_json(self):
+        content = json.dumps([
+            {'title': 'json_title', 'day': 0, 'start_time': '8:00', 'end_time': '9:00'},
+        ])
         self.client.login(username='user1', password='user1_password')
-        response = self.client.post(path, {
-            'schedule': self.schedule_1,
-            'title': 'new_title',
-            'day': ScheduleEntry.DayInWeek.TUESDAY,
-            'start_time': '16:00',
-            'end_time': '19:00'})
+        response = self.client.post(self.path, {'file': SimpleUploadedFile('entries.json', content.encode())})
 
-        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(self.schedule_1.scheduleentry_set.filter(title='json_title').exists())
+
+    def test_import_stores_valid_rows_and_reports_the_others(self):
+        content = json.dumps([
+            {'title': 'valid', 'day': 0, 'start_time': '8:00', 'end_time': '9:00'},
+            {'title': 'collides_with_existing', 'day': 1, 'start_time': '11:00', 'end_time': '14:00'},
+            {'title': 'collides_with_first_row', 'day': 0, 'start_time': '8:30', 'end_time': '10:00'},
+            {'title': 'ends_before_start', 'day': 2, 'start_time': '10:00', 'end_time': '9:00'},
+            {'title': 'wrong_day', 'day': 'someday', 'start_time': '8:00', 'end_time': '9:00'},
+        ])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(self.path, {'file': SimpleUploadedFile('entries.json', content.encode())})
 
-    def test_update_detects_missing_schedule_entry(self):
-        path = reverse('schedules:scheduleentry_update', args=['1', '123'])
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual(result.created, 1)
+        self.assertEqual([error.row for error in result.errors], [2, 3, 4, 5])
+        self.assertEqual(result.errors[1].messages, ['Collides with row 1.'])
+        self.assertEqual(
+            set(self.schedule_1.scheduleentry_set.values_list('title', flat=True)),
+            {'entry_1_title', 'valid'}
+        )
+
+    def test_import_reports_rows_with_values_of_wrong_type(self):
+        content = json.dumps([
+            {'title': 'numeric_time', 'day': 0, 'start_time': 800, 'end_time': 900},
+            {'title': 'object_time', 'day': 0, 'start_time': {'a': 1}, 'end_time': [9, 0]},
+            {'title': 'fractional_day', 'day': 1.5, 'start_time': '8:00', 'end_time': '9:00'},
+        ])
         self.client.login(username='user1', password='user1_password')
-        response = self.client.post(path, {
-            'schedule': self.schedule_1,
-            'title': 'new_title',
-            'day': ScheduleEntry.DayInWeek.TUESDAY,
-            'start_time': '16:00',
-            'end_time': '19:00'})
+        response = self.client.post(self.path, {'file': SimpleUploadedFile('entries.json', content.encode())})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.context['result']
+        self.assertEqual(result.created, 0)
+        self.assertEqual([error.row for error in result.errors], [1, 2, 3])
+
+    def test_import_rejects_unreadable_file(self):
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.post(self.path, {'file': SimpleUploadedFile('entries.json', b'{not json')})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors['file'])
+
+    def test_import_cost_does_not_depend_on_number_of_rows(self):
+        content = json.dumps([
+            {'title': f'title_{i}', 'day': i % 7, 'start_time': f'{i // 7}:00', 'end_time': f'{i // 7}:30'}
+            for i in range(70)
+        ])
+        self.client.login(username='user1', password='user1_password')
+
+        # session, user, schedule, existing entries, and a savepoint around the bulk insert and the summary update
+        with self.assertNumQueries(8):
+            self.client.post(self.path, {'file': SimpleUploadedFile('entries.json', content.encode())})
+        self.assertEqual(self.schedule_1.scheduleentry_set.count(), 71)
+
+
+class ScheduleExportTests(TestCase):
+
+    def setUp(self):
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.schedule_1 = Schedule.objects.create(
+            name="user1_schedule",
+            author=self.user_1
+        )
+        ScheduleEntry.objects.create(
+            schedule = self.schedule_1,
+            title = 'entry_1_title',
+            description = 'Lunch, then a walk',
+            day = ScheduleEntry.DayInWeek.TUESDAY,
+            start_time = '10:00',
+            end_time = '12:00'
+        )
+        self.schedule_3 = Schedule.objects.create(
+            name="user1_other_schedule",
+            author=self.user_1
+        )
+        ScheduleEntry.objects.create(
+            schedule = self.schedule_3,
+            title = 'entry_3_title',
+            day = ScheduleEntry.DayInWeek.FRIDAY,
+            start_time = '8:00',
+            end_time = '9:00'
+        )
+
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='user2_password')
+        self.schedule_2 = Schedule.objects.create(
+            name="user2_schedule",
+            author=self.user_2
+        )
+        ScheduleEntry.objects.create(
+            schedule = self.schedule_2,
+            title = 'entry_2_title',
+            day = ScheduleEntry.DayInWeek.TUESDAY,
+            start_time = '10:00',
+            end_time = '12:00'
+        )
+
+    @staticmethod
+    def _content(response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_redirects_unauthenticated_users_to_login(self):
+        path = reverse('schedules:schedule_export', args=[self.schedule_1.pk, 'csv'])
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response.url, f"{reverse('login')}?next={path}")
+
+    def test_export_does_not_allow_to_export_other_users_schedule(self):
+        path = reverse('schedules:schedule_export', args=[self.schedule_1.pk, 'csv'])
+        self.client.login(username='user2', password='user2_password')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_export_fails_on_unknown_format(self):
+        path = reverse('schedules:schedule_export', args=[self.schedule_1.pk, 'pdf'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
 
         self.assertEqual(response.status_code, 404)
+
+    def test_export_streams_schedule_as_csv(self):
+        path = reverse('schedules:schedule_export', args=[self.schedule_1.pk, 'csv'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="user1_schedule.csv"')
+        self.assertEqual(self._content(response).splitlines(), [
+            'schedule,title,description,day,start_time,end_time',
+            'user1_schedule,entry_1_title,"Lunch, then a walk",Tuesday,10:00:00,12:00:00',
+        ])
+
+    def test_export_streams_schedule_as_weekly_icalendar_events(self):
+        path = reverse('schedules:schedule_export', args=[self.schedule_1.pk, 'ics'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        content = self._content(response)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        self.assertTrue(content.startswith('BEGIN:VCALENDAR\r\n'))
+        self.assertTrue(content.endswith('END:VCALENDAR\r\n'))
+        self.assertEqual(content.count('BEGIN:VEVENT'), 1)
+        self.assertIn('RRULE:FREQ=WEEKLY;BYDAY=TU\r\n', content)
+        self.assertIn('SUMMARY:entry_1_title\r\n', content)
+        self.assertIn('DESCRIPTION:Lunch\\, then a walk\r\n', content)
+        self.assertRegex(content, r'DTSTART:\d{8}T100000\r\nDTEND:\d{8}T120000\r\n')
+
+    def test_list_export_contains_all_user_schedules_only(self):
+        path = reverse('schedules:schedule_list_export', args=['csv'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        content = self._content(response)
+        self.assertIn('entry_1_title', content)
+        self.assertIn('entry_3_title', content)
+        self.assertNotIn('entry_2_title', content)
+
+    def test_list_export_folds_long_icalendar_lines(self):
+        ScheduleEntry.objects.filter(schedule=self.schedule_3).update(description='ż' * 100)
+        path = reverse('schedules:schedule_list_export', args=['ics'])
+        self.client.login(username='user1', password='user1_password')
+        response = self.client.get(path)
+
+        lines = self._content(response).split('\r\n')
+        self.assertTrue(all(len(line.encode()) <= 75 for line in lines))
+        self.assertIn('DESCRIPTION:' + 'ż' * 100, ''.join(line[1:] if line.startswith(' ') else line for line in lines))
+
+
+class ScheduleOverlayTests(TestCase):
+
+    def setUp(self):
+        self.user_1 = get_user_model().objects.create_user(
+            username='user1',
+            email='user1@test.com',
+            password='user1_password')
+        self.work = Schedule.objects.create(name='work', author=self.user_1)
+        self.gym = Schedule.objects.create(name='gym', author=self.user_1)
+        self.user_2 = get_user_model().objects.create_user(
+            username='user2',
+            email='user2@test.com',
+            password='user2_password')
+        self.other = Schedule.objects.create(name='other', author=self.user_2)
+        for schedule, title, start_time, end_time in (
+                (self.work, 'standup', '09:00', '10:00'),
+                (self.work, 'review', '12:00', '13:00'),
+                (self.gym, 'squats', '09:30', '10:30'),
+                (self.other, 'foreign', '09:00', '10:00'),
+        ):
+            ScheduleEntry.objects.create(
+                schedule=schedule, title=title, day=ScheduleEntry.DayInWeek.MONDAY, start_time=start_time,
+                end_time=end_time
+            )
+        self.client.login(username='user1', password='user1_password')
+
+    def test_overlay_merges_selected_schedules_and_marks_conflicts(self):
+        response = self.client.get(reverse('schedules:schedule_overlay'), {'schedules': [self.work.pk, self.gym.pk]})
+
+        monday = response.context['week'][0]
+        self.assertEqual([entry.title for entry in monday.entries], ['standup', 'squats', 'review'])
+        self.assertEqual(response.context['conflicts'], 1)
+        self.assertContains(response, 'squats (gym)')
+
+    def test_overlay_takes_a_constant_number_of_queries(self):
+        path = reverse('schedules:schedule_overlay')
+        for i in range(5):
+            schedule = Schedule.objects.create(name=f'schedule {i}', author=self.user_1)
+            ScheduleEntry.objects.create(schedule=schedule, title='title', day=i, start_time='09:00', end_time='10:00')
+        schedule_ids = list(Schedule.objects.filter(author=self.user_1).values_list('pk', flat=True))
+
+        # session, user, selected schedules, entries, schedule choices of the rendered form
+        with self.assertNumQueries(5):
+            self.client.get(path, {'schedules': schedule_ids})
+
+    def test_overlay_offers_only_schedules_of_the_user(self):
+        response = self.client.get(reverse('schedules:schedule_overlay'), {'schedules': [self.other.pk]})
+
+        self.assertFormError(response, 'form', 'schedules', [
+            f'Select a valid choice. {self.other.pk} is not one of the available choices.'
+        ])
+
+
+@skipUnless(connection.vendor == 'sqlite', 'PostgreSQL rejects the overlap by itself, see test_postgresql.py')
+class ConcurrentEntryCreationTests(TransactionTestCase):
+    """ Two requests creating the same entry at once, see benchmarks/bench_concurrent_writes.py for many of them """
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='user1', password='user1_password')
+        self.schedule = Schedule.objects.create(name='schedule', author=user)
+        self.clients = [Client(), Client()]
+        for client in self.clients:
+            client.force_login(user)
+        self.status_codes = {}
+
+    @contextmanager
+    def file_database(self):
+        """ The test database copied to a file, as connections to the in-memory one fail instead of waiting for locks """
+        with tempfile.TemporaryDirectory() as directory:
+            name = str(Path(directory) / 'db.sqlite3')
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM INTO %s', [name])
+            # the connections of the threads are opened with the settings of the main thread's one
+            with mock.patch.dict(connection.settings_dict, NAME=name):
+                yield name
+
+    def create_entry(self, client):
+        try:
+            response = client.post(reverse('schedules:scheduleentry_create', args=[self.schedule.pk]), {
+                'title': 'title', 'day': ScheduleEntry.DayInWeek.MONDAY, 'start_time': '10:00', 'end_time': '12:00'
+            })
+            self.status_codes[threading.current_thread().name] = response.status_code
+        finally:
+            connections.close_all()
+
+    def test_request_validating_meanwhile_waits_for_the_other_to_save(self):
+        first = threading.Thread(target=self.create_entry, args=(self.clients[0],), name='first')
+        second = threading.Thread(target=self.create_entry, args=(self.clients[1],), name='second')
+        collides = ScheduleEntry._collides_with_other_entries
+
+        def validate_and_let_the_second_request_in(entry):
+            result = collides(entry)
+            if threading.current_thread() is first:
+                # without the transaction the second request would validate and save the same entry right away
+                second.start()
+                second.join(timeout=1)
+            return result
+
+        with self.file_database() as name, mock.patch.object(
+                ScheduleEntry, '_collides_with_other_entries', validate_and_let_the_second_request_in):
+            first.start()
+            first.join()
+            second.join()
+            with closing(sqlite3.connect(name)) as database:
+                entry_count = database.execute('SELECT COUNT(*) FROM schedules_scheduleentry').fetchone()[0]
+
+        self.assertEqual(self.status_codes, {'first': 302, 'second': 200})
+        self.assertEqual(entry_count, 1)
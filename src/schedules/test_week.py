@@ -0,0 +1,44 @@
+from datetime import time
+
+from django.test import SimpleTestCase
+
+from schedules.models import ScheduleEntry
+from schedules.week import build_overlay
+
+
+def entry(schedule_id, title, day, start_time, end_time):
+    return ScheduleEntry(schedule_id=schedule_id, title=title, day=day, start_time=start_time, end_time=end_time)
+
+
+class TestBuildOverlay(SimpleTestCase):
+    def setUp(self):
+        # ordered by schedule, day and start time, as the view loads them
+        self.entries = [
+            entry(1, 'work', 0, time(8), time(16)),
+            entry(1, 'dinner', 0, time(18), time(19)),
+            entry(1, 'work', 1, time(8), time(16)),
+            entry(2, 'gym', 0, time(7), time(8)),
+            entry(2, 'call', 0, time(15), time(17)),
+            entry(3, 'meeting', 0, time(10), time(11)),
+        ]
+        self.week = build_overlay(self.entries)
+
+    def test_merges_schedules_in_time_order(self):
+        self.assertEqual([day.label for day in self.week][:2], ['Monday', 'Tuesday'])
+        self.assertEqual([item.title for item in self.week[0].entries], ['gym', 'work', 'meeting', 'call', 'dinner'])
+        self.assertEqual([item.title for item in self.week[1].entries], ['work'])
+        self.assertEqual(self.week[2].entries, [])
+
+    def test_marks_overlapping_entries_of_other_schedules(self):
+        gym, work, meeting, call, dinner = self.week[0].entries
+
+        self.assertEqual(work.conflicts, [meeting, call])
+        self.assertEqual(meeting.conflicts, [work])
+        self.assertEqual(call.conflicts, [work])
+        self.assertEqual(gym.conflicts, [])
+        self.assertEqual(dinner.conflicts, [])
+
+    def test_ignores_entries_of_the_same_schedule(self):
+        week = build_overlay([entry(1, 'first', 0, time(8), time(9)), entry(1, 'second', 0, time(9), time(10))])
+
+        self.assertEqual([item.conflicts for item in week[0].entries], [[], []])
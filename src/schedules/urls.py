@@ -1,18 +1,29 @@
 from django.urls import path
 
-from schedules.views import (ScheduleCreateView, ScheduleDeleteView, ScheduleDetailView,
-                    ScheduleEntryCreate, ScheduleEntryDelete,
-                    ScheduleEntryUpdateView, ScheduleListView,
-                    ScheduleUpdateView)
+from schedules.async_views import schedule_detail, schedule_list
+from schedules.views import (FreeTimeView, ScheduleCopyDayView, ScheduleCreateView, ScheduleDeleteView,
+                    ScheduleDetailView, ScheduleDuplicateView, ScheduleEntryCreate, ScheduleEntryDelete,
+                    ScheduleEntryImportView, ScheduleEntryPatchView, ScheduleEntryUpdateView, ScheduleExportView,
+                    ScheduleListExportView, ScheduleListView, ScheduleOverlayView, ScheduleUpdateView)
 
 app_name = 'schedules'
 urlpatterns = [
     path('', ScheduleListView.as_view(), name='schedule_list'),
+    path('async/', schedule_list, name='schedule_list_async'),
     path('<int:pk>/delete', ScheduleDeleteView.as_view(), name='schedule_delete'),
     path('<int:pk>/edit', ScheduleUpdateView.as_view(), name='schedule_update'),
     path('<int:pk>/', ScheduleDetailView.as_view(), name='schedule_detail'),
+    path('<int:pk>/async', schedule_detail, name='schedule_detail_async'),
+    path('<int:pk>/export/<slug:export_format>', ScheduleExportView.as_view(), name='schedule_export'),
+    path('<int:pk>/duplicate', ScheduleDuplicateView.as_view(), name='schedule_duplicate'),
+    path('<int:pk>/copy-day', ScheduleCopyDayView.as_view(), name='schedule_copy_day'),
     path('create/', ScheduleCreateView.as_view(), name='schedule_create'),
+    path('export/<slug:export_format>', ScheduleListExportView.as_view(), name='schedule_list_export'),
+    path('free-time/', FreeTimeView.as_view(), name='free_time'),
+    path('overlay/', ScheduleOverlayView.as_view(), name='schedule_overlay'),
     path('<int:schedule_id>/entries/create', ScheduleEntryCreate.as_view(), name='scheduleentry_create'),
+    path('<int:schedule_id>/entries/import', ScheduleEntryImportView.as_view(), name='scheduleentry_import'),
     path('<int:schedule_id>/entries/<int:pk>/delete', ScheduleEntryDelete.as_view(), name='scheduleentry_delete'),
     path('<int:schedule_id>/entries/<int:pk>/edit', ScheduleEntryUpdateView.as_view(), name='scheduleentry_update'),
+    path('<int:schedule_id>/entries/<int:pk>/patch', ScheduleEntryPatchView.as_view(), name='scheduleentry_patch'),
 ]
@@ -1,20 +1,193 @@
+from datetime import timedelta
+
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.shortcuts import get_object_or_404
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
+from django.core.exceptions import ValidationError
+from django.db.models import Max, Min, Sum
+from django.db.models.functions import Coalesce
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils.functional import SimpleLazyObject
+from django.utils.text import slugify
+from django.views.generic import CreateView, DeleteView, DetailView, FormView, ListView, UpdateView, View
+from django.views.generic.detail import SingleObjectMixin
 from django.urls import reverse
 
+from schedules.cache import get_or_compute, get_version
+from schedules.exports import export_rows, iter_csv, iter_ical
+from schedules.forms import (CopyDayForm, FreeTimeForm, ScheduleDuplicateForm, ScheduleEntryForm,
+                             ScheduleEntryImportForm, ScheduleSelectionForm, entry_transaction, partial_model_form,
+                             save_model_form)
+from schedules.freetime import find_free_time
+from schedules.imports import import_entries
 from schedules.models import Schedule, ScheduleEntry
+from schedules.pagination import InvalidCursor, paginate_keyset
+from schedules.templatetags.schedule_tags import entry_urls
+from schedules.week import build_overlay, load_week
 
 
 class IsOwnerMixin(UserPassesTestMixin):
+    """ Lets in the author only, the object fetched for the check is reused by the rest of the request """
+
+    def __init__(self, **kwargs):
+        self._owned_object = None
+        super().__init__(**kwargs)
+
+    def get_object(self, queryset=None):
+        if self._owned_object is None:
+            self._owned_object = super().get_object(queryset)
+        return self._owned_object
+
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
+
+
+class IsScheduleOwnerMixin(UserPassesTestMixin):
+    """ Lets in the author of the schedule given by the schedule_id URL argument """
+
+    def __init__(self, **kwargs):
+        self.schedule = None
+        super().__init__(**kwargs)
+
+    def test_func(self):
+        self.schedule = get_object_or_404(Schedule.objects.only('author'), pk=self.kwargs['schedule_id'])
+        return self.schedule.author_id == self.request.user.pk
+
+
+class IsScheduleEntryOwnerMixin(IsOwnerMixin):
+    """ Fetches the entry together with the ownership check in a single joined query """
+
+    def get_queryset(self):
+        # the joined schedule comes for free and tells the cache invalidation whose schedule list to refresh
+        return ScheduleEntry.objects.select_related('schedule').filter(
+            schedule_id=self.kwargs['schedule_id'],
+            schedule__author=self.request.user
+        )
+
+    def test_func(self):
+        try:
+            self.get_object()
+        except Http404:
+            # Only a failed lookup pays for telling someone else's schedule (403) from a missing one (404)
+            schedule = get_object_or_404(Schedule.objects.only('author'), pk=self.kwargs['schedule_id'])
+            if schedule.author_id == self.request.user.pk:
+                raise
+            return False
+        return True
+
+
+class OwnedObjectFormMixin(IsOwnerMixin, SingleObjectMixin):
+    """ Form acting on an object of the author, which is shown by the template as object """
+
+    def __init__(self, **kwargs):
+        self.object = None
+        super().__init__(**kwargs)
+
+    def get_context_data(self, **kwargs):
+        self.object = self.get_object()
+        return super().get_context_data(**kwargs)
+
+
+class EntryFormMixin:
+    """ Saves entries reporting overlaps rejected by the database just like the ones found by the validation """
+
+    def __init__(self, **kwargs):
+        self.object = None
+        super().__init__(**kwargs)
+
+    def post(self, request, *args, **kwargs):
+        with entry_transaction():
+            return super().post(request, *args, **kwargs)
+
+    def form_valid(self, form):
+        if save_model_form(form) is None:
+            return self.form_invalid(form)
+        self.object = form.instance
+        return redirect(self.get_success_url())
+
+
+class SearchFormMixin:
+    """ Form of the user submitted with GET, so that its results can be bookmarked """
+    http_method_names = ['get', 'head', 'options']
+
+    def get_form_kwargs(self):
+        kwargs = {'initial': self.get_initial(), 'user': self.request.user}
+        if self.request.GET:
+            kwargs['data'] = self.request.GET
+        return kwargs
+
+    def get(self, request, *args, **kwargs):
+        form = self.get_form()
+        if not form.is_bound:
+            return self.render_to_response(self.get_context_data(form=form))
+        return self.form_valid(form) if form.is_valid() else self.form_invalid(form)
+
+
+class ExportMixin:
+    """ Streams entries as CSV or iCalendar, depending on the export_format URL argument """
+
+    def render_export(self, entries, name):
+        export_format = self.kwargs['export_format']
+        if export_format == 'csv':
+            response = StreamingHttpResponse(iter_csv(export_rows(entries)), content_type='text/csv; charset=utf-8')
+        elif export_format == 'ics':
+            response = StreamingHttpResponse(
+                iter_ical(export_rows(entries), name),
+                content_type='text/calendar; charset=utf-8'
+            )
+        else:
+            raise Http404
+        response['Content-Disposition'] = f'attachment; filename="{slugify(name) or "schedule"}.{export_format}"'
+        return response
+
 
 class ScheduleListView(LoginRequiredMixin, ListView):
     model = Schedule
+    paginate_by = 20
 
     def get_queryset(self):
-        return self.model.objects.filter(author=self.request.user)
+        # at most seven summaries per schedule instead of all of its entries
+        return self.model.objects.filter(author=self.request.user).annotate(
+            entry_count=Coalesce(Sum('day_summaries__entry_count'), 0),
+            busy_seconds=Coalesce(Sum('day_summaries__busy_seconds'), 0),
+            earliest_start=Min('day_summaries__first_start'),
+            latest_end=Max('day_summaries__last_end')
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """ Pages with a (name, pk) keyset instead of OFFSET, lazily, so that a cached page does not hit the database """
+        page = SimpleLazyObject(lambda: self.get_page(queryset, page_size))
+        return None, page, SimpleLazyObject(lambda: page.object_list), True
+
+    def get_page(self, queryset, page_size):
+        try:
+            page = paginate_keyset(
+                queryset,
+                ('name', 'pk'),
+                page_size,
+                after=self.request.GET.get('after'),
+                before=self.request.GET.get('before')
+            )
+        except InvalidCursor as error:
+            raise Http404('Invalid page cursor.') from error
+        for schedule in page.object_list:
+            schedule.scheduled_minutes = schedule.busy_seconds // 60
+        return page
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        author_pk = self.request.user.pk
+        cursor = f"{self.request.GET.get('after', '')}:{self.request.GET.get('before', '')}"
+        context['schedules_html'] = get_or_compute(
+            'schedule-list', author_pk, get_version('schedule-list', author_pk), f'html:{cursor}',
+            lambda: render_to_string('schedules/schedule_list_items.html', context)
+        )
+        return context
+
+
+class ScheduleListExportView(LoginRequiredMixin, ExportMixin, View):
+    def get(self, request, *args, **kwargs):
+        return self.render_export(ScheduleEntry.objects.filter(schedule__author=request.user), 'schedules')
 
 
 class ScheduleCreateView(LoginRequiredMixin, CreateView):
@@ -32,6 +205,29 @@ class ScheduleCreateView(LoginRequiredMixin, CreateView):
 class ScheduleDetailView(LoginRequiredMixin, IsOwnerMixin, DetailView):
     model = Schedule
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        schedule_pk = self.object.pk
+        version = get_version('schedule', schedule_pk)
+        # lazy, so that a cached fragment does not pay for loading the week it was rendered from
+        context['week'] = SimpleLazyObject(lambda: get_or_compute('schedule', schedule_pk, version, 'week', self.get_week))
+        context['week_html'] = get_or_compute(
+            'schedule', schedule_pk, version, 'week-html',
+            lambda: render_to_string('schedules/schedule_week.html', context)
+        )
+        return context
+
+    def get_week(self):
+        return load_week(self.object.pk)
+
+
+class ScheduleExportView(LoginRequiredMixin, IsOwnerMixin, ExportMixin, SingleObjectMixin, View):
+    model = Schedule
+
+    def get(self, request, *args, **kwargs):
+        schedule = self.get_object()
+        return self.render_export(schedule.scheduleentry_set.all(), schedule.name)
+
 
 class ScheduleUpdateView(LoginRequiredMixin, IsOwnerMixin, UpdateView):
     model = Schedule
@@ -49,44 +245,132 @@ class ScheduleDeleteView(LoginRequiredMixin, IsOwnerMixin, DeleteView):
     def get_success_url(self):
         return reverse('schedules:schedule_list')
 
-class ScheduleEntryCreate(LoginRequiredMixin, UserPassesTestMixin, CreateView):
-    model = ScheduleEntry
-    fields = ('title', 'description', 'day', 'start_time', 'end_time')
 
-    def __init__(self):
-        self.schedule = None
-        super().__init__()
+class ScheduleDuplicateView(LoginRequiredMixin, OwnedObjectFormMixin, FormView):
+    model = Schedule
+    form_class = ScheduleDuplicateForm
+    template_name = 'schedules/schedule_duplicate.html'
 
-    def test_func(self):
-        self.schedule = get_object_or_404(Schedule, pk=self.kwargs['schedule_id'])
-        return self.schedule.author == self.request.user
+    def get_initial(self):
+        return {'name': f'{self.get_object().name} (copy)'}
 
     def form_valid(self, form):
+        try:
+            copy = self.get_object().duplicate(form.cleaned_data['name'])
+        except ValidationError as error:
+            form.add_error(None, error)
+            return self.form_invalid(form)
+        return redirect('schedules:schedule_detail', copy.pk)
+
+
+class ScheduleCopyDayView(LoginRequiredMixin, OwnedObjectFormMixin, FormView):
+    model = Schedule
+    form_class = CopyDayForm
+    template_name = 'schedules/schedule_copy_day.html'
+
+    def form_valid(self, form):
+        schedule = self.get_object()
+        try:
+            schedule.copy_day(form.cleaned_data['source_day'], form.cleaned_data['target_days'])
+        except ValidationError as error:
+            form.add_error(None, error)
+            return self.form_invalid(form)
+        return redirect('schedules:schedule_detail', schedule.pk)
+
+
+class ScheduleEntryCreate(LoginRequiredMixin, IsScheduleOwnerMixin, EntryFormMixin, CreateView):
+    model = ScheduleEntry
+    fields = ('title', 'description', 'day', 'start_time', 'end_time')
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        # attached before validation so that clean() can look for colliding entries of this schedule
         form.instance.schedule = self.schedule
-        return super().form_valid(form)
+        return form
 
     def get_success_url(self):
-        return reverse('schedules:schedule_detail', args=[self.object.schedule.pk])
+        return reverse('schedules:schedule_detail', args=[self.object.schedule_id])
 
 
-class ScheduleEntryDelete(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class ScheduleEntryDelete(LoginRequiredMixin, IsScheduleEntryOwnerMixin, DeleteView):
     model = ScheduleEntry
 
-    def test_func(self):
-        schedule = get_object_or_404(Schedule, pk=self.kwargs['schedule_id'])
-        return schedule.author == self.request.user
-
     def get_success_url(self):
-        return reverse('schedules:schedule_detail', args=[self.object.schedule.pk])
+        return reverse('schedules:schedule_detail', args=[self.object.schedule_id])
 
 
-class ScheduleEntryUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class ScheduleEntryUpdateView(LoginRequiredMixin, IsScheduleEntryOwnerMixin, EntryFormMixin, UpdateView):
     model = ScheduleEntry
     fields = ('title', 'description', 'day', 'start_time', 'end_time')
 
-    def test_func(self):
-        schedule = get_object_or_404(Schedule, pk=self.kwargs['schedule_id'])
-        return schedule.author == self.request.user
-
     def get_success_url(self):
-        return reverse('schedules:schedule_detail', args=[self.object.schedule.pk])
+        return reverse('schedules:schedule_detail', args=[self.object.schedule_id])
+
+
+class ScheduleEntryPatchView(LoginRequiredMixin, IsScheduleEntryOwnerMixin, SingleObjectMixin, View):
+    """
+    Changes the posted fields of an entry in place, e.g. when it is dragged to another day or time.
+
+    Answers with the card of the entry for the week on the page, or with the errors as JSON, instead of redirecting
+    to the whole schedule page.
+    """
+    model = ScheduleEntry
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        form = partial_model_form(ScheduleEntryForm, self.get_object(), request.POST)
+        with entry_transaction():
+            entry = save_model_form(form, partial=True) if form.is_valid() else None
+        if entry is None:
+            return JsonResponse({'errors': form.errors.get_json_data()}, status=400)
+        return render(request, 'schedules/scheduleentry_card.html', entry_urls(entry))
+
+
+class ScheduleEntryImportView(LoginRequiredMixin, IsScheduleOwnerMixin, FormView):
+    form_class = ScheduleEntryImportForm
+    template_name = 'schedules/scheduleentry_import.html'
+
+    def form_valid(self, form):
+        try:
+            result = import_entries(self.schedule, form.cleaned_data['file'])
+        except ValidationError as error:
+            form.add_error('file', error)
+            return self.form_invalid(form)
+        if not result.errors:
+            return redirect('schedules:schedule_detail', self.schedule.pk)
+        return self.render_to_response(self.get_context_data(form=form, result=result))
+
+
+class ScheduleOverlayView(LoginRequiredMixin, SearchFormMixin, FormView):
+    """ Some of the user's schedules laid over each other in one week, with entries of different schedules clashing """
+    form_class = ScheduleSelectionForm
+    template_name = 'schedules/schedule_overlay.html'
+
+    def form_valid(self, form):
+        # the field has loaded the selected schedules already, so only their entries take a query
+        entries = ScheduleEntry.objects.filter(
+            schedule_id__in=[schedule.pk for schedule in form.cleaned_data['schedules']]
+        ).select_related('schedule').only(
+            'schedule__name', 'title', 'description', 'day', 'start_time', 'end_time'
+        ).order_by('schedule_id', 'day', 'start_time')
+        week = build_overlay(entries)
+        conflicts = sum(len(entry.conflicts) for day in week for entry in day.entries) // 2
+        return self.render_to_response(self.get_context_data(form=form, week=week, conflicts=conflicts))
+
+
+class FreeTimeView(LoginRequiredMixin, SearchFormMixin, FormView):
+    """ Free time within some of the user's schedules, optionally shared with other people, searched with GET """
+    form_class = FreeTimeForm
+    template_name = 'schedules/free_time.html'
+
+    def form_valid(self, form):
+        days = range(form.cleaned_data['first_day'], form.cleaned_data['last_day'] + 1)
+        slots = find_free_time(
+            form.cleaned_data['schedules'],
+            days,
+            timedelta(minutes=form.cleaned_data['min_duration']),
+            form.cleaned_data['participants']
+        )
+        labels = dict(ScheduleEntry.DayInWeek.choices)
+        free_days = [(labels[day], [slot for slot in slots if slot.day == day]) for day in days]
+        return self.render_to_response(self.get_context_data(form=form, free_days=free_days))
@@ -0,0 +1,62 @@
+import heapq
+from collections import namedtuple
+from itertools import groupby
+from operator import attrgetter
+
+from schedules.models import ScheduleEntry
+
+WeekDay = namedtuple('WeekDay', ['day', 'label', 'entries'])
+
+
+def build_week(entries):
+    """ Buckets entries into seven WeekDay slots, Monday first, in a single pass """
+    week = [WeekDay(day, label, []) for day, label in ScheduleEntry.DayInWeek.choices]
+    for entry in entries:
+        week[entry.day].entries.append(entry)
+    return week
+
+
+def load_week(schedule_id):
+    """ The week of a schedule with the fields of its entries shown by the schedule page """
+    return build_week(ScheduleEntry.objects.filter(schedule_id=schedule_id).only(
+        'schedule', 'title', 'description', 'day', 'start_time', 'end_time'
+    ))
+
+
+def build_overlay(entries):
+    """
+    Lays the entries of several schedules over each other in seven WeekDay slots, Monday first.
+
+    entries have to be ordered by schedule, day and start time, so that every schedule contributes a sorted run to
+    every day, which a k-way merge combines into time order. Every entry gets a conflicts list of the entries of the
+    other schedules it overlaps.
+    """
+    runs = [[] for _ in ScheduleEntry.DayInWeek]
+    for (_schedule_id, day), run in groupby(entries, key=attrgetter('schedule_id', 'day')):
+        runs[day].append(list(run))
+    week = []
+    for (day, label), day_runs in zip(ScheduleEntry.DayInWeek.choices, runs):
+        merged = list(heapq.merge(*day_runs, key=attrgetter('start_time')))
+        mark_conflicts(merged)
+        week.append(WeekDay(day, label, merged))
+    return week
+
+
+def mark_conflicts(entries):
+    """
+    Sweeps entries sorted by start time and tells each of them which entries of other schedules it overlaps.
+
+    Entries of a schedule never overlap each other, so at most one entry per schedule is still running when the next
+    one starts, and the sweep takes O(n log k) for k schedules plus the conflicts found.
+    """
+    running = []
+    for index, entry in enumerate(entries):
+        entry.conflicts = []
+        while running and running[0][0] <= entry.start_time:
+            heapq.heappop(running)
+        for _end_time, other_index in running:
+            other = entries[other_index]
+            if other.schedule_id != entry.schedule_id:
+                other.conflicts.append(entry)
+                entry.conflicts.append(other)
+        heapq.heappush(running, (entry.end_time, index))